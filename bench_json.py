@@ -0,0 +1,73 @@
+import argparse
+import json
+import random
+import time
+
+from core.codec import CODECS
+
+# Compare the available JSON codecs on game packets.
+# Example: python bench_json.py --packets recorded.txt
+# A recording holds one frame per line (or \x00 separated); without one,
+# synthetic moveToArea / loadInventoryBig / ct packets are used.
+parser = argparse.ArgumentParser(description="Benchmark JSON decoding of server packets.")
+parser.add_argument("--packets", help="file with recorded packets, one per line or \\x00 separated")
+parser.add_argument("--rounds", type=int, default=200, help="times every packet is decoded")
+args = parser.parse_args()
+
+
+def frame(data: dict) -> str:
+    return json.dumps({"t": "xt", "b": {"r": -1, "o": data}})
+
+
+def synthetic_packets():
+    players = [{"uoName": f"player{i}", "strUsername": f"Player{i}", "strFrame": f"r{i % 8}", "strPad": "Left",
+                "intState": 1, "intHP": 2500, "intHPMax": 2500, "intMP": 100, "intMPMax": 100, "intLevel": 100,
+                "entID": i, "entType": "p", "tx": 0, "ty": 0, "afk": False} for i in range(60)]
+    monsters = [{"MonMapID": i, "MonID": i, "intState": 1, "intHP": 50000, "intHPMax": 50000} for i in range(40)]
+    items = [{"ItemID": 10000 + i, "CharItemID": 900000 + i, "sName": f"Item {i}", "sDesc": "x" * 120,
+              "iQty": random.randint(1, 1000), "iStk": 1000, "sType": "Item", "sES": "None", "bCoins": 0,
+              "bTemp": 0, "bEquip": 0, "iHrs": 12, "sFile": "", "sLink": "", "sMeta": ""} for i in range(300)]
+    return {
+        "moveToArea": [frame({"cmd": "moveToArea", "areaName": "ultraspeaker-1", "areaId": 1,
+                             "strMapName": "ultraspeaker", "uoBranch": players, "monBranch": monsters,
+                             "mondef": [{"MonID": i, "strMonName": f"Mon {i}"} for i in range(40)],
+                             "monmap": [{"MonMapID": i, "strFrame": f"r{i % 8}"} for i in range(40)]})],
+        "loadInventoryBig": [frame({"cmd": "loadInventoryBig", "items": items, "factions": []})],
+        "ct": [frame({"cmd": "ct", "p": {"player1": {"intHP": 2000, "intMP": 80, "intState": 2}},
+                     "m": {"3": {"intHP": 42000}},
+                     "a": [{"cmd": "aura+", "tInf": "m:3", "auras": [{"nam": "Burn", "dur": 5}]}]})],
+    }
+
+
+def recorded_packets(path: str):
+    with open(path, "r", encoding="utf-8") as f:
+        raw = f.read()
+    frames = [p.strip() for p in raw.replace("\x00", "\n").splitlines()]
+    frames = [p for p in frames if p.startswith("{")]
+    by_cmd = {}
+    for p in frames:
+        try:
+            cmd = json.loads(p)["b"]["o"].get("cmd", "?")
+        except (ValueError, KeyError, TypeError):
+            continue
+        by_cmd.setdefault(cmd, []).append(p)
+    return by_cmd
+
+
+def bench(loads, packets, rounds: int) -> float:
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for p in packets:
+            loads(p)
+    return (time.perf_counter() - started) / (rounds * len(packets)) * 1e6
+
+
+if __name__ == "__main__":
+    groups = recorded_packets(args.packets) if args.packets else synthetic_packets()
+    names = list(CODECS)
+    print(f"{'packet':<20}{'bytes':>10}" + "".join(f"{n + ' us':>14}" for n in names) + f"{'speedup':>10}")
+    for cmd, packets in groups.items():
+        size = sum(len(p) for p in packets) // len(packets)
+        times = [bench(CODECS[n].loads, packets, args.rounds) for n in names]
+        speedup = times[0] / min(times) if min(times) else 1.0
+        print(f"{cmd:<20}{size:>10}" + "".join(f"{t:>14.1f}" for t in times) + f"{speedup:>9.1f}x")
@@ -0,0 +1,39 @@
+import argparse
+import os
+import subprocess
+import sys
+
+# Packets per second on the stock loop versus the tuned loop, measured with loadtest.py.
+# Example: python bench_loop.py --bots 100 --ct-rate 10
+parser = argparse.ArgumentParser(description="Compare the stock and tuned event loop under bot load.")
+parser.add_argument("--bots", type=int, default=100)
+parser.add_argument("--duration", type=float, default=10)
+parser.add_argument("--ct-rate", type=float, default=10)
+args = parser.parse_args()
+
+# what asyncio gives you without configuration: stock loop, min(32, cpus + 4) threads
+STOCK_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+SETUPS = [
+    ("stock", ["--loop", "asyncio", "--workers", str(STOCK_WORKERS)]),
+    ("tuned", ["--loop", "auto"]),
+]
+
+
+def run_setup(extra):
+    cmd = [sys.executable, "loadtest.py", "--bots", str(args.bots), "--duration", str(args.duration),
+           "--ct-rate", str(args.ct_rate)] + extra
+    out = subprocess.run(cmd, capture_output=True, text=True, check=True).stdout.splitlines()
+    loop_line = next((line for line in out if line.startswith("Event loop:")), "")
+    header_at = next(i for i, line in enumerate(out) if line.split()[:1] == ["bots"])
+    return loop_line, dict(zip(out[header_at].split(), map(float, out[header_at + 1].split())))
+
+
+if __name__ == "__main__":
+    results = []
+    for name, extra in SETUPS:
+        loop_line, row = run_setup(extra)
+        results.append(row)
+        print(f"{name:<6} {row['packets_s']:>10.1f} packets/s  lag p99 {row['lag_p99_ms']:>7.2f} ms  "
+              f"skill late p99 {row['skill_late_p99_ms']:>7.2f} ms  cpu {row['cpu_pct']:>6.1f}%  ({loop_line})")
+    if results[0]["packets_s"]:
+        print(f"tuned / stock: {results[1]['packets_s'] / results[0]['packets_s']:.2f}x packets/s")
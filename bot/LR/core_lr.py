@@ -1,6 +1,7 @@
 from core.bot import Bot
 from core.command import Command
 from templates.hunt import hunt_item
+from core.task import FarmTask, do_farm_tasks
 
 async def revenant_spellscroll(cmd: Command, qty: int = 20):
     item_name = "Revenant's Spellscroll"
@@ -20,7 +21,7 @@ async def revenant_spellscroll(cmd: Command, qty: int = 20):
 
     item_to_farm = [
         {"item_name": "Aeacus Empowered", "qty": 50, "map_name": "judgement", "cell": "r10a", "pad": "Left", "is_solo": True},
-        {"item_name": "Tethered Soul", "qty": 300, "map_name": "revenant","cell": "r2", "pad": "Left", "is_solo" : False},
+        {"item_name": "Tethered Soul", "qty": 300, "map_name": "revenant","cell": "r2", "pad": "Left", "is_solo" : False, "room_number": 999999},
         {"item_name": "Darkened Essence", "qty": 500,"map_name": "shadowrealmpast", "cell": "Enter", "pad": "Spawn", "is_solo": False},
         {"item_name": "Dracolich Contract", "qty": 1000,"map_name": "necrodungeon", "cell": "r22", "pad": "Down", "is_solo": False},
     ]
@@ -275,27 +276,4 @@ async def get_leto_ssp(cmd: Command, qty: int = 4000):
 
 
 async def farm_mats(cmd: Command, item_to_farm: list[dict]):
-    for item in item_to_farm:
-        if not cmd.is_still_connected():
-            return
-        is_solo = item.get("is_solo", False)
-        if is_solo:
-            solo_class = cmd.get_solo_class()
-            if solo_class:
-                await cmd.equip_item(solo_class)
-        else:
-            farm_class = cmd.get_farm_class()
-            if farm_class:
-                await cmd.equip_item(farm_class)
-        if item["map_name"] == "revenant":
-            await cmd.join_map("revenant", 999999)
-        await hunt_item(
-            cmd = cmd,
-            item_name = item["item_name"],
-            item_qty = item["qty"],
-            cell = item["cell"],
-            pad = item["pad"],
-            map_name = item["map_name"],
-            farming_logger=True,
-            is_temp=False
-        )
\ No newline at end of file
+    await do_farm_tasks(cmd, [FarmTask(**item, is_temp=False) for item in item_to_farm])
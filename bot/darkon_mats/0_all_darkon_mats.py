@@ -1,19 +1,17 @@
 from bot.darkon_mats.core_darkon_mats import a_melody, ancient_remnant, astravian_medal, bandits_correspondence, bounty_hunter_dubloon, darkons_receipts_binky, darkons_receipts_tower_of_doom, las_gratitude, mourning_flower, sukis_prestige, unfinished_musical_score
-from core.bot import Bot
 from core.command import Command
 
 # get the maxiumum quant of darkon mats
-async def main(bot: Bot):
-    cmd = Command(bot)
-
-    await a_melody(cmd)
-    await ancient_remnant(cmd)
-    await astravian_medal(cmd)
-    await bandits_correspondence(cmd)
-    await bounty_hunter_dubloon(cmd)
-    # await darkons_receipts_binky(cmd)
-    # await darkons_receipts_tower_of_doom(cmd)
-    await las_gratitude(cmd)
-    await mourning_flower(cmd)
-    await sukis_prestige(cmd)
-    await unfinished_musical_score(cmd)
\ No newline at end of file
+# finished mats are checkpointed, so a relogin resumes at the mat it was farming
+async def main(cmd: Command):
+    await cmd.run_step("a_melody", a_melody)
+    await cmd.run_step("ancient_remnant", ancient_remnant)
+    await cmd.run_step("astravian_medal", astravian_medal)
+    await cmd.run_step("bandits_correspondence", bandits_correspondence)
+    await cmd.run_step("bounty_hunter_dubloon", bounty_hunter_dubloon)
+    # await cmd.run_step("darkons_receipts_binky", darkons_receipts_binky)
+    # await cmd.run_step("darkons_receipts_tower_of_doom", darkons_receipts_tower_of_doom)
+    await cmd.run_step("las_gratitude", las_gratitude)
+    await cmd.run_step("mourning_flower", mourning_flower)
+    await cmd.run_step("sukis_prestige", sukis_prestige)
+    await cmd.run_step("unfinished_musical_score", unfinished_musical_score)
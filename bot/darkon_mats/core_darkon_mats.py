@@ -1,6 +1,7 @@
 from core.bot import Bot
 from core.command import Command
 from templates.hunt import hunt_item
+from core.task import FarmTask, do_farm_tasks
 
 async def a_melody(cmd: Command, qty: int = 300):
     item_name = "A Melody"
@@ -437,25 +438,4 @@ async def bandits_correspondence(cmd: Command, qty: int = 3000):
 
 
 async def farm_mats(cmd: Command, item_to_farm: list[dict]):
-    for item in item_to_farm:
-        if not cmd.is_still_connected():
-            return
-        is_solo = item.get("is_solo", False)
-        if is_solo:
-            solo_class = cmd.get_solo_class()
-            if solo_class:
-                await cmd.equip_item(solo_class)
-        else:
-            farm_class = cmd.get_farm_class()
-            if farm_class:
-                await cmd.equip_item(farm_class)
-        await hunt_item(
-            cmd = cmd,
-            item_name = item["item_name"],
-            item_qty = item["qty"],
-            cell = item["cell"],
-            pad = item["pad"],
-            map_name = item["map_name"],
-            farming_logger=True,
-            is_temp=True
-        )
+    await do_farm_tasks(cmd, [FarmTask(**item) for item in item_to_farm])
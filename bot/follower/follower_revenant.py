@@ -1,6 +1,6 @@
 from core.bot import Bot
 from core.command import Command
-import json
+from core.event_bus import Packet
 from colorama import Fore
 
 is_locked_zone = False
@@ -20,7 +20,7 @@ async def main(cmd: Command):
     ]
     index_count = 0
 
-    cmd.bot.subscribe(message_handler)
+    cmd.bot.events.subscribe(message_handler, cmds="warning")
 
     while cmd.is_still_connected():
         if is_locked_zone:
@@ -38,19 +38,9 @@ async def main(cmd: Command):
             skill_index = 0
         await cmd.sleep(100)
 
-def message_handler(message):
+def message_handler(packet: Packet):
     global is_locked_zone
-    if message:
-        if message.startswith("%") and message.endswith("%"):
-            if "locked zone" in message.lower():
-                msg = message.split('%')
-                text = msg[4]
-                print(Fore.RED + f"server warning: {text}" + Fore.WHITE)
-                is_locked_zone = True
-
-def is_valid_json(s):
-    try:
-        json.loads(s)
-        return True
-    except json.JSONDecodeError:
-        return False
\ No newline at end of file
+    text = packet.parts[4] if packet.parts and len(packet.parts) > 4 else ""
+    if "locked zone" in text.lower():
+        print(Fore.RED + f"server warning: {text}" + Fore.WHITE)
+        is_locked_zone = True
\ No newline at end of file
@@ -3,9 +3,9 @@ this just example, not actually do malgor
 """
 
 
-import json
 from core.bot import Bot
 from core.command import Command
+from core.event_bus import Packet
 from colorama import Fore
 
 speaker_counter = 0
@@ -26,7 +26,7 @@ async def main(bot: Bot):
     skill_list = [0,2,0,3,4,1]
     skill_index = 0
 
-    bot.subscribe(message_handler)
+    bot.events.subscribe(message_handler, cmds=["ct", "event"])
 
     while cmd.is_monster_alive("The First Speaker") and cmd.is_still_connected():
         mons_hp = cmd.get_monster_hp("The First Speaker")
@@ -56,16 +56,11 @@ async def main(bot: Bot):
     await cmd.sleep(100000)
 
 
-def message_handler(message):
+def message_handler(packet: Packet):
     global speaker_counter
-    if message:
-        if is_valid_json(message):
-            data = json.loads(message)
-        try:
-            data = data["b"]["o"]
-        except:
-            return
-        cmd = data["cmd"]
+    data = packet.data
+    if data:
+        cmd = packet.cmd
         if cmd == "ct":
             anims = data.get("anims")
             if anims:
@@ -110,10 +105,3 @@ def malgorHandler():
         return ("Lord Of Order", "Verus DoomKnight", "IN", 500)
     
     return (None, None, None, 0)
-
-def is_valid_json(s):
-    try:
-        json.loads(s)
-        return True
-    except json.JSONDecodeError:
-        return False
\ No newline at end of file
@@ -1,10 +1,9 @@
 from datetime import datetime
 import time
 import asyncio
-import json
 from collections import deque
-from core.utils import is_valid_json
 from core.command import Command
+from core.event_bus import Packet
 from colorama import Fore
 import colorama
 
@@ -58,7 +57,7 @@ class AscendEclipseBot:
         self.skill_index = 0
 
         # subscribe ke event
-        self.cmd.bot.subscribe(self.handle_message)
+        self.cmd.bot.events.subscribe(self.handle_message, cmds=["pi", "ct"])
 
     def print_debug(self, message, color=Fore.YELLOW):
         print(color + f"[{datetime.now().strftime('%H:%M:%S')}] [{self.cmd.bot.player.CELL}] {message}" + Fore.RESET)
@@ -104,12 +103,10 @@ class AscendEclipseBot:
             return count % 2 == 0
         return False
 
-    def handle_message(self, message):
-        if not message or not is_valid_json(message):
-            return
+    def handle_message(self, packet: Packet):
         try:
-            data = json.loads(message)["b"]["o"]
-            cmdData = data["cmd"]
+            data = packet.data
+            cmdData = packet.cmd
 
             if cmdData == "pi":
                 self.pid = data.get("pid")
@@ -139,16 +136,16 @@ class AscendEclipseBot:
                     # Create 5 seconds delayed taunt
                     if aura.get("nam") == "Sun's Warmth" and self.sunset_knight_taunter:
                         async def delayed_taunt():
-                            await asyncio.sleep(5)
+                            await self.cmd.sleep(5000)
                             self.taunt_target = "Sunset Knight"
                             self.do_taunt = True
-                        asyncio.create_task(delayed_taunt())
+                        self.cmd.spawn(delayed_taunt())
                     if aura.get("nam") == "Moonlight Gaze" and self.moon_haze_taunter:
                         async def delayed_taunt():
-                            await asyncio.sleep(5)
+                            await self.cmd.sleep(5000)
                             self.taunt_target = "Moon Haze"
                             self.do_taunt = True
-                        asyncio.create_task(delayed_taunt())
+                        self.cmd.spawn(delayed_taunt())
 
     def _parse_anims(self, anims):
         if not anims:
@@ -209,8 +206,7 @@ class AscendEclipseBot:
             if self.role == "slave":
                 await self.go_to_master()
                 
-            while not self.cmd.wait_count_player(4):  # ganti 4 sesuai jumlah slave
-                await self.cmd.sleep(100)
+            await self.cmd.wait_for_players(4)  # ganti 4 sesuai jumlah slave
 
             master = self.cmd.get_player_in_map(self.cmd.bot.follow_player)
             check_master_in_cell = self.role == "master" or (master and master.str_frame == self.cmd.bot.player.CELL)
@@ -316,8 +312,7 @@ class EclipseMasterBot(AscendEclipseBot):
         await self.cmd.sleep(4000)
 
         self.print_debug("Waiting for all slaves to be online...")
-        while not self.cmd.wait_count_player(4):  # ganti 4 sesuai jumlah slave
-            await self.cmd.sleep(100)
+        await self.cmd.wait_for_players(4)  # ganti 4 sesuai jumlah slave
 
         for slave in self.cmd.bot.slaves_player:
             await self.cmd.send_packet(f"%xt%zm%gp%1%pi%{slave}%")
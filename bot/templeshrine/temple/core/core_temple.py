@@ -1,10 +1,9 @@
 import asyncio
 import time
-import json
 from datetime import datetime
 from colorama import Fore
 from core.command import Command
-from core.utils import is_valid_json
+from core.event_bus import Packet
 
 
 class CoreTempleBot:
@@ -27,18 +26,16 @@ class CoreTempleBot:
         self.is_attacking = False
 
         # subscribe ke event
-        self.cmd.bot.subscribe(self.msg_handler)
+        self.cmd.bot.events.subscribe(self.msg_handler, cmds=["pi", "ct"])
 
     def print_debug(self, message):
         print(f"[{datetime.now().strftime('%H:%M:%S')}] "
               f"[{self.cmd.get_player.CELL}] {Fore.YELLOW}{message}{Fore.RESET}")
 
-    def msg_handler(self, message):
-        if not message or not is_valid_json(message):
-            return
+    def msg_handler(self, packet: Packet):
         try:
-            data = json.loads(message)["b"]["o"]
-            cmd = data["cmd"]
+            data = packet.data
+            cmd = packet.cmd
 
             if cmd == "pi":
                 self.pid = data.get("pid")
@@ -55,10 +52,10 @@ class CoreTempleBot:
                                     if aura.get("nam") == "Sun's Warmth":
                                         # Create 5 seconds delayed taunt
                                         async def delayed_taunt():
-                                            await asyncio.sleep(5)
+                                            await self.cmd.sleep(5000)
                                             self.target_monsters = "Dawn Knight"
                                             self.do_taunt = True
-                                        asyncio.create_task(delayed_taunt())
+                                        self.cmd.spawn(delayed_taunt())
                 if anims:
                     for anim in anims:
                         msg = anim.get("msg")
@@ -1,6 +1,6 @@
 from core.bot import Bot
 from core.command import Command
-import json
+from core.event_bus import Packet
 
 counter_attack = False
 async def main(cmd: Command):
@@ -22,7 +22,7 @@ async def main(cmd: Command):
     skill_list = [0,1,2,0,3,4]
     skill_index = 0
 
-    cmd.bot.subscribe(message_handler)
+    cmd.bot.events.subscribe(message_handler, cmds="ct")
 
     while cmd.is_monster_alive("Ultra Ezrajal") and cmd.is_still_connected():
         mons_hp = cmd.get_monster_hp("Ultra Ezrajal")
@@ -52,17 +52,11 @@ async def main(cmd: Command):
     print("finished ultra ezrajal")
     await cmd.sleep(100000)
 
-def message_handler(message):
+def message_handler(packet: Packet):
     global counter_attack
-    if message:
-        if is_valid_json(message):
-            data = json.loads(message)
-        try:
-            data = data["b"]["o"]
-        except:
-            return
-        cmd = data["cmd"]
-        if cmd == "ct":
+    data = packet.data
+    if data:
+        if packet.cmd == "ct":
             anims = data.get("anims")
             a = data.get("a")
             if anims:
@@ -78,11 +72,4 @@ def message_handler(message):
                         removed_aura = action.get('aura', {}).get('nam')
                         if "Counter Attack" in removed_aura:
                             counter_attack = False
-                            print("Counter Attack", counter_attack)
-
-def is_valid_json(s):
-    try:
-        json.loads(s)
-        return True
-    except json.JSONDecodeError:
-        return False
\ No newline at end of file
+                            print("Counter Attack", counter_attack)
\ No newline at end of file
@@ -1,6 +1,8 @@
 from core.bot import Bot
 from core.command import Command
-import time, json
+from core.class_profile import get_class_profile
+from core.event_bus import Packet
+import time
 from datetime import datetime, timedelta
 
 # SETUP MANUALLY
@@ -52,11 +54,14 @@ async def main(cmd: Command):
     skill_index = 0
     skill_list = [0,1,2,0,3,4]
 
-    cmd.bot.subscribe(message_handler)
+    cmd.bot.events.subscribe(message_handler, cmds="ct")
 
     start_time = time.time()
     print("attacking...")
     equipped_class = cmd.get_equipped_class().item_name.lower()
+    # taunt skill per class comes from core/data/class_profiles.json, the Enrage scroll slot otherwise
+    profile = get_class_profile(equipped_class)
+    taunt_skill = profile.taunt_skill if profile and profile.taunt_skill is not None else 5
 
     if equipped_class == "obsidian paladin chronomancer" or equipped_class == "stonecrusher":
         priority = ["id.2", "id.3"]
@@ -70,7 +75,7 @@ async def main(cmd: Command):
                 print(f"{prio}: {mons_hp} : {cmd.get_monster_hp_percentage(prio)}%")
             if force_taunt:
                 await cmd.sleep(1000)
-                await cmd.use_skill(5, prio)
+                await cmd.use_skill(taunt_skill, prio)
                 print(f"{equipped_class} taunt 2")
                 force_taunt = False
                 continue
@@ -95,7 +100,7 @@ async def main(cmd: Command):
                 wait_taunt = False
         if force_taunt:
             await cmd.sleep(1200)
-            await cmd.use_skill(5, "Gramiel The Graceful")
+            await cmd.use_skill(taunt_skill, "Gramiel The Graceful")
             print(f"{equipped_class} taunt Gramiel The Graceful")
             force_taunt = False
             continue
@@ -116,18 +121,12 @@ async def main(cmd: Command):
         await cmd.sleep(1000)
     cmd.stop_bot("finished Gramiel The Graceful")
 
-def message_handler(message):
+def message_handler(packet: Packet):
     global LTaunt, RTaunt, LTauntClass, RTauntClass, force_taunt, cmdGlobal, taunter_list, taunter_index, wait_taunt, taunt_date
     cmdG: Command = cmdGlobal
-    if message:
-        if is_valid_json(message):
-            data = json.loads(message)
-        try:
-            data = data["b"]["o"]
-        except:
-            return
-        cmd = data["cmd"]
-        if cmd == "ct":
+    data = packet.data
+    if data:
+        if packet.cmd == "ct":
             anims = data.get("anims")
             if anims:
                 for anim in anims:
@@ -162,10 +161,3 @@ def message_handler(message):
                             if equipped_class == taunter_list[taunter_index]:
                                 wait_taunt = True
                                 taunt_date = datetime.now() + timedelta(seconds=4)
-
-def is_valid_json(s):
-    try:
-        json.loads(s)
-        return True
-    except json.JSONDecodeError:
-        return False
\ No newline at end of file
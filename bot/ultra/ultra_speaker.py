@@ -1,6 +1,9 @@
-﻿import json
-from core.bot import Bot
+﻿from core.bot import Bot
 from core.command import Command
+from core.event_bus import Packet
+from core.rotation import Rotation, RotationEngine
+from core.class_profile import ClassProfile, get_class_profile
+from typing import Optional
 from colorama import Fore
 import time
 
@@ -20,46 +23,22 @@ equipped_class = ""
 async def main(cmd: Command):
     global speaker_counter, taunter_class, zone_class, what_zone, force_taunt, force_skill, skill_to_force, in_zone, force_heal, skill_to_heal, equipped_class
 
-    # fill weapon, helm, cape with item name
-    equipment = {
-        "legion revenant": {
-            "class": "Legion Revenant",  # Arcana
-            "weapon": "",  # Wizard
-            "helm": "",  # Wizard
-            "cape": ""  # Penitence
-        },
-        "archpaladin": {
-            "class": "ArchPaladin",  # Lace
-            "weapon": "",  # Luck
-            "helm": "",  # Luck
-            "cape": ""  # Penitence
-        },
-        "lord of order": {
-            "class": "Lord of Order",  # Valiance
-            "weapon": "",  # Luck
-            "helm": "",  # Luck
-            "cape": ""  # Penitence
-        },
-        "verus doomknight": {
-            "class": "Verus DoomKnight",  # Dauntless
-            "weapon": "",  # Luck
-            "helm": "",  # Anima
-            "cape": ""  # Penitence
-        }
-    }
-    
-    # will equip item base on the class you set for soloClass
-    await equip_items(cmd, cmd.bot.soloClass, equipment)
+    # weapon, helm and cape per class come from core/data/class_profiles.json
+    profile = get_class_profile(cmd.bot.soloClass)
+    await equip_items(cmd, cmd.bot.soloClass, profile)
     
     private_room_number = 9909
     
     await cmd.equip_scroll("Scroll of Enrage")
 
+    # accounts started from the same process wake each other instead of polling
+    cmd.join_party("ultraspeaker")
+
     await cmd.accept_quest(9173)
     await cmd.join_map("ultraspeaker", private_room_number)
 
-    while not cmd.wait_count_player(4):
-        await cmd.sleep(100)
+    # counts the room as well as the party, so accounts from other processes count too
+    await cmd.wait_for_players(4)
     
     await cmd.use_skill(1)
     await cmd.sleep(1000)
@@ -69,20 +48,13 @@ async def main(cmd: Command):
     await cmd.sleep(1000)
     await cmd.jump_cell("Boss", "Left")
 
-    # skill_list = [0,2,0,3,4] if bot.soloClass.lower() == "legion revenant" else [0,1,2,0,3,4]
-    if cmd.bot.soloClass.lower() == "legion revenant":
-        skill_list = [0,2,0,3,4]
-    if cmd.bot.soloClass.lower() == "archpaladin":
-        skill_list = [0,1,2,0,3,4]
-    if cmd.bot.soloClass.lower() == "lord of order":
-        skill_list = [0,1,2,0,3,4]
-    if cmd.bot.soloClass.lower() == "verus doomknight":
-        skill_list = [0,1,2,0,3,4]
-    skill_index = 0
+    rotation = profile.rotation_for("ultraspeaker") if profile else None
+    engine = RotationEngine(cmd, rotation or Rotation.from_list([0,1,2,0,3,4]), "The First Speaker")
 
     # asyncio.create_task(message_handler(cmd=cmd))
-    cmd.bot.subscribe(message_handler)
+    cmd.bot.events.subscribe(message_handler, cmds=["ct", "event"])
     equipped_class = cmd.get_equipped_class().item_name.lower()
+    taunt_skill = profile.taunt_skill if profile and profile.taunt_skill is not None else 5
 
     counter = 0
 
@@ -108,14 +80,14 @@ async def main(cmd: Command):
                 continue
         
         if force_taunt:
-            if not cmd.bot.player.canUseSkill(5):
+            if not cmd.bot.player.canUseSkill(taunt_skill):
                 await cmd.sleep(100)
                 continue
             print(equipped_class, "taunt")
             force_taunt = False
             taunter_class = None
             # await cmd.sleep(500)
-            await cmd.use_skill(5, scroll_id=12917)
+            await cmd.use_skill(taunt_skill, scroll_id=12917)
 
         if force_heal:
             force_heal = False
@@ -148,21 +120,11 @@ async def main(cmd: Command):
         # if cmd.bot.player.getPlayerPositionXY()[0] != 100:
         #     await cmd.walk_to(100, 321)
         
-        if cmd.hp_below_percentage(60):
-            equipped_class = cmd.get_equipped_class()
-            if equipped_class:
-                class_name = equipped_class.item_name.lower()
-                if class_name == "archpaladin" or class_name == "lord of order":
-                    await cmd.use_skill(2)
-                elif class_name == "legion revenant":
-                    await cmd.use_skill(3)
+        if cmd.hp_below_percentage(60) and profile and profile.heal_skill is not None:
+            await cmd.use_skill(profile.heal_skill)
 
         # await cmd.use_skill(5, scroll_id=12917)
-        await cmd.use_skill(skill_list[skill_index], "The First Speaker")
-        skill_index += 1
-        if skill_index >= len(skill_list):
-            skill_index = 0
-        await cmd.sleep(100)
+        await engine.cast_next(max_wait=0.1)
     elapsed_time = time.time() - start_time  # Calculate elapsed time
 
     # Convert to minutes and seconds
@@ -177,26 +139,20 @@ async def main(cmd: Command):
     print("finished ultra speaker")
     await cmd.sleep(100000)
 
-async def equip_items(cmd: Command, class_name: str, equipment: dict):
-    class_name = class_name.lower()
-    
-    if class_name in equipment:
-        items = equipment[class_name]
-        await cmd.equip_item(items["class"])
-        await cmd.equip_item(items["weapon"])
-        await cmd.equip_item(items["helm"])
-        await cmd.equip_item(items["cape"])
+async def equip_items(cmd: Command, class_name: str, profile: Optional[ClassProfile]):
+    if not profile:
+        return
+    await cmd.equip_item(class_name)
+    for slot in ("weapon", "helm", "cape"):
+        item_name = profile.equipment.get(slot)
+        if item_name:
+            await cmd.equip_item(item_name)
 
-def message_handler(message):
+def message_handler(packet: Packet):
     global speaker_counter, taunter_class, zone_class, what_zone, force_skill, skill_to_force, force_heal, skill_to_heal,equipped_class
-    if message:
-        if is_valid_json(message):
-            data = json.loads(message)
-        try:
-            data = data["b"]["o"]
-        except:
-            return
-        cmd = data["cmd"]
+    data = packet.data
+    if data:
+        cmd = packet.cmd
         if cmd == "ct":
             anims = data.get("anims")
             p = data.get("p")
@@ -211,14 +167,10 @@ def message_handler(message):
                                     equipped_class = equipped_class.item_name.lower()
                                 except:
                                     equipped_class = equipped_class.lower()
-                                if equipped_class:
-                                    class_name = equipped_class
-                                    if class_name == "archpaladin" or class_name == "lord of order":
-                                        skill_to_heal = 2
-                                        force_heal = True
-                                    elif class_name == "legion revenant":
-                                        skill_to_heal = 3
-                                        force_heal = True
+                                heal_profile = get_class_profile(equipped_class)
+                                if heal_profile and heal_profile.heal_skill is not None:
+                                    skill_to_heal = heal_profile.heal_skill
+                                    force_heal = True
             if anims:
                 for anim in anims:
                     msg = anim.get("msg")
@@ -269,9 +221,3 @@ def malgorHandler():
     
     return (None, None, None, 0)
 
-def is_valid_json(s):
-    try:
-        json.loads(s)
-        return True
-    except json.JSONDecodeError:
-        return False
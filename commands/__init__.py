@@ -6,6 +6,7 @@ from .sleep_cmd import SleepCmd
 from .use_skill_cmd import UseSkillCmd
 from .walk_cmd import WalkCmd
 from .accept_quest_cmd import AcceptQuestCmd
+from .accept_quest_bulk_cmd import AcceptQuestBulkCmd
 from .turnin_quest_cmd import TurnInQuestCmd
 from .up_index_cmd import UpIndexCmd
 from .down_index_cmd import DownIndexCmd
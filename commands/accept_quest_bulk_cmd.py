@@ -0,0 +1,16 @@
+from core.bot import Bot
+from core.command import Command
+from abstracts.base_command import BaseCommand
+
+class AcceptQuestBulkCmd(BaseCommand):
+    
+    def __init__(self, quest_id: int, increment: int):
+        self.quest_id = quest_id
+        self.increment = increment
+    
+    async def execute(self, bot: Bot, cmd: Command):
+        # Send every accept back to back; the replies are handled by the command loop.
+        await bot.quest_probe.send_accepts(range(self.quest_id, self.quest_id + self.increment))
+        
+    def to_string(self):
+        return f"Accept quest : {self.quest_id} - {self.quest_id + self.increment - 1}"
@@ -9,7 +9,7 @@ class RegisterQuestCmd(BaseCommand):
     
     async def execute(self, bot: Bot, cmd: Command):
         if self.questId not in bot.registered_auto_quest_ids:
-            bot.registered_auto_quest_ids.append(self.questId)
+            bot.quest_tracker.register(self.questId)
             bot.accept_quest(self.questId)
         
     def to_string(self):
@@ -8,7 +8,7 @@ class WaitPlayerCountCmd(BaseCommand):
         self.playerCount = playerCount
     
     async def execute(self, bot: Bot, cmd: Command):
-        if len(bot.user_ids) < self.playerCount:
+        if bot.room.user_count < self.playerCount:
             bot.index -= 1
         
     def to_string(self):
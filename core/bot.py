@@ -1,10 +1,10 @@
+import os
 import socket
 from core.command import Command
 from core.player import Player
 from core.utils import normalize
-import json
 import time
-from typing import Awaitable, Callable, List, Optional
+from typing import Awaitable, Callable, Dict, List, Optional
 from xml.etree import ElementTree
 import xml.etree.ElementTree as ET
 from datetime import datetime, timedelta
@@ -13,10 +13,38 @@ import inspect
 import asyncio
 from model import Shop
 from model import Monster
-from model import ItemInventory, ItemType, Faction, PlayerArea
+from model import ItemInventory, ItemType, Faction, PlayerArea, RoomRoster
 from handlers import register_quest_task, death_handler_task, aggro_handler_task
+from core.logger import BotLogger, DEBUG, INFO, parse_level
+from core.event_bus import EventBus, Packet, PacketKind
+from core.quest_tracker import QuestTracker
+from core.quest_probe import QuestProbe
+from core.party_bus import PartyBus
+from core.session import ReconnectPolicy, SessionSnapshot
+from core.checkpoint import CheckpointStore
+from core.clock import Clock, get_clock
+from core.drop_rules import DropRules
+from core.outbound import OutboundWriter
+from core.packets import PacketBuilder
+from core.packet_log import DEFAULT_MAX_BYTES, DEFAULT_MAX_FRAMES, PacketRing
+from core.trace import Tracer, packet_name
+from core.profiler import current_bot
+from core.script_scope import ScriptScope, current_scope
+from core import codec, resolver
 import time
 import traceback
+
+CONNECT_TIMEOUT = 15
+
+# JSON cmd -> Bot handler coroutine, filled by @_handles on the _on_* methods of Bot.
+_JSON_HANDLERS: Dict[str, Callable[..., Awaitable[None]]] = {}
+
+
+def _handles(cmd: str):
+    def register(func):
+        _JSON_HANDLERS[cmd] = func
+        return func
+    return register
     
 class Bot:
 
@@ -37,14 +65,29 @@ class Bot:
             restartOnAFK: bool = True,
             autoAdjustSkillDelay: bool = False,
             respawnCellPad: List[str] = [],
-            muteSpamWarning: bool = False
+            muteSpamWarning: bool = False,
+            logLevel: Optional[str] = None,
+            clock: Optional[Clock] = None,
+            packetLogFrames: int = DEFAULT_MAX_FRAMES,
+            packetLogBytes: int = DEFAULT_MAX_BYTES,
+            trace: Optional[bool] = None
             ):
+        self.clock = clock or get_clock()
+        # TRACE_DIR in the environment turns tracing on for every bot
+        self.tracer = Tracer(enabled=bool(os.getenv("TRACE_DIR")) if trace is None else trace, clock=self.clock.monotonic)
+        self.packet_log = PacketRing(max_frames=packetLogFrames, max_bytes=packetLogBytes, clock=self.clock.time)
+        self.log = BotLogger(level=parse_level(logLevel, DEBUG if showDebug else INFO))
+        self.events = EventBus(self.log)
         self.roomNumber = roomNumber
         self.showLog = showLog
         self.cmdDelay = cmdDelay
-        self.showDebug = showDebug
         self.showChat = showChat
-        self.items_drop_whitelist: list[str] = itemsDropWhiteList
+        self.drop_rules = DropRules(itemsDropWhiteList)
+        self.writer = OutboundWriter()
+        self.writer.ring = self.packet_log
+        self.writer.on_error = self._write_failed
+        self.packets = PacketBuilder()
+        self.packets_skipped = 0
         self.auto_relogin = autoRelogin
         self.follow_player = followPlayer
         self.slaves_player = slavesPlayer
@@ -55,14 +98,18 @@ class Bot:
         self.respawn_cell_pad = respawnCellPad
         self.mute_spam_warning = muteSpamWarning
 
-        self.auto_relogin = False # sementara diset ke False untuk cegah stop_bot() di function read_server_in_background()
+        self.reconnect_policy = ReconnectPolicy()
+        self.reconnect_attempt = 0
+        self.resume_session: Optional[SessionSnapshot] = None
+        self.checkpoints: Optional[CheckpointStore] = None
+        self._checkpoint_script: Optional[str] = None
         
         self.is_char_load_complete= False
         self.is_joining_map = False
         self.is_client_connected = False
         
         self.wait_ms = 0
-        self.player = Player()
+        self.player = Player(self.clock)
         self.cmds = []
         self.index = 0
         self.areaId = None
@@ -81,9 +128,12 @@ class Bot:
         self.aggro_delay_ms = 500
         self.loaded_shop_datas: List[Shop] = []
         self.registered_auto_quest_ids = []
+        self.quest_tracker = QuestTracker(self)
+        self.quest_probe = QuestProbe(self)
         self.is_register_quest_task_running = False
         self.is_aggro_handler_task_running = False
         self.followed_player_cell = None
+        self.party: Optional[PartyBus] = None
         self.subscribers = []
         self.scroll_id: str = ""
         self.battle_analyzer: bool = False
@@ -96,16 +146,36 @@ class Bot:
         self.missing_turn_in_item_questid: list[int] = [] # this mean quest is unlocked (green quest)
         self.missing_quest_progress_questid: list[int] = [] # this mean quest is locked (red quest)
 
-        self.player_in_area: list[PlayerArea] = []
+        self.room = RoomRoster()
 
         self.bot_main = None
-        self.command = Command(self, init_handler=True)
+        self.script_task: Optional[asyncio.Task] = None
+        self.script_scope: Optional[ScriptScope] = None
+        self._next_script = None
+        self.command = Command(self)
+        if self.tracer.enabled:
+            self.tracer.instrument(self.command, "command")
+
+    @property
+    def showDebug(self) -> bool:
+        return self.log.is_enabled_for(DEBUG)
+
+    @showDebug.setter
+    def showDebug(self, value: bool):
+        self.log.set_level(DEBUG if value else INFO)
 
     def subscribe(self, callback):
-        """Subscribe to messages."""
+        """Subscribe to raw message strings.
+
+        Prefer ``bot.events.subscribe(handler, cmds=...)``, which filters by cmd
+        and hands over the already-decoded :class:`Packet`.
+        """
         if callable(callback):
             if callback not in self.subscribers:
                 self.subscribers.append(callback)
+                scope = current_scope.get()
+                if scope is not None:
+                    scope.callbacks.append(callback)
 
     def unsubscribe(self, callback):
         """Unsubscribe from messages."""
@@ -118,35 +188,104 @@ class Bot:
             subscriber(message)
         
     def set_login_info(self, username, password, server):
+        self.packet_log.name = username
+        self.tracer.name = username
         self.username = username
         self.password = password
         self.server = server
+        self.log.set_name(username)
         
     async def start_bot(self, botMain: Optional[Callable[[Command], Awaitable[None]]] = None):
+        current_bot.set(self.username)  # profiler samples of this task and its children go to this bot
         self.login(self.username, self.password, self.server)
-        if self.server_info:
-            await self.connect_client()
+        if not self.server_info:
+            if self.auto_relogin and self.reconnect_attempt > 0:
+                await self.relogin_and_restart(async_bot=botMain)
+            return
+        else:
+            try:
+                await self.connect_client()
+            except OSError as e:
+                self.log.error("Connect failed: %s", e)
+                if self.auto_relogin:
+                    await self.relogin_and_restart(async_bot=botMain)
+                return
             if self.isScriptable and botMain:
                 self.bot_main = botMain
+                self.use_script_checkpoints(botMain)
                 asyncio.create_task(self.read_server_in_background())
 
+                finished = False
                 while self.is_client_connected:
                     while self.is_char_load_complete is False:
-                        await asyncio.sleep(0.01)
+                        await self.clock.sleep(0.01)
+                    self.reconnect_attempt = 0
                     
                     if not self.is_register_quest_task_running:
                         self.run_register_quest_task()
                         self.is_register_quest_task_running = True
+
+                    if self.resume_session:
+                        await self.resume_last_session()
                     
-                    await botMain(self.command)
+                    try:
+                        await self.run_script(self.bot_main)
+                    except Exception as e:
+                        self.dump_packets(f"crash: {e!r}")
+                        raise
+                    if self.is_client_connected:
+                        # the script ran to the end, next run starts from the top
+                        finished = True
+                        self.checkpoints.clear()
                     self.stop_bot()
                 if self.auto_relogin:
-                    print("Relogin from start bot")
-                    await self.relogin_and_restart(async_bot=self.bot_main)
+                    self.log.info("Relogin from start bot")
+                    await self.relogin_and_restart(async_bot=self.bot_main, resume=not finished)
             else:
                 await self.run_commands()
         return
             
+    def use_script_checkpoints(self, botMain) -> None:
+        """Point ``self.checkpoints`` at the store of ``botMain``'s script."""
+        script = f"{getattr(botMain, '__module__', '')}.{getattr(botMain, '__qualname__', 'main')}"
+        if self.checkpoints is None or self._checkpoint_script != script:
+            self.checkpoints = CheckpointStore.for_script(self.username, script)
+            self._checkpoint_script = script
+
+    async def run_script(self, botMain) -> None:
+        """Run ``botMain`` as its own task, following any :meth:`replace_script` until one finishes.
+
+        Whatever a run subscribed, joined or spawned (its :class:`ScriptScope`)
+        is torn down when it ends, before the next script starts.
+        """
+        while True:
+            self.script_scope = ScriptScope()
+            self.script_task = self.script_scope.start(botMain(self.command), name=f"{self.username}:script")
+            try:
+                await self.script_task
+                return
+            except asyncio.CancelledError:
+                botMain, self._next_script = self._next_script, None
+                if botMain is None:
+                    raise
+            finally:
+                self.script_scope.close(self)
+                self.script_scope = None
+            self.bot_main = botMain
+            self.use_script_checkpoints(botMain)
+            self.log.info("Script replaced, starting %s", getattr(botMain, "__module__", botMain), color=Fore.YELLOW)
+
+    def replace_script(self, botMain) -> None:
+        """Cancel the running script and start ``botMain`` on this session without a relogin.
+
+        When no script is running, ``botMain`` is used from the next (re)start.
+        """
+        if self.script_task is None or self.script_task.done():
+            self.bot_main = botMain
+            return
+        self._next_script = botMain
+        self.script_task.cancel()
+
     def run_register_quest_task(self):
         asyncio.create_task(register_quest_task(self))  
     
@@ -157,59 +296,132 @@ class Bot:
         asyncio.create_task(aggro_handler_task(self))
     
     def stop_bot(self):
-        print(f"[{datetime.now().strftime('%H:%M:%S')}] Stopping bot...")
+        self.log.info("Stopping bot...")
+        self.dump_packets("stop_bot", force=False)
+        self.export_trace()
         self.is_client_connected = False
         if self.client_socket:
             self.client_socket.close()
 
+    def dump_packets(self, reason: str = "", force: bool = True) -> Optional[str]:
+        """Write the recent inbound/outbound frames to a file and return its path."""
+        try:
+            path = self.packet_log.dump(reason, force=force)
+        except OSError as e:
+            self.log.error("Packet dump failed: %s", e)
+            return None
+        if path:
+            self.log.info("Packet dump (%s) written to %s", reason, path)
+        return path
+
+    def export_trace(self) -> Optional[str]:
+        """Write the recorded timeline to ``TRACE_DIR`` as Chrome trace JSON and start a new one."""
+        if not self.tracer.enabled:
+            return None
+        try:
+            path = self.tracer.export()
+        except OSError as e:
+            self.log.error("Trace export failed: %s", e)
+            return None
+        self.tracer.clear()
+        if path:
+            self.log.info("Trace written to %s", path)
+        return path
+
     def debug(self, *args):
-        if not self.showDebug:
+        if not self.log.is_enabled_for(DEBUG):
             return
         caller_frame = inspect.currentframe().f_back
         caller_name = caller_frame.f_code.co_name
-        combined_message = ' '.join(map(str, args))
-        print(f"[{datetime.now().strftime('%H:%M:%S')}] [{caller_name}] {combined_message}")
+        self.log.debug("[%s] %s", caller_name, ' '.join(map(str, args)))
 
     def login(self, username, password, server):
-        if self.player.login(username, password):
-            self.server_info = self.player.getServerInfo(server)
+        self.server_info = []
+        try:
+            if self.player.login(username, password):
+                self.server_info = self.player.getServerInfo(server)
+                # one lookup per game server for the whole fleet, done before the other bots connect
+                resolver.get_resolver().prefetch(s["sIP"] for s in self.player.SERVERS)
+        except Exception as e:
+            self.log.error("Login request failed: %s", e)
             
-    async def relogin_and_restart(self, async_bot= None):
+    async def relogin_and_restart(self, async_bot= None, resume: bool = True):
+        if not resume:
+            self.resume_session = None
+        elif self.is_char_load_complete:
+            self.resume_session = SessionSnapshot.capture(self) or self.resume_session
         self.stop_bot()
         self.index = 0
         self.is_char_load_complete = False
         self.is_joining_map = False
         self.is_register_quest_task_running = False
+        # Accepted quests do not survive the session; loaded_quest_datas doubles as the
+        # "in progress" list, so it is cleared. Shop data, registered quests and their
+        # turn-in index are static and reused, and registered quests are re-accepted.
         self.loaded_quest_datas = []
-        self.loaded_shop_datas: List[Shop] = []
-        self.registered_auto_quest_ids = []
+        # an empty bank makes initUserDatas reload bank and inventory on the new session
+        self.player.BANK = []
+        self.player.TEMPINVENTORY = []
         self.skill_delay_ms = 1500
         self.adjust_skill_delay_by_ms = 500
         self.check_spam_time = None
+        if self.reconnect_policy.gives_up(self.reconnect_attempt):
+            self.log.error("Giving up after %s reconnect attempts.", self.reconnect_attempt)
+            return
+        delay = self.reconnect_policy.delay(self.reconnect_attempt)
+        self.reconnect_attempt += 1
         try:
-            print("Restarting bot in 35 secs...")
-            await asyncio.sleep(35)
+            self.log.info("Reconnecting in %.0f secs (attempt %s)...", delay, self.reconnect_attempt)
+            await self.clock.sleep(delay)
             if self.isScriptable and async_bot and self.auto_relogin:
                 await self.start_bot(async_bot)
             else:
                 await self.start_bot()
         except Exception as e:
-            print(f"Error during restarting bot: {e}")
+            self.log.error("Error during restarting bot: %s", e)
         
+    async def resume_last_session(self, timeout: float = 15):
+        """Go back to the map, room and cell the bot was in before it reconnected."""
+        session = self.resume_session
+        self.resume_session = None
+        if not session or not self.is_client_connected:
+            return
+        self.log.info("Resuming at %s", session)
+        if self.strMapName.lower() != session.map_name.lower():
+            await self.command.join_map(session.map_name, session.room_number)
+            waited = 0.0
+            while self.is_client_connected and self.strMapName.lower() != session.map_name.lower() and waited < timeout:
+                await self.clock.sleep(0.2)
+                waited += 0.2
+        if session.cell and self.strMapName.lower() == session.map_name.lower():
+            self.jump_cell(session.cell, session.pad or "Left")
+
     async def connect_client(self):
         hostname = self.server_info[0] 
         port = self.server_info[1]
         self.debug(hostname, port)
-        host_ip = socket.gethostbyname(hostname)
-        print(f"Connecting to {self.server} server...")
+        host_ip = await resolver.resolve(hostname, port)
+        self.log.info("Connecting to %s server...", self.server)
         self.client_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        self.client_socket.connect((host_ip, port))
+        # connect without blocking the loop, the other bots keep running meanwhile
+        self.client_socket.setblocking(False)
+        try:
+            await asyncio.wait_for(asyncio.get_running_loop().sock_connect(self.client_socket, (host_ip, port)),
+                                   CONNECT_TIMEOUT)
+        except (OSError, asyncio.TimeoutError) as e:
+            self.client_socket.close()
+            resolver.get_resolver().invalidate(hostname)
+            if isinstance(e, OSError):
+                raise
+            raise socket.timeout(f"connect to {hostname}:{port} timed out") from e
+        self.client_socket.setblocking(True)
+        self.writer.attach(self.client_socket)
         self.is_client_connected = True
 
     async def run_commands(self):    
         if self.is_client_connected:
             # self.print_commands()
-            print("Running bot commands...")
+            self.log.info("Running bot commands...")
         while self.is_client_connected:
             if self.registered_auto_quest_ids and not self.is_register_quest_task_running:
                 self.run_register_quest_task()
@@ -220,10 +432,14 @@ class Bot:
                     try:
                         await self.handle_server_response(msg)
                     except Exception as e:
-                        print(f"err: {e}")
+                        self.log.error("err: %s", e)
                     
             # do wait if any,its different than cmdDelay
-            await asyncio.sleep(self.wait_ms)
+            if self.wait_ms:
+                with self.tracer.span("wait_ms", "wait"):
+                    await self.clock.sleep(self.wait_ms)
+            else:
+                await self.clock.sleep(0)
             self.wait_ms = 0
             
             if self.player.ISDEAD:
@@ -239,16 +455,16 @@ class Bot:
                     continue
                 if self.follow_player and self.followed_player_cell != self.player.CELL:
                     await self.goto_player(self.follow_player)
-                    await asyncio.sleep(1)
+                    await self.clock.sleep(1)
                     continue                
                 if self.index >= len(self.cmds):
                     self.index = 0                
                 cmd = self.cmds[self.index]
                 await self.handle_command(cmd)
                 self.index += 1
-        print('BOT STOPPED\n')
+        self.log.info('BOT STOPPED')
         if self.auto_relogin:
-            print("relogin from run commands")
+            self.log.info("relogin from run commands")
             await self.relogin_and_restart()
         
     def print_commands(self):
@@ -260,428 +476,65 @@ class Bot:
 
     async def handle_command(self, command):
         if command.skip_delay: # when skip_delay, we execute the cmd first before print its text
-            await command.execute(self, self.command)
+            with self.tracer.span(type(command).__name__, "script", {"index": self.index}):
+                await command.execute(self, self.command)
         if self.showLog: # print text
             cmd_string = command.to_string()
             if cmd_string:
                 cmd_string = cmd_string.split(':')
                 if len(cmd_string) > 1:
-                    print(Fore.BLUE + f"[{datetime.now().strftime('%H:%M:%S')}] [{self.index}] {cmd_string[0]}:" + Fore.RESET + cmd_string[1])
+                    self.log.info("[%s] %s:%s%s", self.index, cmd_string[0], Fore.RESET, cmd_string[1], color=Fore.BLUE)
                 else:
-                    print(Fore.BLUE + f"[{datetime.now().strftime('%H:%M:%S')}] [{self.index}] {cmd_string[0]}" + Fore.RESET)
+                    self.log.info("[%s] %s", self.index, cmd_string[0], color=Fore.BLUE)
         if not command.skip_delay:  # when not skip delay, execute cmd after print its text
-            await command.execute(self, self.command)
-            await asyncio.sleep(self.cmdDelay/1000)
+            with self.tracer.span(type(command).__name__, "script", {"index": self.index}):
+                await command.execute(self, self.command)
+            with self.tracer.span("cmdDelay", "wait"):
+                await self.clock.sleep(self.cmdDelay/1000)
     
     def check_user_access_level(self, username: str, access_level: int):
         if access_level >= 30:
-            print(Fore.RED + f"[{datetime.now().strftime('%H:%M:%S')}] You meet {username}, a staff!")
+            self.log.warning("You meet %s, a staff!", username, color=Fore.RED)
             self.auto_relogin = False
             self.stop_bot()
 
     async def handle_server_response(self, msg):
+        self.packet_log.record_in(msg)
+        if self.tracer.enabled:
+            name = Packet.peek_cmd(msg) if msg.startswith("{") else packet_name(msg)
+            with self.tracer.span(f"recv {name}", "packet"):
+                return await self._handle_server_response(msg)
+        return await self._handle_server_response(msg)
+
+    async def _handle_server_response(self, msg):
         if self.auto_adjust_skill_delay and self.check_spam_time:
-            if (time.time() - self.check_spam_time) > 300 and self.skill_delay_ms > 1500:
+            if (self.clock.time() - self.check_spam_time) > 300 and self.skill_delay_ms > 1500:
                 # self.check_spam_time = None
                 self.skill_delay_ms -= self.adjust_skill_delay_by_ms
-                print(f"set skill delay to: {self.skill_delay_ms}")
-        self.notify_subscribers(msg)
-        if "counter" in msg.lower():
+                self.log.info("set skill delay to: %s", self.skill_delay_ms)
+        if self.log.is_enabled_for(DEBUG) and "counter" in msg.lower():
             self.debug(Fore.RED + msg + Fore.WHITE)
+        if msg.startswith("{"):
+            cmd = Packet.peek_cmd(msg)
+            if cmd is not None and cmd not in BOT_JSON_CMDS and not self.events.wants(cmd, PacketKind.JSON):
+                # nothing acts on this cmd, skip decoding it
+                self.packets_skipped += 1
+                if self.subscribers:
+                    self.notify_subscribers(msg)
+                return
+        packet = Packet.parse(msg)
+        if self.subscribers:
+            self.notify_subscribers(msg)
+        self.events.publish(packet)
 
-        if self.is_valid_json(msg):
-            data = json.loads(msg)
-            try:
-                data = data["b"]["o"]
-            except:
+        if packet.kind == PacketKind.JSON:
+            data = packet.data
+            if data is None:
                 return
-            cmd = data["cmd"]
-            if cmd == "moveToArea":
-                uo_branch = data.get("uoBranch")
-                mon_branch = data.get("monBranch")
-                mon_def = data.get("mondef")
-                mon_map = data.get("monmap")
-                self.areaName = data["areaName"] #"yulgar-99999"
-                self.areaId = data["areaId"]
-                self.strMapName: str = data["strMapName"] #"yulgar"
-                self.monsters: list[Monster] = []
-                self.player_in_area: list[PlayerArea] = []
-                for i_uo_branch in uo_branch:
-                    if (i_uo_branch["uoName"].lower() == self.player.USER.lower()):
-                        self.player.PAD = i_uo_branch["strPad"]
-                        self.player.CELL = i_uo_branch["strFrame"]
-                    if (i_uo_branch["uoName"].lower() == self.follow_player.lower()):
-                        self.followed_player_cell = i_uo_branch["strFrame"]
-                    if (i_uo_branch["uoName"].lower() == self.player.USER.lower()):
-                        self.player.setIsInCombat(i_uo_branch["intState"])
-                    self.player_in_area.append(PlayerArea(i_uo_branch))
-                if mon_def and mon_branch and mon_map:
-                    for i_mon_branch in mon_branch:
-                        self.monsters.append(Monster(i_mon_branch))
-                    for i_mon_def in mon_def:
-                        for mon in self.monsters:
-                            if i_mon_def["MonID"] == mon.mon_id:
-                                mon.mon_name = i_mon_def["strMonName"]
-                    for i_mon_map in mon_map:
-                        for mon in self.monsters:
-                            if i_mon_map["MonMapID"] == mon.mon_map_id:
-                                mon.frame = i_mon_map["strFrame"]
-            elif cmd == "initUserDatas":
-                try:
-                    for i in data["a"]:
-                        username = i["data"]["strUsername"]
-                        access_level = int(i["data"]["intAccessLevel"])
-                        if username.lower() == self.username.lower() and self.player.CHARID == 0:
-                            self.player.CHARID = i["data"]["CharID"]
-                            self.player.GOLD = int(i["data"]["intGold"])
-                        self.check_user_access_level(username, access_level)
-                    if not self.player.BANK:
-                        # print("Load bank and inventory...")
-                        self.player.loadBank()
-                        self.write_message(f"%xt%zm%retrieveInventory%{self.areaId}%{self.username_id}%")
-                except Exception as e:
-                    print(f"initUserDatas err: {e}")
-            elif cmd == "initUserData":
-                username = data["data"]["strUsername"]
-                access_level = int(data["data"]["intAccessLevel"])
-                self.check_user_access_level(username, access_level)
-            elif cmd == "equipItem":
-                pass
-            elif cmd == "loadInventoryBig":
-                self.is_char_load_complete = True
-                for item in data["items"]:
-                    self.player.INVENTORY.append(ItemInventory(item))
-                for faction in data.get("factions", []):
-                    self.player.addFaction(Faction(faction))
-
-            # on monster spwaned in map
-            elif cmd == "mtls":
-                for mon in self.monsters:
-                    if mon.mon_map_id == str(data["id"]):
-                        mon.is_alive = int(data["o"].get("intState", mon.is_alive)) > 0
-                        mon.current_hp = int(data["o"].get("intHP", mon.current_hp))
-                        break
-            # on player spwaned in map
-            elif cmd == "uotls":
-                if str(data['unm']) == str(self.player.USER):
-                    self.player.MAX_HP = int(data['o'].get('intHPMax', self.player.MAX_HP))
-                    self.player.MANA = int(data['o'].get('intMP', self.player.MANA))
-                    self.player.setIsInCombat(data["o"].get("intState"))
-                    if self.player.IS_IN_COMBAT == False:
-                        self.player.setLastTarget(None)
-                else:
-                    player_name: str = data['unm']
-                    player_found = False
-                    for player in self.player_in_area:
-                        if player_name.lower() == player.str_username.lower():
-                            player_found = True
-                            player.updateDataPlayer(data["o"])
-                            break
-                    if not player_found:
-                        self.player_in_area.append(PlayerArea(data["o"]))
-                    
-            elif cmd == "sAct":
-                self.player.SKILLS = data["actions"]["active"]
-                # print(self.player.SKILLS)
-                count_skill = 0
-                for skill in self.player.SKILLS:
-                    anim_strl = {
-                        "anim" : skill.get("anim", ""),
-                        "strl" : skill.get("strl", "")
-                    }
-                    self.player.skills_ref[skill["ref"]] = anim_strl
-                    self.player.SKILLS[count_skill]["nextUse"] = datetime.now()
-                    count_skill += 1
-                # print(self.player.skills_ref)
-            elif cmd == "stu":
-                if data["sta"].get("$tha"):
-                    self.player.CDREDUCTION = data["sta"].get("$tha")
-                if data["sta"].get("$cmc"):
-                    self.player.ManaCost = data["sta"].get("$cmc")    
-            elif cmd == "ct":
-                anims = data.get("anims")
-                a = data.get("a")
-                m = data.get("m")
-                p = data.get("p")
-                sarsa = data.get("sarsa")
-                sara = data.get("sara")
-                if anims:
-                    for anim in anims:
-                        if anim["cInf"] == f"p:{self.username_id}":
-                            animStr: str = anim.get("animStr")
-                            strl: str = anim.get("strl", "")
-                            
-                # update player status
-                if p:
-                    player = p.get(self.username)
-                    if player:
-                        self.player.CURRENT_HP = player.get("intHP", self.player.CURRENT_HP)
-                        self.player.MANA = player.get("intMP", self.player.MANA)
-                        # self.player.IS_IN_COMBAT = int(player.get("intState", self.player.IS_IN_COMBAT)) == 2
-                        self.player.setIsInCombat(player.get("intState"))
-                
-                # update monsters status
-                if m:
-                    for mon_map_id, mon_condition in m.items():
-                        for mon in self.monsters:
-                            if mon.mon_map_id == mon_map_id:
-                                mon.current_hp = int(mon_condition.get("intHP", mon.current_hp))
-                                mon.is_alive = mon.current_hp > 0
-                                # print(f"[{datetime.now().strftime('%H:%M:%S')}] Monster {mon.mon_name} ({mon.mon_map_id}) HP: {mon.current_hp}, Alive: {mon.is_alive}")
-                            
-                # update auras
-                if a:
-                    for action in a:
-                        tInf = action.get('tInf')
-                        action_cmd = action.get('cmd')
-
-                        # update aura for monster
-                        if tInf.startswith('m'):
-                            for mon in self.monsters:
-                                if f"m:{mon.mon_map_id}" == tInf:
-                                    if 'aura+' in action_cmd:
-                                        mon.addAura(action.get('auras', []))
-                                    elif 'aura-' in action_cmd:
-                                        removed_aura = action.get('aura', {}).get('nam')
-                                        mon.removeAura(removed_aura) 
-                        
-                        # update aura for player
-                        if self.username_id in tInf:
-                            if 'aura+' in action_cmd:
-                                self.player.addAura(action.get('auras', []))
-                            elif 'aura' in action_cmd:
-                                removed_aura = action.get('aura', {}).get('nam')
-                                self.player.removeAura(removed_aura)
-                if sarsa:
-                    for sarsaElm in sarsa:
-                        if sarsaElm["cInf"] == f"p:{self.username_id}":
-                            for aSarsa in sarsaElm["a"]:
-                                sarsaType = aSarsa["type"]
-                                sarsaTarget = aSarsa["tInf"]
-                                sarsaActRef = aSarsa["actRef"]
-                                self.debug(Fore.GREEN + "skill casted: " + sarsaActRef + Fore.WHITE)
-                                if "m" in sarsaTarget:
-                                    self.debug(Fore.BLUE + f"[SARSA] [{sarsaType.upper()}] {aSarsa['hp']} DMG to {sarsaTarget}" + Fore.WHITE)
-                                    if self.battle_analyzer:
-                                        self.battle_analyzer_total_damage += aSarsa['hp']
-                                        now = datetime.now()
-                                        if (now - self.battle_analyzer_last_print) >= timedelta(seconds=5):
-                                            self.debug(Fore.RED + f"DPS: {self.battle_analyzer_total_damage / int((datetime.now() - self.battle_analyzer_time_start).total_seconds())}" + Fore.WHITE)
-                                            self.battle_analyzer_last_print = now
-                                else:
-                                    if aSarsa['hp'] < 0:
-                                        self.debug(Fore.BLUE + f"[SARSA] [HEAL] {abs(aSarsa['hp'])} HP to {sarsaTarget}" + Fore.WHITE)
-                                    else:
-                                        self.debug(Fore.BLUE + f"[SARSA] [{sarsaType.upper()}] to {sarsaTarget}" + Fore.WHITE)
-                if sara:
-                    for saraElm in sara:
-                        actionResult = saraElm["actionResult"]
-                        saraCInf = actionResult["cInf"]
-                        saraTInf = actionResult["tInf"]
-                        if saraCInf == f"p:{self.username_id}" and saraTInf == f"p:{self.username_id}":
-                            saraType = actionResult["typ"]
-                            if saraType == "d":
-                                self.debug(Fore.CYAN + f"[SARA] [HOT] {abs(actionResult['hp'])} HOT to {saraTInf}" + Fore.WHITE)
-                            else:
-                                self.debug(Fore.CYAN + f"[SARA] [{saraType.upper()}] to {saraTInf}" + Fore.WHITE)
-                        elif saraCInf.startswith("m") and saraTInf == f"p:{self.username_id}":
-                            saraType = actionResult.get("type", "")
-                            self.debug(Fore.CYAN + f"[SARA] [{saraType.upper()}] {actionResult['hp']} DMG to {saraTInf}" + Fore.WHITE)
-            elif cmd == "seia":
-                self.player.SKILLS[5]["anim"] = data["o"]["anim"]
-                self.player.SKILLS[5]["strl"] = data["o"]["strl"]
-                self.player.SKILLS[5]["cd"] = data["o"]["cd"]
-                self.player.SKILLS[5]["tgt"] = data["o"]["tgt"]
-                anim_strl = {
-                        "anim" : self.player.SKILLS[5]["anim"],
-                        "strl" : self.player.SKILLS[5]["strl"]
-                    }
-                self.player.SKILLS[5]["ref"] = "i1"
-                self.player.SKILLS[5]["nextUse"] = datetime.now()
-                self.player.skills_ref["i1"] = anim_strl
-                # print(self.player.skills_ref)
-                # print(f"Skills: {self.player.SKILLS}")
-            elif cmd == "playerDeath":
-                if int(data["userID"]) == self.player.LOGINUSERID:
-                    print(Fore.RED + "DEATH" + Fore.WHITE)
-                    self.player.ISDEAD = True
-                    if self.isScriptable:
-                        self.run_death_hanlder_task()
-            elif cmd == "getQuests":
-                for quest_id, quest_data in data.get("quests").items():
-                    self.loaded_quest_datas.append(quest_data)
-            elif cmd == "loadShop":
-                shop = Shop(data["shopinfo"])
-                found = False
-                for loaded_shop in self.loaded_shop_datas:
-                    if str(loaded_shop.shop_id) == str(shop.shop_id):
-                        found = True
-                        break
-                if found == False:
-                    self.loaded_shop_datas.append(Shop(data["shopinfo"]))
-            elif cmd == "buyItem":
-                if data["bitSuccess"] == 1:
-                    for loaded_shop in self.loaded_shop_datas:
-                        for shop_item in loaded_shop.items:
-                            if str(shop_item.item_id) == str(data["ItemID"]):
-                                bought = ItemInventory({
-                                    "sName": shop_item.item_name,
-                                    "ItemID": data["ItemID"],
-                                    "CharItemID": data["CharItemID"],
-                                    "iQty": data["iQty"]
-                                })
-                                print(f"bought {bought.item_name} {bought.qty}")
-                                player_item = self.player.get_item_inventory_by_id(bought.item_id)
-                                if player_item:
-                                    player_item.qty += bought.qty
-                                else:
-                                    self.player.INVENTORY.append(bought)
-                                return
-            elif cmd == "sellItem":
-                # {"t":"xt","b":{"r":-1,"o":{"iQtyNow":230,"cmd":"sellItem","intAmount":43750,"CharItemID":8.3779747E8,"bCoins":0,"iQty":7}}}
-                for item in self.player.INVENTORY:
-                    if int(item.char_item_id) == int(data["CharItemID"]):
-                        self.player.GOLD += int(data["intAmount"])
-                        self.player.GOLDFARMED += int(data["intAmount"])
-                        debug_data_gold = {
-                            "gold_added": int(data["intAmount"]),
-                            "gold_now": self.player.GOLD,
-                            "gold_farmed": self.player.GOLDFARMED
-                        }
-                        print(Fore.YELLOW + str(debug_data_gold) + Fore.WHITE)
-                        if data["iQtyNow"] == 0:
-                            self.player.INVENTORY.remove(item)
-                            print(f"sold {data['iQty']}x {item.item_name}. qty now: 0")
-                        else:
-                            item.qty = data["iQtyNow"]
-                            print(f"sold {data['iQty']}x {item.item_name}. qty now: {item.qty}")
-                        break
-            elif cmd == "addGoldExp":
-                self.player.GOLD += data["intGold"]
-                self.player.GOLDFARMED += data["intGold"]
-                gold_added = data["intGold"]
-                debug_data_gold = {
-                    "gold_added": gold_added,
-                    "gold_farmed": self.player.GOLDFARMED,
-                    "gold_now": self.player.GOLD
-                }
-                intExp = data.get("intExp", 0)
-                if intExp > 0:
-                    self.player.EXPFARMED += intExp
-                    debug_data_exp = {
-                        "exp_added": intExp,
-                        "exp_farmed": self.player.EXPFARMED
-                    }
-                    self.debug(Fore.BLUE + str(debug_data_exp) + Fore.WHITE)
-                intRep = data.get("iRep", 0)
-                if intRep > 0:
-                    # {"t":"xt","b":{"r":-1,"o":{"FactionID":75,"cmd":"addGoldExp","intGold":0,"intExp":0,"typ":"q","bonusRep":1000,"iRep":3000}}}
-                    self.player.addRepToFaction(data.get('FactionID', 0), data.get('iRep', 0))
-                self.debug(Fore.YELLOW + str(debug_data_gold) + Fore.WHITE)
-            elif cmd == "dropItem":
-                dropItems = data.get('items')
-                lowered_droplist= [item.lower() for item in self.items_drop_whitelist]
-                for itemDrop in dropItems.values():
-                    itemDrop: ItemInventory = ItemInventory(itemDrop)
-                    if itemDrop.item_name.lower() in lowered_droplist:
-                        print(f"get drop {itemDrop.item_name}")
-                        self.get_drop(self.username_id, itemDrop.item_id)
-                        self.player.INVENTORY.append(itemDrop)
-                        break
-            elif cmd == "addItems":
-                dropItems = data.get('items')
-                for itemId, dropItem in dropItems.items():
-                    dropItem: ItemInventory = ItemInventory(dropItem)
-                    # Item inventory
-                    if dropItem.char_item_id:
-                        playerItem = self.player.get_item_inventory_by_id(itemId)
-                        playerBankItem = self.player.get_item_bank_by_id(itemId)
-                        item_name = dropItem.item_name
-                        if playerItem:
-                            playerItem.qty = dropItem.qty_now
-                            playerItem.char_item_id = dropItem.char_item_id
-                            # await self.check_registered_quest_completion(itemId)
-                            item_name = playerItem.item_name
-                        else:
-                            self.player.INVENTORY.append(dropItem)
-                        if playerBankItem:
-                            playerBankItem.qty = dropItem.qty_now
-                            playerBankItem.char_item_id = dropItem.char_item_id
-                            item_name = playerBankItem.item_name
-                        print(f"[{datetime.now().strftime('%H:%M:%S')}] add items {item_name}. qty now {dropItem.qty_now}")
-                    # Item temp inventory
-                    else:
-                        playerItem = self.player.get_item_temp_inventory_by_id(itemId)
-                        if playerItem:
-                            playerItem.qty += dropItem.qty
-                            print(f"[{datetime.now().strftime('%H:%M:%S')}] add temp items {playerItem.item_name}. qty now {playerItem.qty}")
-                        else:
-                            self.player.TEMPINVENTORY.append(dropItem)
-                        
-            elif cmd == "turnIn":
-                sItems = data.get("sItems").split(',')
-                for s_item in sItems:
-                    itemId = s_item.split(':')[0]
-                    iQty = int(s_item.split(':')[1])
-                    playerItem = self.player.get_item_inventory_by_id(itemId)
-                    if playerItem:
-                        if playerItem.qty - iQty == 0:
-                            self.player.INVENTORY.remove(playerItem)
-                        else:
-                            playerItem.qty -= iQty
-                    playerTempItem = self.player.get_item_temp_inventory_by_id(itemId)
-                    if playerTempItem:
-                        if playerTempItem.qty - iQty == 0:
-                            self.player.TEMPINVENTORY.remove(playerTempItem)
-                        else:
-                            playerTempItem.qty -= iQty
-            elif cmd == "event":
-                pass
-                # print(Fore.GREEN + data["args"]["zoneSet"] + Fore.WHITE)
-                # if data["args"]["zoneSet"]  == "A":
-                #     if self.strMapName.lower() == "ultraspeaker":
-                #         await self.walk_to(100, 321)
-            elif cmd == "ccqr":
-                quest_id = data.get('QuestID', None)
-                s_name = data.get('sName', None)
-                faction_id = data.get('rewardObj', {}).get('FactionID', None)
-                i_rep = data.get('rewardObj', {}).get('iRep', 0)
-                is_success = data.get('bSuccess', 0)
-                ccqr_msg = data.get('msg', '')
-                if is_success == 1:
-                    for loaded_quest in self.loaded_quest_datas:
-                        if str(loaded_quest["QuestID"]) == str(quest_id) and int(quest_id) not in self.registered_auto_quest_ids:
-                            self.loaded_quest_datas.remove(loaded_quest)
-                            break
-                    print(Fore.YELLOW + f"ccqr: [{datetime.now().strftime('%H:%M:%S')}] {quest_id} - {s_name} - {i_rep} rep" + Fore.WHITE)
-                else:
-                    print(Fore.RED + f"ccqr: [{datetime.now().strftime('%H:%M:%S')}] {quest_id} - {s_name} | {ccqr_msg}" + Fore.WHITE)
-                    if "Missing Turn In Item" in ccqr_msg:
-                        self.missing_turn_in_item_questid.append(int(quest_id))
-                    if "Missing Quest Progress" in ccqr_msg:
-                        self.missing_quest_progress_questid.append(int(quest_id))
-                    if "One Time Quest Only" in ccqr_msg:
-                        pass
-            elif cmd == "Wheel":
-                dropItems = data.get('dropItems')
-                dropItemsName = [item["sName"] for item in dropItems.values() if "sName" in item]
-                print(Fore.YELLOW + f"Wheel: {dropItemsName}" + Fore.WHITE)
-            elif cmd == "acceptQuest":
-                quest_id = data["QuestID"]
-                if data["bSuccess"] == 1:
-                    loaded_quest_ids = [loaded_quest["QuestID"] for loaded_quest in self.loaded_quest_datas]
-                    if not str(quest_id) in str(loaded_quest_ids):
-                        self.write_message(f"%xt%zm%getQuests%{self.areaId}%{quest_id}%")
-                        self.do_wait(500)
-                elif data["bSuccess"] == 0:
-                    if quest_id not in self.failed_get_quest_datas:
-                        self.failed_get_quest_datas.append(quest_id)
-            elif cmd == "addFaction":
-                # {"t":"xt","b":{"r":-1,"o":{"cmd":"addFaction","faction":{"FactionID":"75","bitSuccess":"1","CharFactionID":"48707365","sName":"Yew Mountains","iRep":"0"}}}}
-                self.player.addFaction(Faction(data["faction"]))
-            elif cmd == "clearAuras":
-                self.player.removeAllAuras()
-        elif self.is_valid_xml(msg):
+            handler = _JSON_HANDLERS.get(packet.cmd)
+            if handler is not None:
+                await handler(self, data)
+        elif packet.kind == PacketKind.XML:
             if ("<cross-domain-policy><allow-access-from domain='*'" in msg):
                 self.write_message(f"<msg t='sys'><body action='login' r='0'><login z='zone_master'><nick><![CDATA[SPIDER#0001~{self.player.USER}~3.012]]></nick><pword><![CDATA[{self.player.TOKEN}]]></pword></login></body></msg>")
             elif "joinOK" in msg:
@@ -695,15 +548,14 @@ class Bot:
                 msg = f"%xt%zm%retrieveUserData%{self.areaId}%{newId}%"
                 self.write_message(msg)
             elif "logout" in msg:
-                print("Client logged out.")
+                self.log.info("Client logged out.")
                 self.is_client_connected = False
                 return
-        elif msg.startswith("%") and msg.endswith("%"):
+        elif packet.kind == PacketKind.STR:
             if f"%server%" in msg:
-                print(Fore.MAGENTA + f"[{datetime.now().strftime('%H:%M:%S')}] {msg.split('%')[4]}" + Fore.RESET)
+                self.log.info("%s", msg.split('%')[4], color=Fore.MAGENTA)
             if f"%xt%loginResponse%" in msg:
-                self.write_message(f"%xt%zm%firstJoin%1%")
-                self.write_message(f"%xt%zm%cmd%1%ignoreList%$clearAll%")
+                self.write_messages([f"%xt%zm%firstJoin%1%", f"%xt%zm%cmd%1%ignoreList%$clearAll%"])
             elif "You joined" in msg:
                 self.write_message(f"%xt%zm%retrieveUserDatas%{self.areaId}%{self.username_id}%")
                 self.is_joining_map = False
@@ -712,23 +564,20 @@ class Bot:
                 text = msg[4]
                 if "Please slow down" in text:
                     if self.mute_spam_warning == False:
-                        print(Fore.RED + f"[{datetime.now().strftime('%H:%M:%S')}] server warning: {text}" + Fore.WHITE)
+                        self.log.warning("server warning: %s", text, color=Fore.RED)
                 else:
-                    print(Fore.RED + f"[{datetime.now().strftime('%H:%M:%S')}] server warning: {text}" + Fore.WHITE)                    
+                    self.log.warning("server warning: %s", text, color=Fore.RED)
                 if "spamming the server" in text:
                     if self.auto_adjust_skill_delay:
                         self.skill_delay_ms += self.adjust_skill_delay_by_ms
-                        self.check_spam_time = time.time()
-                        print(f"set skill delay to: {self.skill_delay_ms}")
+                        self.check_spam_time = self.clock.time()
+                        self.log.info("set skill delay to: %s", self.skill_delay_ms)
             elif "exitArea" in msg:
-                if msg.split('%')[5].lower() == self.follow_player.lower():
+                username = msg.split('%')[5]
+                if username.lower() == self.follow_player.lower():
                     self.followed_player_cell = None
                     await self.ensure_leave_from_combat(always=True)
-                for player in self.player_in_area[:]:
-                    if player.str_username.lower() == msg.split('%')[5].lower():
-                        # print(f"{player.str_username} has left the area")
-                        self.player_in_area.remove(player)
-                        break
+                self.room.remove(username)
             elif "uotls" in msg:
                 username = msg.split('%')[4]
                 movement = msg.split('%')[5]
@@ -743,13 +592,7 @@ class Bot:
                 if username == self.follow_player:
                     if cell != self.player.CELL:
                         self.followed_player_cell = cell
-                for player in self.player_in_area[:]:
-                    if player.str_username.lower() == username.lower():
-                        player.str_frame = cell
-                        if pad != None:
-                            player.str_pad = pad
-                        break
-                        # self.jump_cell(cell, pad)
+                self.room.move(username, cell, pad)
             elif "respawnMon" in msg:
                 pass
             elif "chatm" in msg:
@@ -757,30 +600,446 @@ class Bot:
                     msg = msg.split('%')
                     text = msg[4].replace("zone~", ": ").replace("guild~", "[GUILD]: ").replace("party~", "[PARTY]: ")
                     sender = msg[5]
-                    print(Fore.MAGENTA + f"[{datetime.now().strftime('%H:%M:%S')}] {sender} {text}" + Fore.WHITE)
+                    self.log.info("%s %s", sender, text, color=Fore.MAGENTA)
             elif "whisper" in msg:
                 if self.showChat:
                     msg = msg.split('%')
                     text = msg[4]
                     sender = msg[5]
-                    print(Fore.MAGENTA + f"[{datetime.now().strftime('%H:%M:%S')}] {sender} [WHISPER] : {text}" + Fore.WHITE)
+                    self.log.info("%s [WHISPER] : %s", sender, text, color=Fore.MAGENTA)
             elif f"Your status is now Away From Keyboard" in msg:
                 if self.isScriptable and self.auto_relogin:
-                    print("Relogin and restart bot on AFK...")
-                    await self.relogin_and_restart(async_bot=self.bot_main)
+                    # start_bot sees the closed connection and does the relogin
+                    self.log.info("Relogin and restart bot on AFK...")
+                    self.stop_bot()
                 elif not self.isScriptable and self.restart_on_afk:
-                    print("Restart cmds on AFK...")
+                    self.log.info("Restart cmds on AFK...")
                     self.index = 0
                     pass
             elif "invalid session" in msg:
                 if self.isScriptable and self.auto_relogin:
-                    print("Relogin and restart bot on invalid session...")
-                    await self.relogin_and_restart(async_bot=self.bot_main)
+                    self.log.info("Relogin and restart bot on invalid session...")
+                    self.stop_bot()
+
+    @_handles("moveToArea")
+    async def _on_move_to_area(self, data):
+        uo_branch = data.get("uoBranch")
+        mon_branch = data.get("monBranch")
+        mon_def = data.get("mondef")
+        mon_map = data.get("monmap")
+        self.areaName = data["areaName"] #"yulgar-99999"
+        self.areaId = data["areaId"]
+        self.packets.bind(self.areaId, self.username_id)
+        self.strMapName: str = data["strMapName"] #"yulgar"
+        self.monsters: list[Monster] = []
+        players_in_area: list[PlayerArea] = []
+        for i_uo_branch in uo_branch:
+            if (i_uo_branch["uoName"].lower() == self.player.USER.lower()):
+                self.player.PAD = i_uo_branch["strPad"]
+                self.player.CELL = i_uo_branch["strFrame"]
+            if (i_uo_branch["uoName"].lower() == self.follow_player.lower()):
+                self.followed_player_cell = i_uo_branch["strFrame"]
+            if (i_uo_branch["uoName"].lower() == self.player.USER.lower()):
+                self.player.setIsInCombat(i_uo_branch["intState"])
+            players_in_area.append(PlayerArea(i_uo_branch))
+        self.room.reset(players_in_area)
+        if self.party:
+            self.party.update_position(self)
+        if mon_def and mon_branch and mon_map:
+            for i_mon_branch in mon_branch:
+                self.monsters.append(Monster(i_mon_branch, self.clock))
+            for i_mon_def in mon_def:
+                for mon in self.monsters:
+                    if i_mon_def["MonID"] == mon.mon_id:
+                        mon.mon_name = i_mon_def["strMonName"]
+            for i_mon_map in mon_map:
+                for mon in self.monsters:
+                    if i_mon_map["MonMapID"] == mon.mon_map_id:
+                        mon.frame = i_mon_map["strFrame"]
+
+    @_handles("initUserDatas")
+    async def _on_init_user_datas(self, data):
+        try:
+            for i in data["a"]:
+                username = i["data"]["strUsername"]
+                access_level = int(i["data"]["intAccessLevel"])
+                if username.lower() == self.username.lower() and self.player.CHARID == 0:
+                    self.player.CHARID = i["data"]["CharID"]
+                    self.player.GOLD = int(i["data"]["intGold"])
+                self.check_user_access_level(username, access_level)
+            if not self.player.BANK:
+                # print("Load bank and inventory...")
+                self.player.loadBank()
+                self.write_message(f"%xt%zm%retrieveInventory%{self.areaId}%{self.username_id}%")
+        except Exception as e:
+            self.log.error("initUserDatas err: %s", e)
+
+    @_handles("initUserData")
+    async def _on_init_user_data(self, data):
+        username = data["data"]["strUsername"]
+        access_level = int(data["data"]["intAccessLevel"])
+        self.check_user_access_level(username, access_level)
+
+    @_handles("loadInventoryBig")
+    async def _on_load_inventory_big(self, data):
+        self.is_char_load_complete = True
+        self.player.INVENTORY = []
+        for item in data["items"]:
+            self.player.INVENTORY.append(ItemInventory(item))
+        for faction in data.get("factions", []):
+            self.player.addFaction(Faction(faction))
+
+    # on monster spwaned in map
+    @_handles("mtls")
+    async def _on_mtls(self, data):
+        for mon in self.monsters:
+            if mon.mon_map_id == str(data["id"]):
+                mon.is_alive = int(data["o"].get("intState", mon.is_alive)) > 0
+                mon.current_hp = int(data["o"].get("intHP", mon.current_hp))
+                break
+
+    # on player spwaned in map
+    @_handles("uotls")
+    async def _on_uotls(self, data):
+        if str(data['unm']) == str(self.player.USER):
+            self.player.MAX_HP = int(data['o'].get('intHPMax', self.player.MAX_HP))
+            self.player.MANA = int(data['o'].get('intMP', self.player.MANA))
+            self.player.setIsInCombat(data["o"].get("intState"))
+            if self.player.IS_IN_COMBAT == False:
+                self.player.setLastTarget(None)
+        else:
+            self.room.upsert(data['unm'], data["o"])
+
+    @_handles("sAct")
+    async def _on_s_act(self, data):
+        self.player.SKILLS = data["actions"]["active"]
+        # print(self.player.SKILLS)
+        count_skill = 0
+        for skill in self.player.SKILLS:
+            anim_strl = {
+                "anim" : skill.get("anim", ""),
+                "strl" : skill.get("strl", "")
+            }
+            self.player.skills_ref[skill["ref"]] = anim_strl
+            self.player.SKILLS[count_skill]["nextUse"] = self.clock.now()
+            count_skill += 1
+        # print(self.player.skills_ref)
+
+    @_handles("stu")
+    async def _on_stu(self, data):
+        if data["sta"].get("$tha"):
+            self.player.CDREDUCTION = data["sta"].get("$tha")
+        if data["sta"].get("$cmc"):
+            self.player.ManaCost = data["sta"].get("$cmc")    
+
+    @_handles("ct")
+    async def _on_ct(self, data):
+        anims = data.get("anims")
+        a = data.get("a")
+        m = data.get("m")
+        p = data.get("p")
+        sarsa = data.get("sarsa")
+        sara = data.get("sara")
+        if anims:
+            for anim in anims:
+                if anim["cInf"] == f"p:{self.username_id}":
+                    animStr: str = anim.get("animStr")
+                    strl: str = anim.get("strl", "")
+
+        # update player status
+        if p:
+            player = p.get(self.username)
+            if player:
+                self.player.CURRENT_HP = player.get("intHP", self.player.CURRENT_HP)
+                self.player.MANA = player.get("intMP", self.player.MANA)
+                # self.player.IS_IN_COMBAT = int(player.get("intState", self.player.IS_IN_COMBAT)) == 2
+                self.player.setIsInCombat(player.get("intState"))
+
+        mons_by_id = {mon.mon_map_id: mon for mon in self.monsters} if (m or a) else {}
+        # update monsters status
+        if m:
+            for mon_map_id, mon_condition in m.items():
+                mon = mons_by_id.get(mon_map_id)
+                if mon:
+                    mon.current_hp = int(mon_condition.get("intHP", mon.current_hp))
+                    mon.is_alive = mon.current_hp > 0
+
+        # update auras
+        if a:
+            for action in a:
+                tInf = action.get('tInf')
+                action_cmd = action.get('cmd')
+
+                # update aura for monster
+                if tInf.startswith('m'):
+                    mon = mons_by_id.get(tInf[2:])
+                    if mon:
+                        if 'aura+' in action_cmd:
+                            mon.addAura(action.get('auras', []))
+                        elif 'aura-' in action_cmd:
+                            removed_aura = action.get('aura', {}).get('nam')
+                            mon.removeAura(removed_aura) 
+
+                # update aura for player
+                if self.username_id in tInf:
+                    if 'aura+' in action_cmd:
+                        self.player.addAura(action.get('auras', []))
+                    elif 'aura' in action_cmd:
+                        removed_aura = action.get('aura', {}).get('nam')
+                        self.player.removeAura(removed_aura)
+        if sarsa and (self.battle_analyzer or self.log.is_enabled_for(DEBUG)):
+            for sarsaElm in sarsa:
+                if sarsaElm["cInf"] == f"p:{self.username_id}":
+                    for aSarsa in sarsaElm["a"]:
+                        sarsaType = aSarsa["type"]
+                        sarsaTarget = aSarsa["tInf"]
+                        sarsaActRef = aSarsa["actRef"]
+                        self.debug(Fore.GREEN + "skill casted: " + sarsaActRef + Fore.WHITE)
+                        if "m" in sarsaTarget:
+                            self.debug(Fore.BLUE + f"[SARSA] [{sarsaType.upper()}] {aSarsa['hp']} DMG to {sarsaTarget}" + Fore.WHITE)
+                            if self.battle_analyzer:
+                                self.battle_analyzer_total_damage += aSarsa['hp']
+                                now = self.clock.now()
+                                if (now - self.battle_analyzer_last_print) >= timedelta(seconds=5):
+                                    self.debug(Fore.RED + f"DPS: {self.battle_analyzer_total_damage / int((self.clock.now() - self.battle_analyzer_time_start).total_seconds())}" + Fore.WHITE)
+                                    self.battle_analyzer_last_print = now
+                        else:
+                            if aSarsa['hp'] < 0:
+                                self.debug(Fore.BLUE + f"[SARSA] [HEAL] {abs(aSarsa['hp'])} HP to {sarsaTarget}" + Fore.WHITE)
+                            else:
+                                self.debug(Fore.BLUE + f"[SARSA] [{sarsaType.upper()}] to {sarsaTarget}" + Fore.WHITE)
+        if sara and self.log.is_enabled_for(DEBUG):
+            for saraElm in sara:
+                actionResult = saraElm["actionResult"]
+                saraCInf = actionResult["cInf"]
+                saraTInf = actionResult["tInf"]
+                if saraCInf == f"p:{self.username_id}" and saraTInf == f"p:{self.username_id}":
+                    saraType = actionResult["typ"]
+                    if saraType == "d":
+                        self.debug(Fore.CYAN + f"[SARA] [HOT] {abs(actionResult['hp'])} HOT to {saraTInf}" + Fore.WHITE)
+                    else:
+                        self.debug(Fore.CYAN + f"[SARA] [{saraType.upper()}] to {saraTInf}" + Fore.WHITE)
+                elif saraCInf.startswith("m") and saraTInf == f"p:{self.username_id}":
+                    saraType = actionResult.get("type", "")
+                    self.debug(Fore.CYAN + f"[SARA] [{saraType.upper()}] {actionResult['hp']} DMG to {saraTInf}" + Fore.WHITE)
+
+    @_handles("seia")
+    async def _on_seia(self, data):
+        self.player.SKILLS[5]["anim"] = data["o"]["anim"]
+        self.player.SKILLS[5]["strl"] = data["o"]["strl"]
+        self.player.SKILLS[5]["cd"] = data["o"]["cd"]
+        self.player.SKILLS[5]["tgt"] = data["o"]["tgt"]
+        anim_strl = {
+                "anim" : self.player.SKILLS[5]["anim"],
+                "strl" : self.player.SKILLS[5]["strl"]
+            }
+        self.player.SKILLS[5]["ref"] = "i1"
+        self.player.SKILLS[5]["nextUse"] = self.clock.now()
+        self.player.skills_ref["i1"] = anim_strl
+        # print(self.player.skills_ref)
+        # print(f"Skills: {self.player.SKILLS}")
+
+    @_handles("playerDeath")
+    async def _on_player_death(self, data):
+        if int(data["userID"]) == self.player.LOGINUSERID:
+            self.log.warning("DEATH", color=Fore.RED)
+            self.player.ISDEAD = True
+            if self.isScriptable:
+                self.run_death_hanlder_task()
+
+    @_handles("getQuests")
+    async def _on_get_quests(self, data):
+        for quest_id, quest_data in data.get("quests").items():
+            self.loaded_quest_datas.append(quest_data)
+            self.quest_tracker.index_quest(quest_data)
+
+    @_handles("loadShop")
+    async def _on_load_shop(self, data):
+        shop = Shop(data["shopinfo"])
+        found = False
+        for loaded_shop in self.loaded_shop_datas:
+            if str(loaded_shop.shop_id) == str(shop.shop_id):
+                found = True
+                break
+        if found == False:
+            self.loaded_shop_datas.append(Shop(data["shopinfo"]))
+
+    @_handles("buyItem")
+    async def _on_buy_item(self, data):
+        if data["bitSuccess"] == 1:
+            for loaded_shop in self.loaded_shop_datas:
+                for shop_item in loaded_shop.items:
+                    if str(shop_item.item_id) == str(data["ItemID"]):
+                        bought = ItemInventory({
+                            "sName": shop_item.item_name,
+                            "ItemID": data["ItemID"],
+                            "CharItemID": data["CharItemID"],
+                            "iQty": data["iQty"]
+                        })
+                        self.log.info("bought %s %s", bought.item_name, bought.qty)
+                        player_item = self.player.get_item_inventory_by_id(bought.item_id)
+                        if player_item:
+                            player_item.qty += bought.qty
+                        else:
+                            self.player.INVENTORY.append(bought)
+                        return
+
+    @_handles("sellItem")
+    async def _on_sell_item(self, data):
+        # {"t":"xt","b":{"r":-1,"o":{"iQtyNow":230,"cmd":"sellItem","intAmount":43750,"CharItemID":8.3779747E8,"bCoins":0,"iQty":7}}}
+        for item in self.player.INVENTORY:
+            if int(item.char_item_id) == int(data["CharItemID"]):
+                self.player.GOLD += int(data["intAmount"])
+                self.player.GOLDFARMED += int(data["intAmount"])
+                self.log.info("gold added: %s, gold now: %s, gold farmed: %s",
+                              int(data["intAmount"]), self.player.GOLD, self.player.GOLDFARMED, color=Fore.YELLOW)
+                if data["iQtyNow"] == 0:
+                    self.player.INVENTORY.remove(item)
+                    self.log.info("sold %sx %s. qty now: 0", data['iQty'], item.item_name)
+                else:
+                    item.qty = data["iQtyNow"]
+                    self.log.info("sold %sx %s. qty now: %s", data['iQty'], item.item_name, item.qty)
+                break
+
+    @_handles("addGoldExp")
+    async def _on_add_gold_exp(self, data):
+        self.player.GOLD += data["intGold"]
+        self.player.GOLDFARMED += data["intGold"]
+        gold_added = data["intGold"]
+        debug_data_gold = {
+            "gold_added": gold_added,
+            "gold_farmed": self.player.GOLDFARMED,
+            "gold_now": self.player.GOLD
+        }
+        intExp = data.get("intExp", 0)
+        if intExp > 0:
+            self.player.EXPFARMED += intExp
+            debug_data_exp = {
+                "exp_added": intExp,
+                "exp_farmed": self.player.EXPFARMED
+            }
+            self.debug(Fore.BLUE + str(debug_data_exp) + Fore.WHITE)
+        intRep = data.get("iRep", 0)
+        if intRep > 0:
+            # {"t":"xt","b":{"r":-1,"o":{"FactionID":75,"cmd":"addGoldExp","intGold":0,"intExp":0,"typ":"q","bonusRep":1000,"iRep":3000}}}
+            self.player.addRepToFaction(data.get('FactionID', 0), data.get('iRep', 0))
+        self.debug(Fore.YELLOW + str(debug_data_gold) + Fore.WHITE)
+
+    @_handles("dropItem")
+    async def _on_drop_item(self, data):
+        dropItems = [ItemInventory(item) for item in data.get('items', {}).values()]
+        picked = self.drop_rules.select(dropItems, self._held_qty)
+        if picked:
+            self.get_drops([item.item_id for item in picked])
+            for itemDrop in picked:
+                self.log.info("get drop %s", itemDrop.item_name)
+                self.player.INVENTORY.append(itemDrop)
+
+    @_handles("addItems")
+    async def _on_add_items(self, data):
+        dropItems = data.get('items')
+        for itemId, dropItem in dropItems.items():
+            dropItem: ItemInventory = ItemInventory(dropItem)
+            # Item inventory
+            if dropItem.char_item_id:
+                playerItem = self.player.get_item_inventory_by_id(itemId)
+                playerBankItem = self.player.get_item_bank_by_id(itemId)
+                item_name = dropItem.item_name
+                if playerItem:
+                    playerItem.qty = dropItem.qty_now
+                    playerItem.char_item_id = dropItem.char_item_id
+                    item_name = playerItem.item_name
+                else:
+                    self.player.INVENTORY.append(dropItem)
+                if playerBankItem:
+                    playerBankItem.qty = dropItem.qty_now
+                    playerBankItem.char_item_id = dropItem.char_item_id
+                    item_name = playerBankItem.item_name
+                self.log.info("add items %s. qty now %s", item_name, dropItem.qty_now)
+            # Item temp inventory
+            else:
+                playerItem = self.player.get_item_temp_inventory_by_id(itemId)
+                if playerItem:
+                    playerItem.qty += dropItem.qty
+                    self.log.info("add temp items %s. qty now %s", playerItem.item_name, playerItem.qty)
+                else:
+                    self.player.TEMPINVENTORY.append(dropItem)
+        self.quest_tracker.on_items_changed(dropItems.keys())
+
+    @_handles("turnIn")
+    async def _on_turn_in(self, data):
+        sItems = data.get("sItems").split(',')
+        for s_item in sItems:
+            itemId = s_item.split(':')[0]
+            iQty = int(s_item.split(':')[1])
+            playerItem = self.player.get_item_inventory_by_id(itemId)
+            if playerItem:
+                if playerItem.qty - iQty == 0:
+                    self.player.INVENTORY.remove(playerItem)
+                else:
+                    playerItem.qty -= iQty
+            playerTempItem = self.player.get_item_temp_inventory_by_id(itemId)
+            if playerTempItem:
+                if playerTempItem.qty - iQty == 0:
+                    self.player.TEMPINVENTORY.remove(playerTempItem)
+                else:
+                    playerTempItem.qty -= iQty
+        self.quest_tracker.on_items_changed(s_item.split(':')[0] for s_item in sItems)
+
+    @_handles("ccqr")
+    async def _on_ccqr(self, data):
+        quest_id = data.get('QuestID', None)
+        s_name = data.get('sName', None)
+        faction_id = data.get('rewardObj', {}).get('FactionID', None)
+        i_rep = data.get('rewardObj', {}).get('iRep', 0)
+        is_success = data.get('bSuccess', 0)
+        ccqr_msg = data.get('msg', '')
+        if quest_id is not None:
+            self.quest_tracker.on_turn_in_result(quest_id, is_success == 1)
+        if is_success == 1:
+            for loaded_quest in self.loaded_quest_datas:
+                if str(loaded_quest["QuestID"]) == str(quest_id) and int(quest_id) not in self.registered_auto_quest_ids:
+                    self.loaded_quest_datas.remove(loaded_quest)
+                    break
+            self.log.info("ccqr: %s - %s - %s rep", quest_id, s_name, i_rep, color=Fore.YELLOW)
+        else:
+            self.log.info("ccqr: %s - %s | %s", quest_id, s_name, ccqr_msg, color=Fore.RED)
+            if "Missing Turn In Item" in ccqr_msg:
+                self.missing_turn_in_item_questid.append(int(quest_id))
+            if "Missing Quest Progress" in ccqr_msg:
+                self.missing_quest_progress_questid.append(int(quest_id))
+            if "One Time Quest Only" in ccqr_msg:
+                pass
+
+    @_handles("Wheel")
+    async def _on_wheel(self, data):
+        dropItems = data.get('dropItems')
+        dropItemsName = [item["sName"] for item in dropItems.values() if "sName" in item]
+        self.log.info("Wheel: %s", dropItemsName, color=Fore.YELLOW)
+
+    @_handles("acceptQuest")
+    async def _on_accept_quest(self, data):
+        quest_id = data["QuestID"]
+        if data["bSuccess"] == 1:
+            loaded_quest_ids = [loaded_quest["QuestID"] for loaded_quest in self.loaded_quest_datas]
+            if not str(quest_id) in str(loaded_quest_ids):
+                self.write_message(f"%xt%zm%getQuests%{self.areaId}%{quest_id}%")
+                self.do_wait(500)
+        elif data["bSuccess"] == 0:
+            if quest_id not in self.failed_get_quest_datas:
+                self.failed_get_quest_datas.append(quest_id)
+
+    @_handles("addFaction")
+    async def _on_add_faction(self, data):
+        # {"t":"xt","b":{"r":-1,"o":{"cmd":"addFaction","faction":{"FactionID":"75","bitSuccess":"1","CharFactionID":"48707365","sName":"Yew Mountains","iRep":"0"}}}}
+        self.player.addFaction(Faction(data["faction"]))
+
+    @_handles("clearAuras")
+    async def _on_clear_auras(self, data):
+        self.player.removeAllAuras()
 
     async def check_registered_quest_completion(self, item_id, is_temp: bool = False):
-        for registered_quest_id in self.registered_auto_quest_ids:
-            if self.can_turn_in_quest(registered_quest_id):
-                self.turn_in_quest(registered_quest_id)
+        self.quest_tracker.on_items_changed([item_id])
 
     async def read_server_in_background(self):
         """Background task to read and handle messages."""
@@ -797,12 +1056,12 @@ class Bot:
                         # await self.relogin_and_restart(async_bot=self.bot_main)
                     
             except CustomError as e:
-                print(f"Critical error encountered: {e}")
+                self.log.error("Critical error encountered: %s", e)
                 self.run = False  # Stop the bot
             except Exception as e:
-                print(f"Unexpected error in testasync: {e}")
                 tb_str = ''.join(traceback.format_exception(type(e), e, e.__traceback__))
-                print(tb_str)
+                self.log.error("Unexpected error in testasync: %s\n%s", e, tb_str)
+                self.dump_packets(f"reader error: {e!r}", force=False)
                 if self.is_client_connected == False and self.auto_relogin == False:
                     raise Exception("Connection closed by the server.")
     
@@ -810,7 +1069,7 @@ class Bot:
         """
         Asynchronous version of read_batch to avoid blocking.
         """
-        loop = asyncio.get_event_loop()
+        loop = asyncio.get_running_loop()
         return await loop.run_in_executor(None, self.read_batch, conn)
 
     def read_batch(self, conn):
@@ -822,7 +1081,7 @@ class Bot:
                 conn.settimeout(0.5)
                 buf = conn.recv(1024) 
                 if not buf:
-                    print("Connection closed by the server.")
+                    self.log.info("Connection closed by the server.")
                     self.is_client_connected = False
                     break
                 message_builder += buf.decode('utf-8')
@@ -832,7 +1091,8 @@ class Bot:
                 messages = message_builder.split("\x00")
                 for i, msg in enumerate(messages):
                     msg = msg.strip()
-                    if self.is_valid_json(msg):
+                    # JSON frames are decoded once, by Packet.parse; bad ones become UNKNOWN there
+                    if msg.startswith("{") and msg.endswith("}"):
                         complete_messages.append(msg)
                     elif self.is_valid_xml(msg):
                         complete_messages.append(msg)
@@ -840,6 +1100,10 @@ class Bot:
                         complete_messages.append(msg)
                 if complete_messages:
                     return complete_messages
+            except socket.timeout:
+                if not message_builder:
+                    # idle socket, not a dead connection
+                    return complete_messages
             except Exception as e:
                 return None
             finally:
@@ -847,22 +1111,53 @@ class Bot:
                     raise Exception("Connection closed by the server.")
         return complete_messages
     
-    def write_message(self, message):
+    def write_message(self, message, batch: bool = False):
+        """Send one frame. ``batch=True`` coalesces it with other frames of this loop tick."""
         # print(f"[{datetime.now().strftime('%H:%M:%S')}] {message}")
         if self.client_socket is None:
             return "Error: Connection is not established"
+        if self.tracer.enabled:
+            self.tracer.instant(f"send {packet_name(message)}", "packet")
         try:
-            self.client_socket.sendall((message + "\u0000").encode('utf-8'))
+            self.writer.send(message, batch)
         except socket.error as e:
-            return f"Error writing to the connection: {e}"
+            return self._write_failed(e)
         return None
 
-    def is_valid_json(self, s):
+    def _write_failed(self, error: OSError) -> str:
+        """Log a failed write and treat the connection as lost, unless the send only timed out."""
+        self.log.error("Error writing to the connection: %s", error)
+        if not isinstance(error, socket.timeout):
+            self.is_client_connected = False
+        return f"Error writing to the connection: {error}"
+
+    def write_frame(self, parts: List[bytes], batch: bool = False):
+        """Send a frame built by :class:`PacketBuilder` without joining its parts."""
+        if self.client_socket is None:
+            return "Error: Connection is not established"
+        if self.tracer.enabled:
+            self.tracer.instant(f"send {packet_name(parts)}", "packet")
         try:
-            json.loads(s)
-            return True
-        except json.JSONDecodeError:
-            return False
+            self.writer.send_frame(parts, batch)
+        except socket.error as e:
+            return self._write_failed(e)
+        return None
+
+    def write_messages(self, messages: List[str]):
+        """Send several frames in a single write."""
+        if self.client_socket is None:
+            return "Error: Connection is not established"
+        if self.tracer.enabled:
+            for message in messages:
+                self.tracer.instant(f"send {packet_name(message)}", "packet")
+        try:
+            self.writer.send_many(messages)
+        except socket.error as e:
+            return self._write_failed(e)
+        return None
+
+    def is_valid_json(self, s):
+        return codec.is_valid_json(s)
 
     def is_valid_xml(self, s):
         try:
@@ -871,16 +1166,61 @@ class Bot:
         except ElementTree.ParseError:
             return False
     
-    async def goto_player(self, player_name):
-        player_found = next((p for p in self.player_in_area if p.str_username.lower() == player_name.lower()), None)
+    def join_party(self, party: PartyBus):
+        """Share position, targets and barriers with other bots of ``party`` in this process."""
+        if self.party is party:
+            return
+        if self.party:
+            self.leave_party()
+        party.join(self)
+        party.subscribe("cell", self._on_party_cell)
+        scope = current_scope.get()
+        if scope is not None:
+            scope.parties.append(party)
+
+    def leave_party(self):
+        if self.party:
+            self.party.unsubscribe("cell", self._on_party_cell)
+            self.party.leave(self)
+
+    def _on_party_cell(self, sender: str, position: dict):
+        if self.follow_player and sender.lower() == self.follow_player.lower() \
+                and position["map"] == self.strMapName.lower():
+            self.followed_player_cell = position["cell"]
+
+    async def goto_player(self, player_name, leave_combat: bool = False) -> bool:
+        """Jump to ``player_name`` if the party or the room places them in this map, else send ``goto``.
+
+        Returns True when it could jump directly.
+        """
+        position = self.party.position(player_name) if self.party else None
+        if position and position[0] == self.strMapName.lower():
+            self.jump_cell(position[1], position[2])
+            return True
+        player_found = self.room.get(player_name)
         if player_found:
             self.jump_cell(player_found.str_frame, player_found.str_pad)
-        else:
-            self.write_message(f"%xt%zm%cmd%1%goto%{player_name}%")
+            return True
+        if leave_combat:
+            await self.ensure_leave_from_combat(always=True)
+        self.write_message(f"%xt%zm%cmd%1%goto%{player_name}%")
+        return False
         
     def get_drop(self, user_id, item_id):
         packet = f"%xt%zm%getDrop%{user_id}%{item_id}%"
         self.write_message(packet)
+
+    def get_drops(self, item_ids: List[str]):
+        """Claim several drops in one write."""
+        self.write_messages([f"%xt%zm%getDrop%{self.username_id}%{item_id}%" for item_id in item_ids])
+
+    def _held_qty(self, item: ItemInventory) -> int:
+        held = self.player.get_item_inventory_by_id(item.item_id) or self.player.get_item_temp_inventory_by_id(item.item_id)
+        return held.qty if held else 0
+
+    @property
+    def items_drop_whitelist(self) -> List[str]:
+        return self.drop_rules.names()
     
     def accept_quest(self, quest_id: int):
         self.write_message(f"%xt%zm%acceptQuest%{self.areaId}%{quest_id}%")
@@ -892,8 +1232,7 @@ class Bot:
         self.do_wait(500)
 
     def use_scroll(self, monsterid, max_target):
-        self.target = [f"i1>m:{i}" for i in monsterid][:max_target]
-        self.write_message(f"%xt%zm%gar%1%0%{','.join(self.target)}%{self.scroll_id}%wvz%")
+        self.write_frame(self.packets.scroll_on_monsters(monsterid, max_target, self.scroll_id))
         
     def use_potion(self, potion_id):
         self.write_message(f"%xt%zm%gar%1%0%i1>p:{self.user_id}%{potion_id}%wvz%")
@@ -905,64 +1244,63 @@ class Bot:
             if mon.mon_map_id == str(monsters_id[0]):
                 self.player.setLastTarget(mon)
                 break
-        self.target = [f"a{skill}>m:{i}" for i in monsters_id][:max_target]
-        self.write_message(f"%xt%zm%gar%1%0%{','.join(self.target)}%wvz%")
-        # print(f"[{datetime.now().strftime('%H:%M:%S')}] tgt_mon: {self.target}")
+        self.write_frame(self.packets.skill_on_monsters(skill, monsters_id, max_target))
 
     def use_skill_to_player(self, skill, max_target):
-        self.target = [f"a{skill}>p:{i}" for i in self.user_ids][:max_target-1]
-        self.target.insert(0, f"a{skill}>p:{self.username_id}")
-        final_target = []
-        for tgt in self.target:
-            if tgt not in final_target:
-                final_target.append(tgt)
-        self.write_message(f"%xt%zm%gar%1%0%{','.join(final_target)}%wvz%")
-        # print(f"[{datetime.now().strftime('%H:%M:%S')}] tgt_p: {','.join(final_target)}")
+        self.write_frame(self.packets.skill_on_players(skill, self.room.user_id_list(), self.room.user_ids_version, max_target))
     
     def use_skill_to_myself(self, skill):
-        self.write_message(f"%xt%zm%gar%1%0%a{skill}>p:{self.username_id}%wvz%")
+        self.write_frame(self.packets.skill_on_self(skill))
 
     def do_wait(self, wait_ms: int):
         self.wait_ms = wait_ms/1000
 
+    @property
+    def user_ids(self) -> list[str]:
+        return self.room.user_ids
+
+    @property
+    def player_in_area(self) -> list[PlayerArea]:
+        return self.room.players()
+
     def extract_user_ids(self, xml_message: str):
         root = ET.fromstring(xml_message)
-        self.user_ids = []
+        user_ids = []
         self.username_id = None
         for user in root.findall(".//u"):
             self.user_id = user.get("i")  # Get the id
-            self.user_ids.append(self.user_id)  # Append to the list
+            user_ids.append(self.user_id)  # Append to the list
             name: str = user.find("n").text  # Get the username
             if name.lower() == self.player.USER.lower():
                 self.username_id = self.user_id  # Store the ID of the target username
+        self.room.set_user_ids(user_ids)
+        self.packets.bind(self.areaId, self.username_id)
 
     def extract_new_user(self, xml_message: str):
         root = ET.fromstring(xml_message)
         newId = root.find(".//u").get("i")
-        self.user_ids.append(newId)
+        self.room.add_user_id(newId)
     
     def extract_remove_user(self, xml_message: str):
         root = ET.fromstring(xml_message)
         toRemove = root.find(".//user").get("id")
-        for i in self.user_ids:
-            if i == toRemove:
-                self.user_ids.remove(i)
-                break
+        self.room.remove_user_id(toRemove)
         
     async def ensure_leave_from_combat(self, sleep_ms: int = 2000, always: bool = False):
         if self.player.IS_IN_COMBAT or always:
             self.jump_cell(self.player.CELL, self.player.PAD)
-            await asyncio.sleep(sleep_ms/1000)
+            await self.clock.sleep(sleep_ms/1000)
         
     def jump_cell(self, cell: str, pad: str = "Left"):
-        msg = f"%xt%zm%moveToCell%{self.areaId}%{cell}%{pad}%"
         self.player.CELL = cell
         self.player.PAD = pad
         self.player.setPlayerPositionXY(0,0)
-        self.write_message(msg)
+        self.write_frame(self.packets.move_to_cell(cell, pad))
+        if self.party:
+            self.party.update_position(self)
 
     async def walk_to(self, x: int, y: int, speed = 8):
-        self.write_message(f"%xt%zm%mv%{self.areaId}%{x}%{y}%{speed}%")
+        self.write_frame(self.packets.walk(x, y, speed))
         self.player.setPlayerPositionXY(x, y)
     
     def find_best_cell(self, monster_name, byMostMonster: bool = True, byAliveMonster: bool = False):
@@ -1017,7 +1355,7 @@ class Bot:
     
     def start_battle_analyzer(self):
         self.battle_analyzer: bool = True
-        self.battle_analyzer_time_start: datetime = datetime.now()
+        self.battle_analyzer_time_start: datetime = self.clock.now()
         self.battle_analyzer_total_damage: int = 0
         self.battle_analyzer_last_print: datetime = self.battle_analyzer_time_start
     
@@ -1027,10 +1365,7 @@ class Bot:
         self.battle_analyzer_total_damage: int = 0
     
     def get_player_in_area(self, player_name: str) -> Optional[PlayerArea]:
-        for player in self.player_in_area:
-            if player_name.lower() == player.str_username.lower():
-                return player
-        return None
+        return self.room.get(player_name)
 
     def is_player_hp_below(self, player_name: str, percent: float) -> bool:
         player = self.get_player_in_area(player_name)
@@ -1038,6 +1373,10 @@ class Bot:
             return False
         return player.is_hp_below(percent)
 
+# JSON cmds the bot itself handles. Any other JSON frame is only decoded
+# when an EventBus subscription asks for its cmd.
+BOT_JSON_CMDS = frozenset(_JSON_HANDLERS)
+
 class CustomError(Exception):
     """Exception raised for custom error in the application."""
 
@@ -0,0 +1,58 @@
+import json
+import os
+import re
+from typing import Any, Dict, Optional
+
+DEFAULT_CHECKPOINT_DIR = ".checkpoints"
+
+
+class CheckpointStore:
+    """Script progress saved as JSON so a restarted script can skip finished steps.
+
+    Every write goes to a temp file that is then renamed over the old one, so
+    a crash never leaves a half-written checkpoint behind.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._data: Dict[str, Any] = {}
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self._data = json.load(f)
+            except (OSError, ValueError):
+                self._data = {}
+
+    @classmethod
+    def for_script(cls, username: str, script: str, directory: Optional[str] = None) -> "CheckpointStore":
+        directory = directory or os.getenv("CHECKPOINT_DIR", DEFAULT_CHECKPOINT_DIR)
+        safe = lambda s: re.sub(r"[^A-Za-z0-9_.-]+", "_", s) or "default"
+        return cls(os.path.join(directory, safe(username.lower()), safe(script) + ".json"))
+
+    def _save(self) -> None:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._data, f)
+        os.replace(tmp_path, self.path)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self._data.get(key, default)
+
+    def set(self, key: str, value: Any) -> None:
+        self._data[key] = value
+        self._save()
+
+    def is_done(self, step: str) -> bool:
+        return step in self._data.get("_done", [])
+
+    def mark_done(self, step: str) -> None:
+        done = self._data.setdefault("_done", [])
+        if step not in done:
+            done.append(step)
+            self._save()
+
+    def clear(self) -> None:
+        self._data = {}
+        if os.path.exists(self.path):
+            os.remove(self.path)
@@ -0,0 +1,119 @@
+import json
+import os
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from core.rotation import Rotation, SkillStep
+from core.utils import normalize
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11: TOML profiles are skipped
+    tomllib = None
+
+DEFAULT_PROFILES_PATH = os.path.join(os.path.dirname(__file__), "data", "class_profiles.json")
+
+
+class ClassProfile:
+    """Compiled settings for one class: rotations, HP safety rules, gear and taunt skill.
+
+    Safety rules are folded into one ``(hp_below, hp_above)`` bound per skill
+    when loaded, so :meth:`is_skill_safe` is a dict lookup and two compares.
+    """
+
+    def __init__(self, name: str, data: dict):
+        self.name = normalize(name)
+        self.rotation: Optional[Rotation] = _compile_rotation(data.get("rotation"))
+        self.rotations: Dict[str, Rotation] = {
+            key.lower(): _compile_rotation(steps) for key, steps in data.get("rotations", {}).items()
+        }
+        self.heal_skill: Optional[int] = data.get("heal_skill")
+        self.taunt_skill: Optional[int] = data.get("taunt_skill")
+        self.equipment: Dict[str, str] = dict(data.get("equipment", {}))
+        self._unsafe: Dict[int, Tuple[float, float]] = {}
+        for rule in data.get("unsafe", []):
+            below = float(rule.get("hp_below", -1))
+            above = float(rule.get("hp_above", 101))
+            for skill in rule.get("skills", []):
+                old_below, old_above = self._unsafe.get(int(skill), (-1.0, 101.0))
+                self._unsafe[int(skill)] = (max(old_below, below), min(old_above, above))
+
+    @property
+    def unsafe_skills(self) -> FrozenSet[int]:
+        return frozenset(self._unsafe)
+
+    def is_skill_safe(self, skill: int, hp_percent: float) -> bool:
+        bounds = self._unsafe.get(skill)
+        if bounds is None:
+            return True
+        return bounds[0] <= hp_percent <= bounds[1]
+
+    def rotation_for(self, fight: Optional[str] = None) -> Optional[Rotation]:
+        """Return the fight-specific rotation when one is defined, else the default one."""
+        if fight and fight.lower() in self.rotations:
+            return self.rotations[fight.lower()]
+        return self.rotation
+
+
+def _compile_rotation(steps: Optional[Iterable]) -> Optional[Rotation]:
+    if not steps:
+        return None
+    steps = list(steps)
+    if all(isinstance(step, int) for step in steps):
+        return Rotation.from_list(steps)
+    return Rotation([step if isinstance(step, int) else SkillStep(**step) for step in steps])
+
+
+def load_profile_file(path: str) -> Dict[str, dict]:
+    """Read raw profiles from a ``.json`` or ``.toml`` file keyed by class name."""
+    if path.endswith(".toml"):
+        if tomllib is None:
+            raise RuntimeError(f"TOML class profiles need Python 3.11+: {path}")
+        with open(path, "rb") as f:
+            return tomllib.load(f)
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+class ClassProfileRegistry:
+    """Class profiles keyed by normalized class name."""
+
+    def __init__(self):
+        self._profiles: Dict[str, ClassProfile] = {}
+
+    def load(self, path: str) -> None:
+        """Compile every profile in ``path``; later files override earlier ones per class."""
+        for name, data in load_profile_file(path).items():
+            profile = ClassProfile(name, data)
+            self._profiles[profile.name] = profile
+
+    def get(self, class_name: Optional[str]) -> Optional[ClassProfile]:
+        if not class_name:
+            return None
+        return self._profiles.get(normalize(class_name))
+
+    def names(self) -> List[str]:
+        return sorted(self._profiles)
+
+
+def _default_registry() -> ClassProfileRegistry:
+    registry = ClassProfileRegistry()
+    registry.load(DEFAULT_PROFILES_PATH)
+    # CLASS_PROFILES may list extra files (separated by os.pathsep) with your own overrides.
+    for path in filter(None, os.getenv("CLASS_PROFILES", "").split(os.pathsep)):
+        registry.load(path)
+    return registry
+
+
+_registry: Optional[ClassProfileRegistry] = None
+
+
+def get_registry() -> ClassProfileRegistry:
+    """Process-wide profiles, compiled on first use so ``CLASS_PROFILES`` from ``.env`` is seen."""
+    global _registry
+    if _registry is None:
+        _registry = _default_registry()
+    return _registry
+
+
+def get_class_profile(class_name: Optional[str]) -> Optional[ClassProfile]:
+    return get_registry().get(class_name)
@@ -0,0 +1,93 @@
+import asyncio
+import time
+from datetime import datetime
+from typing import Optional
+
+
+class Clock:
+    """Time source for bots, commands and handlers.
+
+    Everything that reads the time or sleeps goes through a clock so a
+    simulation can swap in :class:`VirtualClock` and run scripts faster
+    than real play.
+    """
+
+    speed: float = 1.0
+
+    def time(self) -> float:
+        return time.time()
+
+    def monotonic(self) -> float:
+        return time.monotonic()
+
+    def now(self) -> datetime:
+        return datetime.now()
+
+    def timestamp_ms(self) -> int:
+        return int(round(self.time() * 1000))
+
+    async def sleep(self, seconds: float) -> None:
+        await asyncio.sleep(seconds)
+
+    def sleep_sync(self, seconds: float) -> None:
+        time.sleep(seconds)
+
+
+class VirtualClock(Clock):
+    """Virtual time running ``speed`` times faster than the wall clock.
+
+    A 1 s ``sleep`` takes ``1 / speed`` real seconds while every reading
+    of the clock moves forward by the full second, so cooldowns, aura
+    expiry and timeouts keep their in-game meaning. ``advance`` jumps
+    virtual time forward without sleeping at all.
+    """
+
+    def __init__(self, speed: float = 50.0, start: Optional[float] = None):
+        if speed <= 0:
+            raise ValueError("speed must be positive")
+        self.speed = speed
+        self._start = time.time() if start is None else start
+        self._real_start = time.monotonic()
+        self._offset = 0.0
+
+    def _elapsed(self) -> float:
+        return (time.monotonic() - self._real_start) * self.speed + self._offset
+
+    def time(self) -> float:
+        return self._start + self._elapsed()
+
+    def monotonic(self) -> float:
+        return self._elapsed()
+
+    def now(self) -> datetime:
+        return datetime.fromtimestamp(self.time())
+
+    def advance(self, seconds: float) -> None:
+        self._offset += seconds
+
+    async def sleep(self, seconds: float) -> None:
+        await asyncio.sleep(max(0.0, seconds) / self.speed)
+
+    def sleep_sync(self, seconds: float) -> None:
+        time.sleep(max(0.0, seconds) / self.speed)
+
+
+_clock: Clock = Clock()
+
+
+def get_clock() -> Clock:
+    """Process-wide clock used by bots created without their own ``clock``."""
+    return _clock
+
+
+def set_clock(clock: Clock) -> Clock:
+    global _clock
+    _clock = clock
+    return clock
+
+
+def use_virtual_time(speed: float = 50.0) -> VirtualClock:
+    """Switch the process to accelerated virtual time (simulation mode)."""
+    clock = VirtualClock(speed)
+    set_clock(clock)
+    return clock
@@ -0,0 +1,67 @@
+import json
+import os
+from typing import Any, Callable, Dict, Optional
+
+try:
+    import orjson
+except ImportError:  # optional speed-up, stdlib json is used without it
+    orjson = None
+
+
+class JsonCodec:
+    """A named pair of JSON ``loads``/``dumps`` functions.
+
+    ``loads`` raises ``ValueError`` (``json.JSONDecodeError`` is a subclass,
+    and so is orjson's) on bad input whichever backend is used.
+    """
+
+    def __init__(self, name: str, loads: Callable[[str], Any], dumps: Callable[[Any], str]):
+        self.name = name
+        self.loads = loads
+        self.dumps = dumps
+
+    def __repr__(self) -> str:
+        return f"JsonCodec({self.name})"
+
+
+STDLIB = JsonCodec("stdlib", json.loads, json.dumps)
+
+CODECS: Dict[str, JsonCodec] = {"stdlib": STDLIB}
+if orjson is not None:
+    CODECS["orjson"] = JsonCodec("orjson", orjson.loads, lambda obj: orjson.dumps(obj).decode("utf-8"))
+
+
+def _pick(name: Optional[str]) -> JsonCodec:
+    name = (name or "auto").strip().lower()
+    if name == "auto":
+        return CODECS.get("orjson", STDLIB)
+    if name not in CODECS:
+        raise ValueError(f"JSON codec {name!r} is not available, choose from {sorted(CODECS)}")
+    return CODECS[name]
+
+
+# JSON_CODEC=stdlib forces the standard library even when orjson is installed. Launchers
+# that load .env after importing core apply it again with set_codec.
+codec: JsonCodec = _pick(os.getenv("JSON_CODEC"))
+
+
+def set_codec(name: str) -> JsonCodec:
+    global codec
+    codec = _pick(name)
+    return codec
+
+
+def loads(s: str) -> Any:
+    return codec.loads(s)
+
+
+def dumps(obj: Any) -> str:
+    return codec.dumps(obj)
+
+
+def is_valid_json(s: str) -> bool:
+    try:
+        codec.loads(s)
+        return True
+    except ValueError:
+        return False
@@ -1,13 +1,14 @@
 import asyncio
-import json
-import time
-from datetime import datetime
 from functools import wraps
 from inspect import iscoroutinefunction
-from typing import List, Optional, Union
+from typing import Coroutine, Dict, List, Optional, Union
 from colorama import Fore
 
+from core import codec
+from core.class_profile import get_class_profile
+from core.party_bus import PartyBus
 from core.player import Player
+from core.quest_probe import QuestStatus
 from core.utils import normalize
 from model.inventory import ItemInventory, ItemType, ScrollType
 from model.monster import Monster
@@ -17,63 +18,18 @@ from model.shop import Shop
 def check_alive(func):
     @wraps(func)
     def sync_wrapper(self: 'Command', *args, **kwargs):
-        if self.is_player_alive():
-            return func(self, *args, **kwargs)
-        start_time = time.time()
-        timeout = 11  # Maximum time to wait (in seconds)
-        count = 1
-        while self.is_still_connected():
-            if self.is_player_alive():
-                return func(self, *args, **kwargs)
-            if time.time() - start_time > timeout:
-                print("timeout from @check_alive sync")
-                self.bot.debug(Fore.MAGENTA + "respawned: from @check_alive sync" + Fore.WHITE)
-                self.bot.write_message(f"%xt%zm%resPlayerTimed%{self.bot.areaId}%{self.bot.user_id}%")
-                self.bot.jump_cell(self.bot.player.CELL, self.bot.player.PAD)
-                self.bot.player.ISDEAD = False
-                print("Spawned at cell:", self.bot.player.CELL, "pad:", self.bot.player.PAD)
-                # self.stopBot("from @check_alive sync")
-                return func(self, *args, **kwargs)
-            time.sleep(1)  # Avoid busy-waiting
-            count += 1
-        if not self.is_still_connected():
-            print("STOPPPPPPPP SYNC")
-            return
-        self.bot.debug(Fore.MAGENTA + "respawned: from @check_alive sync" + Fore.WHITE)
-        self.bot.write_message(f"%xt%zm%resPlayerTimed%{self.bot.areaId}%{self.bot.user_id}%")
-        self.bot.jump_cell(self.bot.player.CELL, self.bot.player.PAD)
-        self.bot.player.ISDEAD = False
-        print("Spawned at cell:", self.bot.player.CELL, "pad:", self.bot.player.PAD)
+        if not self.is_player_alive():
+            with self.bot.tracer.span("check_alive", "wait"):
+                if not self._wait_alive_sync():
+                    return
         return func(self, *args, **kwargs)
 
     @wraps(func)
     async def async_wrapper(self: 'Command', *args, **kwargs):
-        if self.is_player_alive():
-            return await func(self, *args, **kwargs)
-        start_time = time.time()
-        timeout = 11  # Maximum time to wait (in seconds)
-
-        while self.is_still_connected():
-            if self.is_player_alive():
-                return await func(self, *args, **kwargs)
-            if time.time() - start_time > timeout:
-                print("timeout from @check_alive async")
-                self.bot.debug(Fore.MAGENTA + "respawned: from @check_alive sync" + Fore.WHITE)
-                self.bot.write_message(f"%xt%zm%resPlayerTimed%{self.bot.areaId}%{self.bot.user_id}%")
-                self.bot.jump_cell(self.bot.player.CELL, self.bot.player.PAD)
-                self.bot.player.ISDEAD = False
-                print("Spawned at cell:", self.bot.player.CELL, "pad:", self.bot.player.PAD)
-                # self.stopBot("from @check_alive async")
-                return await func(self, *args, **kwargs)
-            await asyncio.sleep(1)  # Non-blocking wait
-        if not self.is_still_connected():
-            print("STOPPPPPPPP ASYNC")
-            return
-        self.bot.debug(Fore.MAGENTA + "respawned: from @check_alive async" + Fore.WHITE)
-        self.bot.write_message(f"%xt%zm%resPlayerTimed%{self.bot.areaId}%{self.bot.user_id}%")
-        self.bot.jump_cell(self.bot.player.CELL, self.bot.player.PAD)
-        self.bot.player.ISDEAD = False
-        print("Spawned at cell:", self.bot.player.CELL, "pad:", self.bot.player.PAD)
+        if not self.is_player_alive():
+            with self.bot.tracer.span("check_alive", "wait"):
+                if not await self._wait_alive_async():
+                    return
         return await func(self, *args, **kwargs)
     # Check if the function is async and use the appropriate wrapper
     return async_wrapper if iscoroutinefunction(func) else sync_wrapper
@@ -81,18 +37,12 @@ def check_alive(func):
 class Command:
     """Facade that exposes quest, item, map, combat, player, and utility helpers."""
         
-    quest_to_check: Optional[int] = None
-    is_green_quest_var: Optional[bool] = None
-    is_completed_before_var: Optional[bool] = None
     skill_reload_time: int = 0
 
-    def __init__(self, bot, init_handler = False):
+    def __init__(self, bot):
         from core.bot import Bot
         self.bot: Bot = bot
 
-        if init_handler:
-            self.bot.subscribe(self._message_handler)
-
     def is_still_connected(self) -> bool:
         """Check whether the client connection is still active."""
         self.bot.accept_quest
@@ -100,11 +50,47 @@ class Command:
 
     def is_valid_json(self, s: str) -> bool:
         """Return True when the provided string parses as JSON."""
-        try:
-            json.loads(s)
-            return True
-        except json.JSONDecodeError:
-            return False
+        return codec.is_valid_json(s)
+
+    def _respawn(self, source: str) -> None:
+        """Send a timed respawn and jump back to the current cell, as used by ``@check_alive``."""
+        self.bot.debug(Fore.MAGENTA + f"respawned: from @check_alive {source}" + Fore.WHITE)
+        self.bot.write_message(f"%xt%zm%resPlayerTimed%{self.bot.areaId}%{self.bot.user_id}%")
+        self.bot.jump_cell(self.bot.player.CELL, self.bot.player.PAD)
+        self.bot.player.ISDEAD = False
+        print("Spawned at cell:", self.bot.player.CELL, "pad:", self.bot.player.PAD)
+
+    def _wait_alive_sync(self) -> bool:
+        """Wait until the player is alive, respawning after a timeout. False when disconnected."""
+        start_time = self.bot.clock.time()
+        timeout = 11  # Maximum time to wait (in seconds)
+        while self.is_still_connected():
+            if self.is_player_alive():
+                return True
+            if self.bot.clock.time() - start_time > timeout:
+                print("timeout from @check_alive sync")
+                self._respawn("sync")
+                # self.stopBot("from @check_alive sync")
+                return True
+            self.bot.clock.sleep_sync(1)  # Avoid busy-waiting
+        print("STOPPPPPPPP SYNC")
+        return False
+
+    async def _wait_alive_async(self) -> bool:
+        """Non-blocking :meth:`_wait_alive_sync`."""
+        start_time = self.bot.clock.time()
+        timeout = 11  # Maximum time to wait (in seconds)
+        while self.is_still_connected():
+            if self.is_player_alive():
+                return True
+            if self.bot.clock.time() - start_time > timeout:
+                print("timeout from @check_alive async")
+                self._respawn("async")
+                # self.stopBot("from @check_alive async")
+                return True
+            await self.bot.clock.sleep(1)  # Non-blocking wait
+        print("STOPPPPPPPP ASYNC")
+        return False
 
     @check_alive
     async def ensure_accept_quest(self, quest_id: int) -> None:
@@ -150,7 +136,7 @@ class Command:
             None: The coroutine simply delays to allow server processing."""
         self.bot.accept_quest(quest_id)
         print("trying accept quest:", quest_id)
-        await asyncio.sleep(1)
+        await self.bot.clock.sleep(1)
 
     @check_alive
     async def turn_in_quest(self, quest_id: int, item_id: int = -1, qty: int = 1) -> None:
@@ -163,10 +149,9 @@ class Command:
 
         Returns:
             None: Updates quest tracking state and delays for server processing."""
-        self.quest_to_check = quest_id
         await self.bot.ensure_leave_from_combat()
         self.bot.turn_in_quest(quest_id, item_id, qty)
-        await asyncio.sleep(1)
+        await self.bot.clock.sleep(1)
 
     def quest_not_in_progress(self, quest_id: int) -> bool:
         """Return True when the quest is not currently tracked in progress."""
@@ -182,25 +167,34 @@ class Command:
         """Delegate to the bot helper that checks quest completion requirements."""
         return self.bot.can_turn_in_quest(questId)
 
+    @check_alive
+    async def get_quest_statuses(self, quest_ids: List[int], interval_ms: int = 100, timeout: float = 5) -> Dict[int, QuestStatus]:
+        """Probe many quests at once and return their status by quest id.
+
+        Probes are pipelined and each ``ccqr`` reply is matched by QuestID.
+        A quest that can already be turned in is turned in by the probe.
+
+        Args:
+            quest_ids (List[int]): Quests to probe.
+            interval_ms (int): Spacing between probe packets.
+            timeout (float): Seconds to wait for all replies.
+
+        Returns:
+            Dict[int, QuestStatus]: Status per quest, ``TIMEOUT`` when unanswered."""
+        await self.bot.ensure_leave_from_combat()
+        return await self.bot.quest_probe.probe_many(quest_ids, interval_ms, timeout)
+
     @check_alive
     async def is_green_quest(self, quest_id: int) -> bool:
-        """Check whether a quest is marked green (ready to turn in).
+        """Check whether a quest is marked green (unlocked but not yet turned in).
 
         Args:
             quest_id (int): Identifier of the quest to inspect.
 
         Returns:
             bool: True when the server reports the quest as green."""
-        await self.turn_in_quest(quest_id)
-        while(self.is_still_connected()):
-            if self.is_green_quest_var is not None:
-                output = self.is_green_quest_var
-                # print(f"{quest_id} is {self.is_green_quest_var}")
-                self.is_green_quest_var = None
-                return output
-            else:
-                await self.sleep(100)
-        return False
+        statuses = await self.get_quest_statuses([quest_id])
+        return statuses[int(quest_id)] == QuestStatus.GREEN
 
     @check_alive
     async def is_completed_before(self, quest_id: int) -> bool:
@@ -211,31 +205,38 @@ class Command:
 
         Returns:
             bool: True when the server indicates prior completion."""
-        await self.turn_in_quest(quest_id)
-        while(self.is_still_connected()):
-            if self.is_completed_before_var is not None:
-                output = self.is_completed_before_var
-                # print(f"{quest_id} is {self.is_green_quest_var}")
-                self.is_completed_before_var = None
-                return output
-            else:
-                await self.sleep(100)
-        return False
+        statuses = await self.get_quest_statuses([quest_id])
+        return statuses[int(quest_id)] == QuestStatus.ONE_TIME_DONE
+
+    @check_alive
+    async def accept_quests(self, quest_ids: List[int], interval_ms: int = 100, timeout: float = 5) -> Dict[int, bool]:
+        """Accept many quests pipelined and report which ones the server accepted.
+
+        Args:
+            quest_ids (List[int]): Quests to accept.
+            interval_ms (int): Spacing between accept packets.
+            timeout (float): Seconds to wait for all replies.
+
+        Returns:
+            Dict[int, bool]: True per accepted quest, False when refused or unanswered."""
+        return await self.bot.quest_probe.accept_many(quest_ids, interval_ms, timeout)
 
     @check_alive
     async def accept_quest_bulk(self, quest_id: int, increment: int, ensure:bool = False):
-        """Accept a range of quests sequentially.
+        """Accept a range of consecutive quests in one pipelined batch.
 
         Args:
             quest_id (int): Starting quest identifier.
             increment (int): Number of consecutive quest ids to process.
-            ensure (bool): Use ensure-accept logic for each quest when True."""
+            ensure (bool): Retry unanswered quests (up to 3 rounds) when True."""
         print(f"accepting quest from {quest_id} to {quest_id + increment}")
-        for i in range(increment):
-            if ensure:
-                await self.ensure_accept_quest(quest_id + i)
-            elif not ensure:
-                await self.accept_quest(quest_id + i)
+        quest_ids = [quest_id + i for i in range(increment)]
+        for _ in range(3 if ensure else 1):
+            results = await self.accept_quests(quest_ids)
+            quest_ids = [q for q, accepted in results.items()
+                         if not accepted and q not in self.bot.failed_get_quest_datas]
+            if not quest_ids or not self.is_still_connected():
+                break
 
     @check_alive
     async def register_quest(self, questId: int):
@@ -244,7 +245,7 @@ class Command:
         Args:
             questId (int): Identifier of the quest to register."""
         if questId not in self.bot.registered_auto_quest_ids:
-            self.bot.registered_auto_quest_ids.append(questId)
+            self.bot.quest_tracker.register(questId)
             await self.ensure_accept_quest(questId)
 
     async def buy_item_cmd(self, item_name: str, shop_id: int, qty: int = 1) -> None:
@@ -269,12 +270,12 @@ class Command:
                 if shop_item.item_name == item_name.lower():
                     packet = f"%xt%zm%buyItem%{self.bot.areaId}%{shop_item.item_id}%{shop.shop_id}%{shop_item.shop_item_id}%{qty}%"
                     self.bot.write_message(packet)
-                    await asyncio.sleep(0.5)
+                    await self.bot.clock.sleep(0.5)
                     break
         else:
             packet = f"%xt%zm%loadShop%{self.bot.areaId}%{shop_id}%"
             self.bot.write_message(packet)
-            await asyncio.sleep(1)
+            await self.bot.clock.sleep(1)
             self.bot.index -= 1
 
     def is_in_bank(self, itemName: str, itemQty: int = 1, operator: str = ">=") -> bool:
@@ -344,7 +345,7 @@ class Command:
             is_temp (bool): Whether to read from the temporary inventory.
 
         Returns:
-            None: Prints progress information to the console.
+            None: Logs progress information through the bot logger.
         """
         # Determine inventory type and fetch the item
         inventory_type = "temp" if is_temp else "inv"
@@ -357,15 +358,7 @@ class Command:
         item = get_inventory(item_name)
         inv_item_qty = item.qty if item else 0
 
-        # Prepare log message
-        current_time = datetime.now().strftime('%H:%M:%S')
-        message = (
-            f"{Fore.CYAN}[{current_time}] [{inventory_type}] {item_name} "
-            f"{inv_item_qty}/{item_qty}{Fore.RESET}"
-        )
-
-        # Print log message
-        print(message)
+        self.bot.log.info("[%s] %s %s/%s", inventory_type, item_name, inv_item_qty, item_qty, color=Fore.CYAN)
 
     @check_alive
     async def bank_to_inv(self, itemNames: Union[str, List[str]]) -> None:
@@ -398,7 +391,7 @@ class Command:
                     if itemBank.item_name == item.item_name:
                         self.bot.player.BANK.remove(itemBank)
                         break
-                await asyncio.sleep(1)
+                await self.bot.clock.sleep(1)
 
     @check_alive
     async def inv_to_bank(self, itemNames: Union[str, List[str]]) -> None:
@@ -432,7 +425,7 @@ class Command:
                     if itemInv.item_name == item.item_name:
                         self.bot.player.INVENTORY.remove(itemInv)
                         break
-                await asyncio.sleep(1)
+                await self.bot.clock.sleep(1)
 
     @check_alive
     async def equip_item(self, item_name: str) -> None:
@@ -458,7 +451,7 @@ class Command:
                 is_equipped = True
                 s_type = item.s_type
                 item.is_equipped = is_equipped
-                await asyncio.sleep(1)
+                await self.bot.clock.sleep(1)
                 break
         # Update unequip previous item
         if is_equipped and s_type:
@@ -483,7 +476,7 @@ class Command:
                 packet = f"%xt%zm%geia%{self.bot.areaId}%{item_type.value}%{item.s_meta}%{item.item_id}%"
                 self.bot.scroll_id = item.item_id
                 self.bot.write_message(packet)
-                await asyncio.sleep(1)
+                await self.bot.clock.sleep(1)
                 break
 
     @check_alive
@@ -501,11 +494,12 @@ class Command:
         if item:
             await self.equip_item(item.item_name)
 
-    def add_drop(self, itemName: Union[str, List[str]]) -> None:
+    def add_drop(self, itemName: Union[str, List[str]], cap: Optional[int] = None) -> None:
         """Add items to the drop whitelist handled by the bot.
 
         Args:
             itemName (Union[str, List[str]]): Single name or list of names to whitelist.
+            cap (int | None): Stop picking the item up once this many are held.
 
         Returns:
             None: Extends the whitelist in place.
@@ -514,8 +508,16 @@ class Command:
             itemName = [itemName]
 
         for item in itemName:
-            if item not in self.bot.items_drop_whitelist:
-                self.bot.items_drop_whitelist.append(item)
+            self.bot.drop_rules.add(item, cap)
+
+    def add_drop_pattern(self, pattern: str, cap: Optional[int] = None) -> None:
+        """Whitelist every drop whose name matches a glob pattern.
+
+        Args:
+            pattern (str): Case-insensitive glob, e.g. ``"* Essence"``.
+            cap (int | None): Stop picking a matching item up once this many are held.
+        """
+        self.bot.drop_rules.add_pattern(pattern, cap)
 
     @check_alive
     async def get_map_item(self, map_item_id: int, qty: int = 1) -> None:
@@ -530,7 +532,7 @@ class Command:
         """
         for _ in range(qty):
             self.bot.write_message(f"%xt%zm%getMapItem%{self.bot.areaId}%{map_item_id}%")
-            await asyncio.sleep(1)
+            await self.bot.clock.sleep(1)
 
     @check_alive
     async def load_shop(self, shop_id: int) -> None:
@@ -600,12 +602,12 @@ class Command:
                 if shop_item.item_name.lower() == item_name.lower():
                     packet = f"%xt%zm%buyItem%{self.bot.areaId}%{shop_item.item_id}%{shop.shop_id}%{shop_item.shop_item_id}%{qty}%"
                     self.bot.write_message(packet)
-                    await asyncio.sleep(1)
+                    await self.bot.clock.sleep(1)
                     break
         else:
             packet = f"%xt%zm%loadShop%{self.bot.areaId}%{shop_id}%"
             self.bot.write_message(packet)
-            await asyncio.sleep(1)
+            await self.bot.clock.sleep(1)
             await self.buy_item(shop_id, item_name, qty)
 
     @check_alive
@@ -623,31 +625,121 @@ class Command:
                     return
             packet = f"%xt%zm%loadShop%{self.bot.areaId}%{shop_id}%"
             self.bot.write_message(packet)
-            await asyncio.sleep(1)
+            await self.bot.clock.sleep(1)
 
     def wait_count_player(self, player_count: int) -> bool:
         """Check if the current map has at least the requested player count."""
-        return len(self.bot.user_ids) >= player_count
+        return self.bot.room.user_count >= player_count
 
     def wait_count_player_in_cell(self, cell: str, player_count: int) -> bool:
         """Check if a cell hosts at least the requested number of players."""
-        count = 0
-        cell = cell.lower()
-        for player in self.bot.player_in_area:
-            print(player.str_username, player.str_frame, cell)
-            if player.str_frame.lower() == cell:
-                count += 1
-
-        if self.bot.player.CELL.lower() == cell:
+        return self._count_room_players_in_cell(cell) >= player_count
+
+    def _count_room_players_in_cell(self, cell: str) -> int:
+        count = self.bot.room.count_in_cell(cell)
+        # our own cell in the roster is only set on map join, so count ourselves from player.CELL
+        me = self.bot.room.get(self.bot.player.USER)
+        if me and me.str_frame and me.str_frame.lower() == cell.lower():
+            count -= 1
+        if self.bot.player.CELL.lower() == cell.lower():
             count += 1
-        return count >= player_count
+        return count
+
+    def count_players(self, cell: Optional[str] = None) -> int:
+        """Players in the current map (or ``cell``), from the room roster and the party.
+
+        Party members of other processes, or players outside the party, only
+        show up in the room; the party knows members before their ``uotls`` arrives.
+        """
+        count = self._count_room_players_in_cell(cell) if cell else self.bot.room.user_count
+        if self.bot.party:
+            count = max(count, self.bot.party.count_in(self.bot.strMapName, cell))
+        return count
+
+    async def wait_for_players(self, player_count: int, cell: Optional[str] = None, timeout: Optional[float] = None) -> bool:
+        """Wait until enough players are in the current map (and ``cell`` when given).
+
+        Players are counted with :meth:`count_players`, so both the room and a
+        joined :class:`PartyBus` count. The room is polled every 100 ms; party
+        members arriving wake the wait right away.
+
+        Args:
+            player_count (int): Players required, including this bot.
+            cell (str | None): Restrict the count to this cell.
+            timeout (float | None): Seconds to wait before giving up.
+
+        Returns:
+            bool: True when the count was reached.
+        """
+        reached = lambda: self.count_players(cell) >= player_count
+        deadline = None if timeout is None else self.bot.clock.monotonic() + timeout
+        while self.is_still_connected():
+            if reached():
+                return True
+            if deadline is not None and self.bot.clock.monotonic() >= deadline:
+                return False
+            if self.bot.party:
+                await self.bot.party.wait_until(reached, 0.1)
+            else:
+                await self.sleep(100)
+        return False
+
+    def join_party(self, party: Union[PartyBus, str]) -> PartyBus:
+        """Join an in-process party so members share position, targets and barriers.
+
+        Args:
+            party (PartyBus | str): Party object or the name of a shared party.
+
+        Returns:
+            PartyBus: The party joined.
+        """
+        if isinstance(party, str):
+            party = PartyBus.shared(party)
+        self.bot.join_party(party)
+        return party
+
+    def is_step_done(self, step: str) -> bool:
+        """Return True when ``step`` was finished by an earlier run of this script.
+
+        Args:
+            step (str): Step name, unique within the script.
+        """
+        return bool(self.bot.checkpoints and self.bot.checkpoints.is_done(step))
+
+    def mark_step_done(self, step: str) -> None:
+        """Record ``step`` as finished so a restarted script skips it.
+
+        Args:
+            step (str): Step name, unique within the script.
+        """
+        if self.bot.checkpoints:
+            self.bot.checkpoints.mark_done(step)
+
+    async def run_step(self, step: str, func, *args, **kwargs) -> bool:
+        """Run ``func(self, *args, **kwargs)`` unless the step is already checkpointed.
+
+        The step is only marked done when it returns while the bot is still
+        connected; a step cut short by a disconnect runs again after relogin.
+        Checkpoints are cleared once the whole script finishes.
+
+        Args:
+            step (str): Step name, unique within the script.
+            func (Callable): Async function taking this Command as first argument.
+
+        Returns:
+            bool: True when the step ran, False when it was skipped.
+        """
+        if self.is_step_done(step):
+            self.bot.log.info("Skipping finished step: %s", step, color=Fore.YELLOW)
+            return False
+        await func(self, *args, **kwargs)
+        if self.is_still_connected():
+            self.mark_step_done(step)
+        return True
 
     def get_player_in_map(self, name: str) -> Optional[PlayerArea]:
         """Return the area record for a player in the current map, if present."""
-        for player in self.bot.player_in_area:
-            if player.str_username.lower() == name.lower():
-                return player
-        return None
+        return self.bot.room.get(name)
 
     def is_player_in_cell(self, name: str, cell: str) -> bool:
         """Return True when a named player is currently in the given cell."""
@@ -663,12 +755,7 @@ class Command:
         Args:
             player_name (str): Target player name to follow.
         """
-        player_in_map = self.get_player_in_map(player_name)
-        if player_in_map:
-            self.bot.jump_cell(player_in_map.str_frame, player_in_map.str_pad)
-        else:
-            await self.bot.ensure_leave_from_combat(always=True)
-            self.bot.write_message(f"%xt%zm%cmd%1%goto%{player_name}%")
+        if not await self.bot.goto_player(player_name, leave_combat=True):
             await self.sleep(1000)
 
     @check_alive
@@ -738,7 +825,7 @@ class Command:
         if self.bot.player.CELL.lower() != cell.lower() or self.bot.player.PAD.lower() != pad.lower():
             self.bot.jump_cell(cell, pad)
             #print(f"jump cell: {cell} {pad}")
-            await asyncio.sleep(1)
+            await self.bot.clock.sleep(1)
 
     def is_not_in_cell(self, cell: str) -> bool:
         """Check whether the player is standing in a different cell.
@@ -848,7 +935,7 @@ class Command:
                 if cell == self.bot.player.CELL:
                     return
                 self.bot.jump_cell(cell, "Left")
-                await asyncio.sleep(1)
+                await self.bot.clock.sleep(1)
                 return
         for monster in self.bot.monsters:
             if (monster.mon_name.lower() == monsterName.lower() or monster.mon_map_id == monsterName )\
@@ -856,7 +943,7 @@ class Command:
                     and self.bot.player.CELL != monster.frame:
                 # TODO need to handle the rigth pad
                 self.bot.jump_cell(monster.frame, "Left")
-                await asyncio.sleep(1)
+                await self.bot.clock.sleep(1)
                 return
 
     @check_alive
@@ -883,39 +970,13 @@ class Command:
         Returns:
             bool: True when the skill can be used safely for the equipped class.
         """
-        conditions = {
-            "void highlord": {
-                "hp_threshold": 50, # in percentage of current hp from max hp
-                "skills_to_check": [1, 3],
-                "condition": lambda hp, threshold: hp < threshold
-            },
-            "scarlet sorceress": {
-                "hp_threshold": 50,
-                "skills_to_check": [1, 4],
-                "condition": lambda hp, threshold: hp < threshold
-            },
-            "dragon of time": {
-                "hp_threshold": 40,
-                "skills_to_check": [1, 3],
-                "condition": lambda hp, threshold: hp < threshold
-            },
-            # "archpaladin": {
-            #     "hp_threshold": 70,
-            #     "skills_to_check": [2],
-            #     "condition": lambda hp, threshold: hp > threshold
-            # },
-        }
-        # Get the class and its conditions
+        # Thresholds live in core/data/class_profiles.json and are compiled once, on first use.
         equipped_class = self.bot.player.get_equipped_item(ItemType.CLASS)
-        if equipped_class:
-            if equipped_class.item_name in conditions:
-                condition = conditions[equipped_class.item_name]
-                current_hp = self.bot.player.CURRENT_HP
-                max_hp = self.bot.player.MAX_HP
-                # Check if the current conditions match
-                if skill in condition["skills_to_check"] and condition["condition"]((current_hp / max_hp) * 100, condition["hp_threshold"]):
-                    return False
-        return True
+        profile = get_class_profile(equipped_class.item_name) if equipped_class else None
+        if profile is None:
+            return True
+        player = self.bot.player
+        return profile.is_skill_safe(skill, (player.CURRENT_HP / player.MAX_HP) * 100)
 
     @check_alive
     async def use_skill(self,  
@@ -944,7 +1005,7 @@ class Command:
         self.bot.skillAnim = skill.get("anim", None)
         max_target = int(skill.get("tgtMax", 1))
 
-        wait_reload_s = (self.skill_reload_time - int(round(datetime.now().timestamp() * 1000))) / 1000
+        wait_reload_s = (self.skill_reload_time - self.bot.clock.timestamp_ms()) / 1000
         if wait_reload_s > 0 and index != 0:
             # print(Fore.BLUE + f"[{datetime.now().strftime('%H:%M:%S')}] wait reload skill:{index} cd:{wait_reload_s:.2f} s" + Fore.RESET)
             await self.sleep(wait_reload_s*1000)
@@ -1014,7 +1075,7 @@ class Command:
         await self.sleep(200)
         self.bot.player.updateNextUse(index) # do this if skills is REALLY exetuced
 
-        self.skill_reload_time = int(round(datetime.now().timestamp() * 1000)) + reload_delay
+        self.skill_reload_time = self.bot.clock.timestamp_ms() + reload_delay
 
     @check_alive
     def do_pwd(self, monster_id: str) -> None:
@@ -1151,9 +1212,13 @@ class Command:
         return self.bot.player.getPlayerPositionXY()
 
     def stop_bot(self, msg: str = "") -> None:
-        """Print a stop message and terminate the bot session."""
+        """Print a stop message and terminate the bot session.
+
+        A deliberate stop: the bot does not relogin afterwards, even with ``autoRelogin``.
+        """
         print(Fore.RED + msg + Fore.RESET)
         print(Fore.RED + "stop bot: " + self.bot.player.USER + Fore.RESET)
+        self.bot.auto_relogin = False
         self.bot.stop_bot()
 
     async def send_chat(self, message: str) -> None:
@@ -1167,40 +1232,28 @@ class Command:
     @check_alive
     async def sleep(self,  milliseconds: int) -> None:
         """Asynchronously sleep for the requested number of milliseconds."""
-        await asyncio.sleep(milliseconds/1000)
+        await self.bot.clock.sleep(milliseconds/1000)
+
+    def spawn(self, coro: Coroutine, name: Optional[str] = None) -> asyncio.Task:
+        """Run ``coro`` in the background for the current script only.
+
+        The task is cancelled when the script ends or is replaced, unlike a bare
+        ``asyncio.create_task`` that outlives a hot reload.
+
+        Args:
+            coro (Coroutine): Coroutine to run.
+            name (str, optional): Task name.
+
+        Returns:
+            asyncio.Task: The started task.
+        """
+        if self.bot.script_scope is not None:
+            return self.bot.script_scope.spawn(coro, name=name)
+        return asyncio.create_task(coro, name=name)
 
     async def send_packet(self, packet: str) -> None:
         """Send a raw packet to the server after validating connectivity."""
         if not self.is_still_connected():
             return
         self.bot.write_message(packet)
-        await asyncio.sleep(0.5)
-
-    def _message_handler(self, message: str) -> None:
-        """Handle server messages to update quest status flags."""
-        if not message:
-            return
-        if self.is_valid_json(message):
-            data = json.loads(message)
-        else:
-            return
-        try:
-            data = data["b"]["o"]
-        except Exception:
-            return
-        cmd = data.get("cmd")
-        if cmd != "ccqr":
-            return
-        quest_id = data.get('QuestID')
-        ccqr_msg = data.get('msg', '')
-        if data.get('bSuccess', 0) == 1:
-            return
-        if quest_id is None or int(quest_id) != self.quest_to_check:
-            return
-        if "Missing Turn In Item" in ccqr_msg:
-            self.is_green_quest_var = True
-        if "Missing Quest Progress" in ccqr_msg:
-            self.is_green_quest_var = False
-        if "One Time Quest Only" in ccqr_msg:
-            self.is_green_quest_var = False
-            self.is_completed_before_var = True
+        await self.bot.clock.sleep(0.5)
@@ -0,0 +1,105 @@
+import fnmatch
+import re
+from typing import Callable, Dict, Iterable, List, Optional, Pattern, Tuple
+
+from core.utils import normalize
+from model.inventory import ItemInventory
+
+_NO_MATCH = object()
+
+
+class DropRules:
+    """Compiled drop whitelist: exact names, glob patterns and optional per-item caps.
+
+    Names are normalized once when added, so a drop is a set lookup plus, for
+    names seen the first time, one pass over the patterns. A cap is the most
+    of an item to hold; drops beyond it are rejected. Accept/reject counts
+    are kept for metrics.
+    """
+
+    def __init__(self, names: Iterable[str] = ()):
+        self._names: Dict[str, Optional[int]] = {}
+        self._display: Dict[str, str] = {}
+        self._patterns: List[Tuple[str, Pattern, Optional[int]]] = []
+        self._match_cache: Dict[str, object] = {}
+        self.accepted = 0
+        self.rejected = 0
+        self.capped = 0
+        self.accepted_by_item: Dict[str, int] = {}
+        for name in names:
+            self.add(name)
+
+    def add(self, name: str, cap: Optional[int] = None) -> None:
+        key = normalize(name)
+        if key in self._names and cap is None:
+            return
+        self._names[key] = cap
+        self._display.setdefault(key, name)
+        self._match_cache.pop(key, None)
+
+    def add_pattern(self, pattern: str, cap: Optional[int] = None) -> None:
+        """Accept every item whose name matches a glob such as ``"* Essence"``."""
+        compiled = re.compile(fnmatch.translate(normalize(pattern)))
+        self._patterns = [p for p in self._patterns if p[0] != pattern] + [(pattern, compiled, cap)]
+        self._match_cache.clear()
+
+    def remove(self, name: str) -> None:
+        key = normalize(name)
+        self._names.pop(key, None)
+        self._display.pop(key, None)
+        self._match_cache.pop(key, None)
+
+    def names(self) -> List[str]:
+        return list(self._display.values())
+
+    def patterns(self) -> List[str]:
+        return [p[0] for p in self._patterns]
+
+    def __contains__(self, name: str) -> bool:
+        return self._match(normalize(name)) is not _NO_MATCH
+
+    def __len__(self) -> int:
+        return len(self._names) + len(self._patterns)
+
+    def _match(self, key: str):
+        """Cap for a normalized name (None = no cap), or ``_NO_MATCH``."""
+        if key in self._names:
+            return self._names[key]
+        cached = self._match_cache.get(key)
+        if cached is None and key not in self._match_cache:
+            cached = _NO_MATCH
+            for _, compiled, cap in self._patterns:
+                if compiled.match(key):
+                    cached = cap
+                    break
+            self._match_cache[key] = cached
+        return cached
+
+    def select(self, items: Iterable[ItemInventory], held: Callable[[ItemInventory], int]) -> List[ItemInventory]:
+        """Return every whitelisted item of one ``dropItem`` packet that is still under its cap.
+
+        Args:
+            items: Dropped items.
+            held: Returns how many of an item the player already has.
+        """
+        picked = []
+        for item in items:
+            cap = self._match(item.item_name)
+            if cap is _NO_MATCH:
+                self.rejected += 1
+                continue
+            if cap is not None and held(item) >= cap:
+                self.capped += 1
+                continue
+            self.accepted += 1
+            self.accepted_by_item[item.item_name] = self.accepted_by_item.get(item.item_name, 0) + 1
+            picked.append(item)
+        return picked
+
+    def metrics(self) -> Dict[str, object]:
+        return {
+            "accepted": self.accepted,
+            "rejected": self.rejected,
+            "capped": self.capped,
+            "accepted_by_item": dict(self.accepted_by_item),
+        }
@@ -0,0 +1,271 @@
+import asyncio
+import xml.etree.ElementTree as ET
+from enum import Enum
+from inspect import iscoroutinefunction
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
+
+from core import codec
+from core.logger import BotLogger
+from core.script_scope import current_scope
+
+
+# how far into a frame Packet.peek_cmd looks for the envelope and the cmd key
+PEEK_LIMIT = 256
+
+
+class PacketKind(Enum):
+    JSON = "json"
+    XML = "xml"
+    STR = "str"  # %xt%...% packets
+    UNKNOWN = "unknown"
+
+
+class DropPolicy(Enum):
+    OLDEST = "oldest"  # drop the oldest queued packet to make room
+    NEWEST = "newest"  # drop the incoming packet
+
+
+class Packet:
+    """A server frame decoded once and shared by every handler.
+
+    Attributes:
+        raw: Original frame string.
+        kind: Frame format.
+        cmd: Command name (``data["cmd"]`` for JSON, ``parts[2]`` for ``%xt%``
+            frames, body action for XML), or None when unknown.
+        data: ``b.o`` payload for JSON frames.
+        parts: ``raw.split('%')`` for ``%xt%`` frames.
+        xml: Parsed root element for XML frames.
+    """
+
+    __slots__ = ("raw", "kind", "cmd", "data", "parts", "xml")
+
+    def __init__(self, raw: str, kind: PacketKind, cmd: Optional[str] = None,
+                 data: Optional[dict] = None, parts: Optional[List[str]] = None,
+                 xml: Optional[ET.Element] = None):
+        self.raw = raw
+        self.kind = kind
+        self.cmd = cmd
+        self.data = data
+        self.parts = parts
+        self.xml = xml
+
+    @staticmethod
+    def peek_cmd(raw: str) -> Optional[str]:
+        """Read ``cmd`` of a JSON frame without decoding it, or None when unsure.
+
+        Only a ``"cmd":"..."`` that comes before any nested object or array
+        inside ``b.o`` is trusted, so a nested action's ``cmd`` (e.g. the
+        ``aura+`` entries of ``ct``) is never mistaken for the frame's.
+        """
+        start = raw.find('"o":{', 0, PEEK_LIMIT)
+        if start < 0:
+            return None
+        start += 5
+        at = raw.find('"cmd":"', start, start + PEEK_LIMIT)
+        if at < 0:
+            return None
+        head = raw[start:at]
+        if "{" in head or "[" in head:
+            return None
+        end = raw.find('"', at + 7, at + 7 + PEEK_LIMIT)
+        return raw[at + 7:end] if end > 0 else None
+
+    @classmethod
+    def parse(cls, raw: str) -> "Packet":
+        if raw.startswith("{"):
+            try:
+                decoded = codec.loads(raw)
+            except ValueError:
+                return cls(raw, PacketKind.UNKNOWN)
+            try:
+                data = decoded["b"]["o"]
+            except (KeyError, TypeError):
+                return cls(raw, PacketKind.JSON)
+            return cls(raw, PacketKind.JSON, cmd=data.get("cmd"), data=data)
+        if raw.startswith("<"):
+            try:
+                root = ET.fromstring(raw)
+            except ET.ParseError:
+                return cls(raw, PacketKind.UNKNOWN)
+            body = root.find("body")
+            action = body.get("action") if body is not None else None
+            return cls(raw, PacketKind.XML, cmd=action, xml=root)
+        if raw.startswith("%") and raw.endswith("%"):
+            parts = raw.split('%')
+            return cls(raw, PacketKind.STR, cmd=parts[2] if len(parts) > 2 else None, parts=parts)
+        return cls(raw, PacketKind.UNKNOWN)
+
+
+PacketHandler = Callable[[Packet], Any]
+
+
+class Subscription:
+    """A handler registered on an :class:`EventBus`.
+
+    Sync handlers without a queue run inline in the reader. Async handlers, and
+    sync handlers given ``queue_size``, get a bounded queue drained by their own
+    task, so a slow subscriber never stalls packet processing.
+    """
+
+    def __init__(self, bus: "EventBus", handler: PacketHandler, cmds: Optional[Iterable[str]],
+                 kinds: Optional[Iterable[PacketKind]], queue_size: Optional[int], drop: DropPolicy):
+        self.bus = bus
+        self.handler = handler
+        self.cmds = set(cmds) if cmds else None
+        self.kinds = set(kinds) if kinds else None
+        self.is_async = iscoroutinefunction(handler)
+        self.queue_size = queue_size if queue_size else (100 if self.is_async else 0)
+        self.drop = drop
+        self.dropped = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def is_queued(self) -> bool:
+        return self.queue_size > 0
+
+    def _accepts(self, packet: Packet) -> bool:
+        return self.kinds is None or packet.kind in self.kinds
+
+    def _deliver(self, packet: Packet) -> None:
+        if not self.is_queued:
+            self.bus._call(self, packet)
+            return
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.queue_size)
+            self._task = asyncio.create_task(self._worker())
+        if self._queue.full():
+            self.dropped += 1
+            if self.drop == DropPolicy.NEWEST:
+                return
+            self._queue.get_nowait()
+        self._queue.put_nowait(packet)
+
+    async def _worker(self) -> None:
+        while True:
+            packet = await self._queue.get()
+            if self.is_async:
+                try:
+                    await self.handler(packet)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    self.bus._report(self, e)
+            else:
+                self.bus._call(self, packet)
+
+    def cancel(self) -> None:
+        """Unsubscribe and stop the worker task, dropping queued packets."""
+        self.bus.unsubscribe(self)
+
+
+class EventBus:
+    """Dispatch decoded packets to handlers subscribed by cmd and/or packet kind."""
+
+    def __init__(self, log: Optional[BotLogger] = None):
+        self.log = log
+        self._by_cmd: Dict[str, List[Subscription]] = {}
+        self._any: List[Subscription] = []
+
+    def subscribe(self,
+                  handler: PacketHandler,
+                  cmds: Union[str, Iterable[str], None] = None,
+                  kinds: Union[PacketKind, Iterable[PacketKind], None] = None,
+                  queue_size: Optional[int] = None,
+                  drop: DropPolicy = DropPolicy.OLDEST) -> Subscription:
+        """Register ``handler`` for packets matching ``cmds`` and ``kinds``.
+
+        Args:
+            handler: Sync or async callable receiving a :class:`Packet`.
+            cmds: Command name(s) to receive, or None for every command.
+            kinds: Packet kind(s) to receive, or None for every kind.
+            queue_size: Queue bound for the handler. Async handlers default to 100.
+            drop: What to drop when the queue is full.
+
+        Returns:
+            Subscription: Handle that can be passed to :meth:`unsubscribe`. When
+            ``handler`` is already subscribed with the same ``cmds`` and ``kinds``
+            (e.g. ``main`` running again after a relogin), that subscription is
+            returned instead of registering the handler twice. Subscriptions made
+            from a script are cancelled when that script run ends.
+        """
+        if isinstance(cmds, str):
+            cmds = [cmds]
+        if isinstance(kinds, PacketKind):
+            kinds = [kinds]
+        existing = self.find(handler, cmds, kinds)
+        if existing is not None:
+            return existing
+        sub = Subscription(self, handler, cmds, kinds, queue_size, drop)
+        if sub.cmds is None:
+            self._any.append(sub)
+        else:
+            for cmd in sub.cmds:
+                self._by_cmd.setdefault(cmd, []).append(sub)
+        scope = current_scope.get()
+        if scope is not None:
+            scope.subscriptions.append(sub)
+        return sub
+
+    def find(self, handler: PacketHandler, cmds: Optional[Iterable[str]] = None,
+             kinds: Optional[Iterable[PacketKind]] = None) -> Optional[Subscription]:
+        """The subscription of ``handler`` with exactly these ``cmds`` and ``kinds``, if any."""
+        cmds = set(cmds) if cmds else None
+        kinds = set(kinds) if kinds else None
+        candidates = self._any if cmds is None else self._by_cmd.get(next(iter(cmds)), [])
+        for sub in candidates:
+            if sub.handler == handler and sub.cmds == cmds and sub.kinds == kinds:
+                return sub
+        return None
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        if sub in self._any:
+            self._any.remove(sub)
+        for cmd in sub.cmds or ():
+            subs = self._by_cmd.get(cmd)
+            if subs and sub in subs:
+                subs.remove(sub)
+                if not subs:
+                    del self._by_cmd[cmd]
+        if sub._task:
+            sub._task.cancel()
+            sub._task = None
+        sub._queue = None
+
+    def has_subscribers(self, cmd: Optional[str]) -> bool:
+        return bool(self._any) or cmd in self._by_cmd
+
+    def wants(self, cmd: Optional[str], kind: PacketKind) -> bool:
+        """True when some subscription would receive a ``kind`` packet with this cmd."""
+        if cmd in self._by_cmd:
+            return True
+        return any(sub.kinds is None or kind in sub.kinds for sub in self._any)
+
+    def publish(self, packet: Packet) -> None:
+        subs = self._by_cmd.get(packet.cmd) if packet.cmd is not None else None
+        if subs:
+            for sub in subs[:]:
+                if sub._accepts(packet):
+                    sub._deliver(packet)
+        for sub in self._any[:]:
+            if sub._accepts(packet):
+                sub._deliver(packet)
+
+    def clear(self) -> None:
+        for sub in self._any[:]:
+            self.unsubscribe(sub)
+        for subs in list(self._by_cmd.values()):
+            for sub in subs[:]:
+                self.unsubscribe(sub)
+
+    def _call(self, sub: Subscription, packet: Packet) -> None:
+        try:
+            sub.handler(packet)
+        except Exception as e:
+            self._report(sub, e)
+
+    def _report(self, sub: Subscription, error: Exception) -> None:
+        name = getattr(sub.handler, "__qualname__", repr(sub.handler))
+        if self.log:
+            self.log.error("event handler %s failed: %s", name, error)
@@ -0,0 +1,196 @@
+import asyncio
+import math
+from collections import deque
+from dataclasses import dataclass, replace
+from typing import Deque, Dict, Iterable, List, Optional, Set
+
+from colorama import Fore
+
+from core.command import Command
+from core.task import FarmTask, do_farm_tasks
+
+# Default number of chunks a quota is cut into, so late joiners still find work to steal.
+CHUNKS_PER_QUOTA = 8
+
+
+@dataclass
+class FarmChunk:
+    task: FarmTask
+    qty: int
+
+
+class FarmWorker:
+    """One account taking part in a :class:`FarmQueue`.
+
+    ``maps`` limits the maps the account will farm (None means any map) and
+    ``can_solo`` says whether it may take ``is_solo`` tasks; by default that
+    follows whether the bot has a solo class configured.
+    """
+
+    def __init__(self, cmd: Command, maps: Optional[Iterable[str]] = None, can_solo: Optional[bool] = None):
+        self.cmd = cmd
+        self.name = cmd.bot.player.USER or f"bot-{id(cmd.bot)}"
+        self.maps: Optional[Set[str]] = {m.lower() for m in maps} if maps else None
+        self.can_solo = bool(cmd.get_solo_class()) if can_solo is None else can_solo
+        self.chunks: Deque[FarmChunk] = deque()
+        self.full_items: Set[str] = set()
+        self.farmed = 0
+
+    def can_do(self, task: FarmTask) -> bool:
+        if task.item_name.lower() in self.full_items:
+            return False
+        if task.is_solo and not self.can_solo:
+            return False
+        return self.maps is None or task.map_name.lower() in self.maps
+
+    def held(self, item_name: str) -> int:
+        player = self.cmd.bot.player
+        inv_qty = max(player.isInInventory(item_name)[1], player.isInInventory(item_name, isTemp=True)[1])
+        return int(inv_qty) + int(player.isInBank(item_name)[1])
+
+
+class FarmQueue:
+    """Shared farm work for every bot running in this process.
+
+    Each task gets a fleet-wide ``quota``; ``FarmTask.qty`` stays the most a
+    single account can hold. Quotas are cut into chunks that workers pull in
+    batches, preferring their current map. A worker whose own batch runs dry
+    steals from the back of the busiest eligible worker, so accounts that
+    join late or farm faster pick up the slack::
+
+        queue = FarmQueue.shared("darkon")
+        queue.add(FarmTask("Brass", 10, "astraviajudge", "r3", "Left"), quota=40)
+        await queue.work(cmd)
+    """
+
+    _registry: Dict[str, "FarmQueue"] = {}
+
+    def __init__(self, name: str = "", chunk_qty: Optional[int] = None):
+        self.name = name
+        self.chunk_qty = chunk_qty
+        self.quotas: Dict[str, int] = {}
+        self.delivered: Dict[str, int] = {}
+        self.tasks: Dict[str, FarmTask] = {}
+        self.backlog: Deque[FarmChunk] = deque()
+        self.workers: List[FarmWorker] = []
+        self.in_flight = 0
+        self._changed: Optional[asyncio.Event] = None
+
+    @classmethod
+    def shared(cls, name: str, chunk_qty: Optional[int] = None) -> "FarmQueue":
+        """Return the process-wide queue called ``name``, creating it on first use."""
+        if name not in cls._registry:
+            cls._registry[name] = cls(name, chunk_qty)
+        return cls._registry[name]
+
+    def add(self, task: FarmTask, quota: int) -> None:
+        """Queue ``quota`` units of ``task.item_name`` for the fleet. Re-adding an item is a no-op."""
+        key = task.item_name.lower()
+        if key in self.quotas:
+            return
+        self.quotas[key] = quota
+        self.delivered[key] = 0
+        self.tasks[key] = task
+        size = self.chunk_qty or max(1, min(task.qty, math.ceil(quota / CHUNKS_PER_QUOTA)))
+        remaining = quota
+        while remaining > 0:
+            qty = min(size, remaining)
+            self.backlog.append(FarmChunk(task, qty))
+            remaining -= qty
+        self._notify()
+
+    def progress(self) -> Dict[str, tuple]:
+        """Return ``{item_name: (delivered, quota)}`` summed over all accounts."""
+        return {self.tasks[key].item_name: (self.delivered[key], quota) for key, quota in self.quotas.items()}
+
+    def is_done(self) -> bool:
+        return all(self.delivered[key] >= quota for key, quota in self.quotas.items())
+
+    def _notify(self) -> None:
+        if self._changed is None:
+            self._changed = asyncio.Event()
+        self._changed.set()
+
+    async def _wait_for_change(self) -> None:
+        if self._changed is None:
+            self._changed = asyncio.Event()
+        self._changed.clear()
+        await self._changed.wait()
+
+    def _refill(self, worker: FarmWorker) -> None:
+        """Move a fair share of eligible backlog chunks to ``worker``, current map first."""
+        eligible = [chunk for chunk in self.backlog if worker.can_do(chunk.task)]
+        if not eligible:
+            return
+        share = math.ceil(len(eligible) / max(1, len(self.workers)))
+        current_map = worker.cmd.bot.strMapName.lower()
+        eligible.sort(key=lambda chunk: chunk.task.map_name.lower() != current_map)
+        for chunk in eligible[:share]:
+            self.backlog.remove(chunk)
+            worker.chunks.append(chunk)
+
+    def _steal(self, worker: FarmWorker) -> Optional[FarmChunk]:
+        victims = sorted((w for w in self.workers if w is not worker and w.chunks),
+                         key=lambda w: len(w.chunks), reverse=True)
+        for victim in victims:
+            for chunk in reversed(victim.chunks):
+                if worker.can_do(chunk.task):
+                    victim.chunks.remove(chunk)
+                    return chunk
+        return None
+
+    def _next_chunk(self, worker: FarmWorker) -> Optional[FarmChunk]:
+        if not worker.chunks:
+            self._refill(worker)
+        while worker.chunks:
+            chunk = worker.chunks.popleft()
+            if worker.can_do(chunk.task):
+                return chunk
+            self.backlog.append(chunk)
+        return self._steal(worker)
+
+    async def work(self, cmd: Command, maps: Optional[Iterable[str]] = None, can_solo: Optional[bool] = None) -> FarmWorker:
+        """Farm chunks for the fleet until every quota is met or nothing is left for this account."""
+        worker = FarmWorker(cmd, maps, can_solo)
+        self.workers.append(worker)
+        try:
+            while cmd.is_still_connected() and not self.is_done():
+                chunk = self._next_chunk(worker)
+                if chunk is None:
+                    if self.in_flight == 0:
+                        break
+                    # Another account may hand back an unfinished chunk.
+                    await self._wait_for_change()
+                    continue
+                await self._farm_chunk(worker, chunk)
+        finally:
+            self.workers.remove(worker)
+            self.backlog.extend(worker.chunks)
+            worker.chunks.clear()
+            self._notify()
+        return worker
+
+    async def _farm_chunk(self, worker: FarmWorker, chunk: FarmChunk) -> None:
+        key = chunk.task.item_name.lower()
+        before = worker.held(chunk.task.item_name)
+        target = min(chunk.task.qty, before + chunk.qty)
+        if target <= before:
+            # This account is already at its cap for the item; leave it to the others.
+            worker.full_items.add(key)
+            self.backlog.append(chunk)
+            self._notify()
+            return
+        self.in_flight += 1
+        try:
+            await do_farm_tasks(worker.cmd, [replace(chunk.task, qty=target)], reorder=False)
+        finally:
+            self.in_flight -= 1
+            gained = max(0, worker.held(chunk.task.item_name) - before)
+            worker.farmed += gained
+            self.delivered[key] += gained
+            if gained < chunk.qty and self.delivered[key] < self.quotas[key]:
+                self.backlog.append(FarmChunk(chunk.task, min(chunk.qty - gained, self.quotas[key] - self.delivered[key])))
+            delivered, quota = self.delivered[key], self.quotas[key]
+            worker.cmd.bot.log.info("[%s] %s %s/%s (fleet)", self.name or "farm queue", chunk.task.item_name,
+                                    delivered, quota, color=Fore.CYAN)
+            self._notify()
@@ -0,0 +1,44 @@
+import asyncio
+import os
+import random
+from typing import Awaitable, List, Optional, Sequence
+
+from core.clock import get_clock
+
+
+def connect_window(window: Optional[float] = None) -> float:
+    """Seconds over which a fleet's logins are spread (``CONNECT_WINDOW``, 0 = all at once)."""
+    if window is None:
+        window = float(os.getenv("CONNECT_WINDOW") or 0)
+    return max(window, 0.0)
+
+
+def stagger_delays(count: int, window: float, jitter: float = 0.5) -> List[float]:
+    """Start offsets of ``count`` bots spread evenly over ``window`` seconds.
+
+    Each slot is shifted by up to ``jitter`` of its width, so restarts of
+    the same fleet do not hit the server in the same rhythm. The first bot
+    starts at once.
+    """
+    if count <= 1 or window <= 0:
+        return [0.0] * count
+    slot = window / count
+    return [0.0] + [i * slot + random.uniform(0, slot * jitter) for i in range(1, count)]
+
+
+async def _after(delay: float, start: Awaitable):
+    if delay > 0:
+        await get_clock().sleep(delay)
+    return await start
+
+
+async def start_staggered(starts: Sequence[Awaitable], window: Optional[float] = None) -> list:
+    """``asyncio.gather`` of ``starts`` with their logins spread over :func:`connect_window`.
+
+    The first bot's login also warms the shared DNS cache with every game
+    server's address, so the bots after it connect without a lookup.
+    """
+    delays = stagger_delays(len(starts), connect_window(window))
+    if delays and delays[-1] > 0:
+        print(f"Starting {len(starts)} bots over {delays[-1]:.0f}s")
+    return await asyncio.gather(*[_after(d, s) for d, s in zip(delays, starts)])
@@ -0,0 +1,276 @@
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import resource
+import time
+from typing import Dict, List, Optional
+
+from core.bot import Bot
+
+LOOP_PROBE_S = 0.05
+DROP_ITEM = "Void Aura"
+
+
+class LoadConfig:
+    """Packet mix the stand-in server sends to every connected bot."""
+
+    def __init__(self, ct_rate: float = 4, move_rate: float = 2, drop_rate: float = 0.2,
+                 crowd: int = 20, monsters: int = 6, skill_ms: int = 1000):
+        self.ct_rate = ct_rate
+        self.move_rate = move_rate
+        self.drop_rate = drop_rate
+        self.crowd = crowd
+        self.monsters = monsters
+        self.skill_ms = skill_ms
+
+
+def _frame(data: dict) -> bytes:
+    return (json.dumps({"t": "xt", "b": {"r": -1, "o": data}}) + "\x00").encode("utf-8")
+
+
+def _move_to_area(username: str, cfg: LoadConfig) -> dict:
+    players = [{"uoName": username, "strUsername": username, "strFrame": "Enter", "strPad": "Spawn", "intState": 1}]
+    players += [{"uoName": f"crowd{i}", "strUsername": f"crowd{i}", "entID": i + 100,
+                 "strFrame": f"r{i % 4}", "strPad": "Left", "intState": 1} for i in range(cfg.crowd)]
+    mon_ids = range(1, cfg.monsters + 1)
+    return {
+        "cmd": "moveToArea", "areaName": "loadtest-1", "areaId": 1, "strMapName": "loadtest",
+        "uoBranch": players,
+        "monBranch": [{"MonMapID": i, "MonID": i, "intState": 1, "intHP": 10000, "intHPMax": 10000} for i in mon_ids],
+        "mondef": [{"MonID": i, "strMonName": f"Dummy {i}"} for i in mon_ids],
+        "monmap": [{"MonMapID": i, "strFrame": "Enter"} for i in mon_ids],
+    }
+
+
+def _combat_tick(username: str, user_id: str, cfg: LoadConfig) -> bytes:
+    mon = str(random.randint(1, cfg.monsters))
+    return _frame({
+        "cmd": "ct",
+        "p": {username: {"intHP": random.randint(1000, 3000), "intMP": random.randint(0, 100), "intState": 2}},
+        "m": {mon: {"intHP": random.randint(0, 10000)}},
+        "a": [
+            {"cmd": "aura+", "tInf": f"m:{mon}", "auras": [{"nam": "Loadtest Burn", "dur": 5}]},
+            {"cmd": "aura+" if random.random() < 0.8 else "aura-", "tInf": f"p:{user_id}",
+             "auras": [{"nam": "Loadtest Buff", "dur": 3}], "aura": {"nam": "Loadtest Buff"}},
+        ],
+    })
+
+
+def _crowd_move(cfg: LoadConfig) -> bytes:
+    name = f"crowd{random.randrange(cfg.crowd)}" if cfg.crowd else "crowd0"
+    return f"%xt%uotls%-1%{name}%strFrame:r{random.randint(0, 3)},strPad:Left%\x00".encode("utf-8")
+
+
+def _drop(cfg: LoadConfig) -> bytes:
+    if random.random() < 0.5:
+        return _frame({"cmd": "dropItem", "items": {"9001": {"ItemID": 9001, "sName": DROP_ITEM, "iQty": 1}}})
+    return _frame({"cmd": "addItems", "items": {"9002": {"ItemID": 9002, "sName": "Loadtest Mat", "iQty": 1, "bTemp": "1"}}})
+
+
+async def _every(rate: float, writer: asyncio.StreamWriter, make) -> None:
+    if rate <= 0:
+        return
+    loop = asyncio.get_running_loop()
+    period = 1 / rate
+    next_at = loop.time() + random.random() * period  # spread bots over the period
+    while not writer.is_closing():
+        await asyncio.sleep(max(0.0, next_at - loop.time()))
+        next_at += period
+        writer.write(make())
+        if writer.transport.get_write_buffer_size() > 1 << 20:
+            await writer.drain()
+
+
+async def _serve_client(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, cfg: LoadConfig) -> None:
+    streams = []
+    try:
+        # %xt%zm%loadtestHello%1%<username>%<user_id>%
+        hello = (await reader.readuntil(b"\x00")).decode("utf-8").strip("\x00").split("%")
+        username, user_id = hello[5], hello[6]
+        writer.write(_frame(_move_to_area(username, cfg)))
+        writer.write(_frame({"cmd": "loadInventoryBig", "items": [], "factions": []}))
+        streams = [
+            asyncio.create_task(_every(cfg.ct_rate, writer, lambda: _combat_tick(username, user_id, cfg))),
+            asyncio.create_task(_every(cfg.move_rate, writer, lambda: _crowd_move(cfg))),
+            asyncio.create_task(_every(cfg.drop_rate, writer, lambda: _drop(cfg))),
+        ]
+        while await reader.read(65536):  # discard skills and getDrop requests
+            pass
+    except (ConnectionError, asyncio.IncompleteReadError, IndexError):
+        pass
+    finally:
+        for task in streams:
+            task.cancel()
+        writer.close()
+
+
+async def _serve(cfg: LoadConfig, port_queue) -> None:
+    server = await asyncio.start_server(lambda r, w: _serve_client(r, w, cfg), "127.0.0.1", 0)
+    port_queue.put(server.sockets[0].getsockname()[1])
+    async with server:
+        await server.serve_forever()
+
+
+def _server_main(cfg: LoadConfig, port_queue) -> None:
+    asyncio.run(_serve(cfg, port_queue))
+
+
+class StandInServer:
+    """Local server streaming ``ct``, ``uotls`` and drop packets, run in its own process.
+
+    Keeping it out of the bots' process means the CPU and RSS figures of a
+    load test belong to the bots alone.
+    """
+
+    def __init__(self, cfg: LoadConfig):
+        self.cfg = cfg
+        self.port: Optional[int] = None
+        self._process: Optional[multiprocessing.Process] = None
+
+    def start(self) -> int:
+        port_queue = multiprocessing.Queue()
+        self._process = multiprocessing.Process(target=_server_main, args=(self.cfg, port_queue), daemon=True)
+        self._process.start()
+        self.port = port_queue.get(timeout=10)
+        return self.port
+
+    def stop(self) -> None:
+        if self._process:
+            self._process.terminate()
+            self._process.join(5)
+            self._process = None
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def current_rss_mb() -> float:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError):
+        # peak rather than current RSS; ru_maxrss is KiB on Linux, bytes on macOS
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class LoadStats:
+    """Samples collected during one measurement window, in seconds."""
+
+    def __init__(self):
+        self.loop_lag: List[float] = []
+        self.handler: List[float] = []
+        self.skill_late: List[float] = []
+
+    def reset(self) -> None:
+        self.loop_lag.clear()
+        self.handler.clear()
+        self.skill_late.clear()
+
+
+def _instrument(bot: Bot, stats: LoadStats) -> None:
+    handle = bot.handle_server_response
+
+    async def timed_handle(msg):
+        started = time.perf_counter()
+        await handle(msg)
+        stats.handler.append(time.perf_counter() - started)
+
+    bot.handle_server_response = timed_handle
+
+
+async def _probe_loop_lag(stats: LoadStats, stop: asyncio.Event) -> None:
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + LOOP_PROBE_S
+        await asyncio.sleep(LOOP_PROBE_S)
+        stats.loop_lag.append(max(0.0, loop.time() - expected))
+
+
+async def _cast_skills(bot: Bot, stats: LoadStats, interval_s: float) -> None:
+    """Stand-in for a combat script: cast on a fixed beat and record how late each cast fires."""
+    loop = asyncio.get_running_loop()
+    next_at = loop.time() + random.random() * interval_s
+    while bot.is_client_connected:
+        await asyncio.sleep(max(0.0, next_at - loop.time()))
+        if not bot.is_client_connected:
+            return
+        stats.skill_late.append(max(0.0, loop.time() - next_at))
+        next_at += interval_s
+        bot.write_message(f"%xt%zm%gar%1%0%a1>m:1%wvz%")
+
+
+async def _spawn_bot(index: int, port: int, stats: LoadStats, cfg: LoadConfig) -> Bot:
+    username = f"loadbot{index}"
+    bot = Bot(
+        itemsDropWhiteList=[DROP_ITEM],
+        showLog=False,
+        showChat=False,
+        isScriptable=True,
+        autoRelogin=True,  # socket errors stop the reader quietly instead of raising
+        logLevel="warning",
+        packetLogFrames=0,  # no packet_dumps/ file per bot from every stop_bot
+    )
+    bot.set_login_info(username, "", "loadtest")
+    bot.player.USER = username
+    bot.username_id = bot.user_id = str(index + 1)
+    bot.areaId = 1
+    bot.server_info = ["127.0.0.1", port]
+    _instrument(bot, stats)
+    await bot.connect_client()
+    bot.write_message(f"%xt%zm%loadtestHello%1%{username}%{bot.username_id}%")
+    asyncio.create_task(bot.read_server_in_background())
+    asyncio.create_task(_cast_skills(bot, stats, cfg.skill_ms / 1000))
+    return bot
+
+
+async def measure(bot_count: int, port: int, cfg: LoadConfig, duration: float, warmup: float = 2) -> Dict[str, float]:
+    """Run ``bot_count`` bots against the stand-in server and return one report row."""
+    stats = LoadStats()
+    stop = asyncio.Event()
+    bots = [await _spawn_bot(i, port, stats, cfg) for i in range(bot_count)]
+    probe = asyncio.create_task(_probe_loop_lag(stats, stop))
+    await asyncio.sleep(warmup)
+    stats.reset()
+    writes_started = sum(bot.writer.syscalls for bot in bots)
+    cpu_started, wall_started = time.process_time(), time.perf_counter()
+    await asyncio.sleep(duration)
+    cpu = time.process_time() - cpu_started
+    wall = time.perf_counter() - wall_started
+    writes = sum(bot.writer.syscalls for bot in bots) - writes_started
+    row = {
+        "bots": bot_count,
+        "packets_s": len(stats.handler) / wall,
+        "lag_p50_ms": percentile(stats.loop_lag, 50) * 1000,
+        "lag_p99_ms": percentile(stats.loop_lag, 99) * 1000,
+        "lag_max_ms": max(stats.loop_lag, default=0) * 1000,
+        "handler_p50_ms": percentile(stats.handler, 50) * 1000,
+        "handler_p99_ms": percentile(stats.handler, 99) * 1000,
+        "skill_late_p99_ms": percentile(stats.skill_late, 99) * 1000,
+        "writes_s": writes / wall,
+        "cpu_pct": cpu / wall * 100,
+        "rss_mb": current_rss_mb(),
+    }
+    stop.set()
+    for bot in bots:
+        bot.stop_bot()
+    await probe
+    await asyncio.sleep(1)  # let blocked reads time out before the next step
+    return row
+
+
+COLUMNS = ["bots", "packets_s", "lag_p50_ms", "lag_p99_ms", "lag_max_ms",
+           "handler_p50_ms", "handler_p99_ms", "skill_late_p99_ms", "writes_s", "cpu_pct", "rss_mb"]
+
+
+def format_row(row: Dict[str, float]) -> str:
+    return "".join(f"{row[col]:>{max(len(col), 8) + 2}.{0 if col == 'bots' else 2}f}" for col in COLUMNS)
+
+
+def format_header() -> str:
+    return "".join(f"{col:>{max(len(col), 8) + 2}}" for col in COLUMNS)
@@ -0,0 +1,240 @@
+import atexit
+import builtins
+import json
+import logging
+import queue
+import re
+import sys
+import threading
+import time
+from typing import Optional, TextIO, Union
+
+from colorama import Fore
+
+DEBUG = logging.DEBUG
+INFO = logging.INFO
+WARNING = logging.WARNING
+ERROR = logging.ERROR
+
+LOG_LEVELS = {
+    "debug": DEBUG,
+    "info": INFO,
+    "warning": WARNING,
+    "error": ERROR,
+}
+
+_ANSI_RE = re.compile(r"\x1b\[[0-9;]*m")
+_STOP = object()
+
+
+def parse_level(level: Union[str, int, None], default: int = INFO) -> int:
+    """Convert a level name (``"debug"``, ``"info"``...) or number into a logging level."""
+    if level is None or level == "":
+        return default
+    if isinstance(level, int):
+        return level
+    return LOG_LEVELS.get(str(level).strip().lower(), default)
+
+
+class _LineFormatter:
+    """Format records as ``[HH:MM:SS] [bot] message`` with the timestamp cached per second."""
+
+    def __init__(self):
+        self._last_sec = -1
+        self._last_stamp = ""
+
+    def _stamp(self, created: float) -> str:
+        sec = int(created)
+        if sec != self._last_sec:
+            self._last_sec = sec
+            self._last_stamp = time.strftime('%H:%M:%S', time.localtime(sec))
+        return self._last_stamp
+
+    def format(self, record: logging.LogRecord) -> str:
+        bot = getattr(record, "bot", "")
+        color = getattr(record, "color", None) or ""
+        prefix = f"[{self._stamp(record.created)}] "
+        if bot:
+            prefix += f"[{bot}] "
+        line = prefix + record.getMessage()
+        if color:
+            line = color + line + Fore.RESET
+        return line
+
+
+class _JsonFormatter:
+    """Format records as one JSON object per line, without color codes."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        return json.dumps({
+            "ts": round(record.created, 3),
+            "level": record.levelname.lower(),
+            "bot": getattr(record, "bot", ""),
+            "msg": _ANSI_RE.sub("", record.getMessage()),
+        }, ensure_ascii=False)
+
+
+class LogWriter:
+    """Background thread that drains queued records and writes them in batches.
+
+    Records are only formatted here, so callers pay for a queue put and nothing
+    else. Each batch is written with a single ``write`` and ``flush``.
+    """
+
+    def __init__(self, stream: Optional[TextIO] = None, json_lines: bool = False, max_batch: int = 512):
+        self.stream = stream
+        self.json_lines = json_lines
+        self.max_batch = max_batch
+        self._queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._formatter = _JsonFormatter() if json_lines else _LineFormatter()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def put(self, item: Union[logging.LogRecord, str]) -> None:
+        if self._thread is None:
+            self._start()
+        self._queue.put(item)
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="aqw-log-writer", daemon=True)
+            self._thread.start()
+
+    def _render(self, item: Union[logging.LogRecord, str]) -> str:
+        if isinstance(item, str):
+            return item
+        try:
+            return self._formatter.format(item) + "\n"
+        except Exception as e:
+            return f"log format error: {e} ({item.msg!r})\n"
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            stop = item is _STOP
+            lines = [] if stop else [self._render(item)]
+            while not stop and len(lines) < self.max_batch:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                lines.append(self._render(item))
+            if lines:
+                self._write("".join(lines))
+            if stop:
+                return
+
+    def _write(self, text: str) -> None:
+        stream = self.stream or sys.stdout
+        try:
+            stream.write(text)
+            stream.flush()
+        except Exception:
+            pass
+
+    def close(self, timeout: float = 1.0) -> None:
+        """Flush pending records and stop the writer thread."""
+        if self._thread is None or not self._thread.is_alive():
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        self._thread = None
+
+
+class _WriterHandler(logging.Handler):
+    """Hand records to the shared :class:`LogWriter` without formatting them."""
+
+    def emit(self, record: logging.LogRecord) -> None:
+        get_writer().put(record)
+
+
+_writer: Optional[LogWriter] = None
+_base_logger = logging.getLogger("aqw")
+_base_logger.setLevel(logging.DEBUG)
+_base_logger.propagate = False
+_base_logger.addHandler(_WriterHandler())
+
+
+def get_writer() -> LogWriter:
+    """Return the process-wide log writer, creating a plain-text one on first use."""
+    global _writer
+    if _writer is None:
+        _writer = LogWriter()
+    return _writer
+
+
+def configure_logging(json_lines: bool = False, stream: Optional[TextIO] = None, max_batch: int = 512) -> LogWriter:
+    """Replace the process-wide writer. Call once from the launcher before bots start."""
+    global _writer
+    if _writer is not None:
+        _writer.close()
+    _writer = LogWriter(stream=stream, json_lines=json_lines, max_batch=max_batch)
+    return _writer
+
+
+def install_print_hook() -> None:
+    """Route plain ``print()`` calls to stdout through the batched writer.
+
+    Lines are written verbatim (no timestamp), so scripts keep their output
+    while the process stops issuing one flush per line.
+    """
+    original_print = builtins.print
+
+    def batched_print(*args, sep=" ", end="\n", file=None, flush=False):
+        if file is not None and file is not sys.stdout:
+            original_print(*args, sep=sep, end=end, file=file, flush=flush)
+            return
+        get_writer().put(sep.join(map(str, args)) + end)
+
+    builtins.print = batched_print
+
+
+@atexit.register
+def _close_writer() -> None:
+    if _writer is not None:
+        _writer.close()
+
+
+class BotLogger:
+    """Level-gated logger for a single bot.
+
+    Messages use ``%`` style arguments that are only formatted by the writer
+    thread, and only when the level is enabled::
+
+        bot.log.info("add items %s. qty now %s", name, qty, color=Fore.YELLOW)
+    """
+
+    def __init__(self, name: str = "", level: Union[str, int, None] = INFO):
+        self.name = name
+        self.level = parse_level(level)
+
+    def set_name(self, name: str) -> None:
+        self.name = name
+
+    def set_level(self, level: Union[str, int]) -> None:
+        self.level = parse_level(level, self.level)
+
+    def is_enabled_for(self, level: int) -> bool:
+        return level >= self.level
+
+    def log(self, level: int, msg: str, *args, color: Optional[str] = None) -> None:
+        if level < self.level:
+            return
+        _base_logger.log(level, msg, *args, extra={"bot": self.name, "color": color})
+
+    def debug(self, msg: str, *args, color: Optional[str] = None) -> None:
+        self.log(DEBUG, msg, *args, color=color)
+
+    def info(self, msg: str, *args, color: Optional[str] = None) -> None:
+        self.log(INFO, msg, *args, color=color)
+
+    def warning(self, msg: str, *args, color: Optional[str] = None) -> None:
+        self.log(WARNING, msg, *args, color=color)
+
+    def error(self, msg: str, *args, color: Optional[str] = None) -> None:
+        self.log(ERROR, msg, *args, color=color)
@@ -0,0 +1,58 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Optional, TypeVar
+
+try:
+    import uvloop
+except ImportError:  # optional, the stock asyncio loop is used without it
+    uvloop = None
+
+T = TypeVar("T")
+
+# threads left over for everything that is not a bot's blocking socket read
+EXTRA_WORKERS = 4
+
+
+def install_loop(name: Optional[str] = None) -> str:
+    """Install the event-loop policy named by ``name`` or ``EVENT_LOOP``.
+
+    ``auto`` (the default) uses uvloop when it is installed, ``uvloop``
+    requires it and ``asyncio`` keeps the stock loop. Returns the policy used.
+    """
+    name = (name or os.getenv("EVENT_LOOP") or "auto").strip().lower()
+    if name not in ("auto", "uvloop", "asyncio"):
+        raise ValueError(f"Unknown event loop {name!r}, use auto, uvloop or asyncio")
+    if name == "uvloop" and uvloop is None:
+        raise RuntimeError("EVENT_LOOP=uvloop but uvloop is not installed (pip install uvloop)")
+    if name != "asyncio" and uvloop is not None:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+        return "uvloop"
+    asyncio.set_event_loop_policy(None)
+    return "asyncio"
+
+
+def executor_workers(bot_count: int, workers: Optional[int] = None) -> int:
+    """Every running bot keeps one thread busy in ``read_batch``; size the pool for that."""
+    if workers is None and os.getenv("EXECUTOR_WORKERS"):
+        workers = int(os.getenv("EXECUTOR_WORKERS"))
+    return workers or bot_count + EXTRA_WORKERS
+
+
+def describe_loop() -> str:
+    loop = asyncio.get_running_loop()
+    return f"{type(loop).__module__}.{type(loop).__name__}"
+
+
+async def _run_tuned(main: Awaitable[T], workers: int) -> T:
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bot-read")
+    loop.set_default_executor(executor)
+    print(f"Event loop: {describe_loop()}, executor: {workers} threads")
+    return await main
+
+
+def run(main: Awaitable[T], bot_count: int = 1, loop: Optional[str] = None, workers: Optional[int] = None) -> T:
+    """``asyncio.run`` with the configured loop policy and an executor sized for ``bot_count`` bots."""
+    install_loop(loop)
+    return asyncio.run(_run_tuned(main, executor_workers(bot_count, workers)))
@@ -0,0 +1,129 @@
+import asyncio
+import socket
+from typing import Callable, Iterable, List, Optional
+
+_TERMINATOR = b"\x00"
+# keep one writev well under the usual IOV_MAX of 1024 buffers
+MAX_IOV = 512
+
+
+class OutboundWriter:
+    """Frames written to the game socket, with optional per-tick batching.
+
+    Each frame is encoded once and sent with its ``\\x00`` terminator as a
+    separate buffer of one ``sendmsg`` (writev) call, so no joined string
+    is built. ``send(..., batch=True)`` queues frames until the end of the
+    current event-loop tick and sends them all in one syscall; an
+    unbatched send flushes whatever is queued first so order is kept.
+    """
+
+    def __init__(self):
+        self.sock: Optional[socket.socket] = None
+        self._pending: List[bytes] = []
+        self._flush_scheduled = False
+        self.syscalls = 0
+        self.frames = 0
+        self.bytes = 0
+        self.batched_frames = 0
+        self.last_error: Optional[OSError] = None
+        self.ring = None  # PacketRing recording every frame sent
+        # called with the error when a deferred batch flush fails, nobody else would see it
+        self.on_error: Optional[Callable[[OSError], object]] = None
+
+    def attach(self, sock: socket.socket) -> None:
+        """Use ``sock`` for writes and turn off Nagle so small skill packets leave at once."""
+        self.sock = sock
+        self._pending = []
+        self._flush_scheduled = False
+        try:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        except (OSError, AttributeError):
+            pass
+
+    def send(self, message: str, batch: bool = False) -> None:
+        self.send_frame([message.encode("utf-8")], batch)
+
+    def send_frame(self, parts: List[bytes], batch: bool = False) -> None:
+        """Send one frame given as already encoded parts, e.g. from :class:`PacketBuilder`."""
+        self.frames += 1
+        if self.ring is not None:
+            self.ring.record_out(parts)
+        if batch:
+            self._pending.extend(parts)
+            self._pending.append(_TERMINATOR)
+            self.batched_frames += 1
+            self._schedule_flush()
+            return
+        if self._pending:
+            self._pending.extend(parts)
+            self._pending.append(_TERMINATOR)
+            self.flush()
+            return
+        self._write([*parts, _TERMINATOR])
+
+    def send_many(self, messages: Iterable[str]) -> None:
+        """Send several frames in one syscall, after anything already queued."""
+        for message in messages:
+            self.frames += 1
+            data = message.encode("utf-8")
+            if self.ring is not None:
+                self.ring.record_out((data,))
+            self._pending.append(data)
+            self._pending.append(_TERMINATOR)
+        self.flush()
+
+    def flush(self) -> None:
+        self._flush_scheduled = False
+        if not self._pending:
+            return
+        buffers, self._pending = self._pending, []
+        for start in range(0, len(buffers), MAX_IOV):
+            self._write(buffers[start:start + MAX_IOV])
+
+    def _schedule_flush(self) -> None:
+        if self._flush_scheduled:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.flush()
+            return
+        self._flush_scheduled = True
+        loop.call_soon(self._flush_soon)
+
+    def _flush_soon(self) -> None:
+        try:
+            self.flush()
+        except OSError as e:
+            self.last_error = e
+            if self.on_error is not None:
+                self.on_error(e)
+
+    def _write(self, buffers: List[bytes]) -> None:
+        if self.sock is None:
+            raise OSError("Connection is not established")
+        self.bytes += sum(len(b) for b in buffers)
+        if not hasattr(self.sock, "sendmsg"):
+            self.syscalls += 1
+            self.sock.sendall(b"".join(buffers))
+            return
+        while buffers:
+            sent = self.sock.sendmsg(buffers)
+            self.syscalls += 1
+            # drop what went out; a partial write can stop inside a buffer
+            done = 0
+            while done < len(buffers) and sent >= len(buffers[done]):
+                sent -= len(buffers[done])
+                done += 1
+            buffers = buffers[done:]
+            if buffers and sent:
+                buffers[0] = buffers[0][sent:]
+
+    def metrics(self) -> dict:
+        return {
+            "syscalls": self.syscalls,
+            "frames": self.frames,
+            "bytes": self.bytes,
+            "batched_frames": self.batched_frames,
+            "frames_per_syscall": self.frames / self.syscalls if self.syscalls else 0.0,
+        }
@@ -0,0 +1,124 @@
+import os
+import re
+import signal
+import time
+import weakref
+from collections import deque
+from typing import Callable, Deque, List, Optional, Sequence, Tuple
+
+DEFAULT_MAX_FRAMES = 2000
+DEFAULT_MAX_BYTES = 1 << 20
+DEFAULT_DUMP_DIR = "packet_dumps"
+
+IN = "<"
+OUT = ">"
+
+_rings: "weakref.WeakSet[PacketRing]" = weakref.WeakSet()
+
+# the XML login carries the session token; dumps get attached to bug reports
+_PWORD = re.compile(rb"<pword>.*?</pword>", re.S)
+_REDACTED_PWORD = b"<pword><![CDATA[redacted]]></pword>"
+
+
+class PacketRing:
+    """The last inbound and outbound frames of one bot, bounded by count and bytes.
+
+    Frames are kept as bytes (outbound ones as the parts they were sent
+    with, so cached packet prefixes are shared rather than copied) and the
+    oldest are dropped once either limit is hit, so memory stays flat for
+    any session length. :meth:`dump` writes them out oldest first.
+    """
+
+    def __init__(self, name: str = "bot", max_frames: int = DEFAULT_MAX_FRAMES, max_bytes: int = DEFAULT_MAX_BYTES,
+                 clock: Callable[[], float] = time.time):
+        self.name = name
+        self.max_frames = max_frames
+        self.max_bytes = max_bytes
+        self.clock = clock
+        self._frames: Deque[Tuple[float, str, Sequence[bytes], int]] = deque()
+        self._bytes = 0
+        self._new_since_dump = False
+        self.dropped = 0
+        _rings.add(self)
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_frames > 0 and self.max_bytes > 0
+
+    def _add(self, direction: str, parts: Sequence[bytes]) -> None:
+        size = sum(len(p) for p in parts)
+        self._frames.append((self.clock(), direction, parts, size))
+        self._bytes += size
+        self._new_since_dump = True
+        while self._frames and (len(self._frames) > self.max_frames or self._bytes > self.max_bytes):
+            self._bytes -= self._frames.popleft()[3]
+            self.dropped += 1
+
+    def record_in(self, message: str) -> None:
+        if self.enabled:
+            self._add(IN, (message.encode("utf-8"),))
+
+    def record_out(self, parts: Sequence[bytes]) -> None:
+        if self.enabled:
+            if parts and parts[0].startswith(b"<") and b"<pword>" in parts[0]:
+                parts = (_PWORD.sub(_REDACTED_PWORD, b"".join(parts)),)
+            self._add(OUT, parts)
+
+    def __len__(self) -> int:
+        return len(self._frames)
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def lines(self) -> List[str]:
+        out = []
+        for stamp, direction, parts, _ in self._frames:
+            ms = int((stamp % 1) * 1000)
+            text = b"".join(parts).decode("utf-8", "replace")
+            out.append(f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(stamp))}.{ms:03d} {direction} {text}")
+        return out
+
+    def dump(self, reason: str = "", directory: Optional[str] = None, force: bool = True) -> Optional[str]:
+        """Write the buffered frames to ``<dir>/<name>-<time>.log`` and return the path.
+
+        With ``force=False`` nothing is written unless frames arrived since the last dump.
+        """
+        if not self._frames or not (force or self._new_since_dump):
+            return None
+        self._new_since_dump = False
+        directory = directory or os.getenv("PACKET_DUMP_DIR", DEFAULT_DUMP_DIR)
+        os.makedirs(directory, exist_ok=True)
+        safe_name = "".join(c if c.isalnum() or c in "-_." else "_" for c in self.name) or "bot"
+        base = os.path.join(directory, f"{safe_name}-{time.strftime('%Y%m%d-%H%M%S')}")
+        path, n = base + ".log", 1
+        while os.path.exists(path):
+            path, n = f"{base}-{n}.log", n + 1
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(f"# {self.name}: {len(self._frames)} frames, {self._bytes} bytes, "
+                    f"{self.dropped} older dropped. reason: {reason or 'manual'}\n")
+            f.write("\n".join(self.lines()))
+            f.write("\n")
+        return path
+
+
+def dump_all(reason: str = "signal") -> List[str]:
+    """Dump the ring of every live bot in this process."""
+    return [path for ring in list(_rings) if (path := ring.dump(reason))]
+
+
+def install_dump_signal(signum: Optional[int] = None) -> bool:
+    """Dump every bot's packets when the process receives ``signum`` (SIGUSR1 by default).
+
+    Returns False on platforms without the signal (Windows).
+    """
+    signum = signum if signum is not None else getattr(signal, "SIGUSR1", None)
+    if signum is None:
+        return False
+
+    def on_signal(received, frame):
+        for path in dump_all(f"signal {received}"):
+            print(f"Packet dump written to {path}")
+
+    signal.signal(signum, on_signal)
+    return True
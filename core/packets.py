@@ -0,0 +1,99 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+
+GAR = b"%xt%zm%gar%1%0%"
+WVZ = b"%wvz%"
+SEP = b"%"
+
+Frame = List[bytes]
+
+
+class PacketBuilder:
+    """Hot outbound packets of one session, as lists of pre-encoded byte parts.
+
+    Constant parts are module-level bytes and the ``areaId``/own user id
+    prefixes are encoded once per map by :meth:`bind` (called on
+    ``moveToArea`` and ``joinOK``). Target lists are cached, so repeating
+    a cast on the same targets reuses the encoded bytes. Frames are handed
+    to ``Bot.write_frame`` which sends the parts with one ``sendmsg``.
+    """
+
+    def __init__(self):
+        self.area_id = None
+        self.username_id: Optional[str] = None
+        self._clear()
+
+    def _clear(self) -> None:
+        area = str(self.area_id).encode("utf-8")
+        self._move_to_cell = b"%xt%zm%moveToCell%" + area + SEP
+        self._walk = b"%xt%zm%mv%" + area + SEP
+        self._aggro = b"%xt%zm%aggroMon%" + area + SEP
+        self._actions: Dict[Tuple[object, str], str] = {}
+        self._self_targets: Dict[object, bytes] = {}
+        self._last_targets: Dict[Tuple[object, str], Tuple[tuple, bytes]] = {}
+        self._player_targets: Dict[Tuple[object, int, int], bytes] = {}
+        self._last_aggro: Tuple[tuple, bytes] = ((), b"")
+
+    def bind(self, area_id, username_id: Optional[str]) -> None:
+        """Set the session ids; cached prefixes are rebuilt only when they change."""
+        if area_id == self.area_id and username_id == self.username_id:
+            return
+        self.area_id = area_id
+        self.username_id = username_id
+        self._clear()
+
+    def _action(self, action, kind: str) -> str:
+        prefix = self._actions.get((action, kind))
+        if prefix is None:
+            prefix = self._actions[(action, kind)] = f"{action}>{kind}:"
+        return prefix
+
+    def _targets(self, action, kind: str, ids: Sequence, limit: int) -> bytes:
+        key = tuple(ids[:limit])
+        last = self._last_targets.get((action, kind))
+        if last is not None and last[0] == key:
+            return last[1]
+        prefix = self._action(action, kind)
+        encoded = ",".join([prefix + str(i) for i in key]).encode("utf-8")
+        self._last_targets[(action, kind)] = (key, encoded)
+        return encoded
+
+    def skill_on_monsters(self, skill, monster_ids: Sequence, limit: int) -> Frame:
+        return [GAR, self._targets(f"a{skill}", "m", monster_ids, limit), WVZ]
+
+    def scroll_on_monsters(self, monster_ids: Sequence, limit: int, scroll_id) -> Frame:
+        return [GAR, self._targets("i1", "m", monster_ids, limit), SEP, str(scroll_id).encode("utf-8"), WVZ]
+
+    def skill_on_self(self, skill) -> Frame:
+        target = self._self_targets.get(skill)
+        if target is None:
+            target = self._self_targets[skill] = f"a{skill}>p:{self.username_id}".encode("utf-8")
+        return [GAR, target, WVZ]
+
+    def skill_on_players(self, skill, user_ids: Sequence[str], version: int, limit: int) -> Frame:
+        """Own id first, then up to ``limit - 1`` room users, without duplicates.
+
+        ``version`` is the roster's user-id version; the encoded list is
+        reused until the room changes.
+        """
+        key = (skill, limit, version)
+        targets = self._player_targets.get(key)
+        if targets is None:
+            prefix = self._action(f"a{skill}", "p")
+            ids = dict.fromkeys([self.username_id, *user_ids[:max(limit - 1, 0)]])
+            targets = ",".join([prefix + str(i) for i in ids]).encode("utf-8")
+            if len(self._player_targets) > 64:
+                self._player_targets.clear()
+            self._player_targets[key] = targets
+        return [GAR, targets, WVZ]
+
+    def move_to_cell(self, cell: str, pad: str) -> Frame:
+        return [self._move_to_cell, f"{cell}%{pad}%".encode("utf-8")]
+
+    def walk(self, x: int, y: int, speed) -> Frame:
+        return [self._walk, f"{x}%{y}%{speed}%".encode("utf-8")]
+
+    def aggro(self, monster_ids: Sequence) -> Frame:
+        key = tuple(monster_ids)
+        if key != self._last_aggro[0]:
+            self._last_aggro = (key, "%".join(map(str, key)).encode("utf-8") + SEP)
+        return [self._aggro, self._last_aggro[1]]
@@ -0,0 +1,165 @@
+import asyncio
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Set, Tuple
+
+from core.script_scope import current_scope
+
+if TYPE_CHECKING:
+    from core.bot import Bot
+
+PartyHandler = Callable[[str, Any], Any]
+
+
+class PartyBus:
+    """In-process pub/sub for bots of one party running in the same event loop.
+
+    Members publish their own map/cell as they move, so followers and
+    leaders read each other's position without waiting for ``uotls`` or
+    sending ``goto``. Scripts can also share targets and taunt schedules on
+    named topics and meet at ``ready`` barriers::
+
+        party = PartyBus.shared("speaker")
+        cmd.join_party(party)
+        await party.barrier("boss", cmd.bot, 4)
+
+    Handlers are called as ``handler(sender_name, payload)``. Built-in topics:
+    ``"cell"`` (payload ``{"map", "cell", "pad"}``), ``"target"`` and ``"taunt"``.
+    """
+
+    _registry: Dict[str, "PartyBus"] = {}
+
+    def __init__(self, name: str = ""):
+        self.name = name
+        self.members: Dict[str, 'Bot'] = {}
+        self.positions: Dict[str, Tuple[str, str, str]] = {}
+        self.target: Optional[str] = None
+        self.taunts: List[Tuple[str, Optional[str]]] = []
+        self._handlers: Dict[str, List[PartyHandler]] = {}
+        self._barriers: Dict[str, Tuple[int, Set[str]]] = {}
+        self._changed: Optional[asyncio.Event] = None
+
+    @classmethod
+    def shared(cls, name: str) -> "PartyBus":
+        """Return the process-wide party called ``name``, creating it on first use."""
+        if name not in cls._registry:
+            cls._registry[name] = cls(name)
+        return cls._registry[name]
+
+    @staticmethod
+    def _key(name: str) -> str:
+        return name.lower()
+
+    def join(self, bot: 'Bot') -> None:
+        self.members[self._key(bot.player.USER)] = bot
+        bot.party = self
+        self.update_position(bot)
+
+    def leave(self, bot: 'Bot') -> None:
+        key = self._key(bot.player.USER)
+        self.members.pop(key, None)
+        self.positions.pop(key, None)
+        if bot.party is self:
+            bot.party = None
+        self._notify()
+
+    def subscribe(self, topic: str, handler: PartyHandler) -> None:
+        self._handlers.setdefault(topic, []).append(handler)
+        scope = current_scope.get()
+        if scope is not None:
+            scope.party_handlers.append((self, topic, handler))
+
+    def unsubscribe(self, topic: str, handler: PartyHandler) -> None:
+        handlers = self._handlers.get(topic)
+        if handlers and handler in handlers:
+            handlers.remove(handler)
+
+    def publish(self, topic: str, sender: str, payload: Any = None) -> None:
+        """Deliver ``payload`` to every handler of ``topic`` right away and wake waiters."""
+        for handler in self._handlers.get(topic, [])[:]:
+            try:
+                handler(sender, payload)
+            except Exception as e:
+                bot = self.members.get(self._key(sender))
+                if bot:
+                    bot.log.error("party handler %s failed: %s", getattr(handler, "__qualname__", handler), e)
+        self._notify()
+
+    def update_position(self, bot: 'Bot') -> None:
+        """Record where ``bot`` stands; called by the bot on ``jump_cell`` and ``moveToArea``."""
+        key = self._key(bot.player.USER)
+        if key not in self.members:
+            return
+        position = (getattr(bot, "strMapName", "").lower(), bot.player.CELL, bot.player.PAD)
+        if self.positions.get(key) == position:
+            return
+        self.positions[key] = position
+        self.publish("cell", bot.player.USER, {"map": position[0], "cell": position[1], "pad": position[2]})
+
+    def position(self, name: str) -> Optional[Tuple[str, str, str]]:
+        """Return ``(map, cell, pad)`` of a member, or None when unknown."""
+        return self.positions.get(self._key(name))
+
+    def count_in(self, map_name: str, cell: Optional[str] = None) -> int:
+        map_name = map_name.lower()
+        cell = cell.lower() if cell else None
+        return sum(1 for m, c, _ in self.positions.values()
+                   if m == map_name and (cell is None or (c or "").lower() == cell))
+
+    def set_target(self, sender: str, target: Optional[str]) -> None:
+        self.target = target
+        self.publish("target", sender, target)
+
+    def schedule_taunt(self, sender: str, taunter: str, target: Optional[str] = None) -> None:
+        """Queue a taunt for ``taunter``; it reads it back with :meth:`pop_taunt`."""
+        self.taunts.append((self._key(taunter), target))
+        self.publish("taunt", sender, {"taunter": taunter, "target": target})
+
+    def pop_taunt(self, name: str) -> Optional[Tuple[str, Optional[str]]]:
+        """Take the oldest taunt scheduled for ``name``, returning ``(name, target)``."""
+        key = self._key(name)
+        for i, taunt in enumerate(self.taunts):
+            if taunt[0] == key:
+                return self.taunts.pop(i)
+        return None
+
+    def _notify(self) -> None:
+        if self._changed is not None:
+            self._changed.set()
+            self._changed = None
+
+    async def wait_until(self, predicate: Callable[[], bool], timeout: Optional[float] = None) -> bool:
+        """Wait until ``predicate()`` is true, re-checking only when the party changes."""
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        while not predicate():
+            if self._changed is None:
+                self._changed = asyncio.Event()
+            remaining = None if deadline is None else deadline - loop.time()
+            if remaining is not None and remaining <= 0:
+                return False
+            try:
+                await asyncio.wait_for(self._changed.wait(), remaining)
+            except asyncio.TimeoutError:
+                return predicate()
+        return True
+
+    async def wait_in_map(self, map_name: str, count: int, cell: Optional[str] = None, timeout: Optional[float] = None) -> bool:
+        """Wait until ``count`` members stand in ``map_name`` (and ``cell`` when given)."""
+        return await self.wait_until(lambda: self.count_in(map_name, cell) >= count, timeout)
+
+    async def barrier(self, name: str, bot: 'Bot', count: int, timeout: Optional[float] = None) -> bool:
+        """Mark ``bot`` ready at barrier ``name`` and wait for ``count`` members to arrive.
+
+        The barrier resets once it opens, so it can be reused every round.
+        """
+        generation, arrived = self._barriers.get(name, (0, set()))
+        arrived.add(self._key(bot.player.USER))
+        if len(arrived) >= count:
+            self._barriers[name] = (generation + 1, set())
+            self._notify()
+            return True
+        self._barriers[name] = (generation, arrived)
+        self._notify()
+        opened = await self.wait_until(lambda: self._barriers[name][0] > generation, timeout)
+        if not opened:
+            arrived.discard(self._key(bot.player.USER))
+        return opened
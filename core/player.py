@@ -6,8 +6,9 @@ from .utils import checkOperator
 from colorama import Fore
 import json
 from core.utils import normalize
+from core.clock import Clock, get_clock
 from model.inventory import ItemInventory, ItemType
-from model.aura import Aura
+from model.aura import Aura, AuraSet
 from model.faction import Faction
 from model.monster import Monster
 
@@ -17,7 +18,8 @@ class Player:
     # 1 = alive, not in combat
     # 2 = alive, in combat
 
-    def __init__(self):
+    def __init__(self, clock: Optional[Clock] = None):
+        self.clock = clock or get_clock()
         self.USER: str = ""
         self.PASS: str = ""
         self.TOKEN = ""
@@ -45,7 +47,7 @@ class Player:
         self.IS_IN_COMBAT: bool = False
         self.X: int = 0
         self.Y: int= 0
-        self.AURAS: list[Aura] = []
+        self.AURAS: AuraSet = AuraSet(self.clock)
         self.skills_ref: dict = {}
         self.last_target: Optional[Monster] = None
         self.is_member: bool = False
@@ -118,7 +120,7 @@ class Player:
             return False
         
         # Cooldown check 
-        if skills["nextUse"] > datetime.now():
+        if skills["nextUse"] > self.clock.now():
             return False
         
         return True
@@ -131,7 +133,7 @@ class Player:
         cd = skill["cd"]
         effective_cd = cd * (1 - cdr)
         
-        resultNextUse = (datetime.now() + timedelta(milliseconds=effective_cd))
+        resultNextUse = (self.clock.now() + timedelta(milliseconds=effective_cd))
         skill["nextUse"] = resultNextUse
         
         # print(f"skill:{skillNumber} cd:{cd} cdr:{cdr * 100:.2f}% => result:{effective_cd:.2f}ms")
@@ -215,39 +217,22 @@ class Player:
         return [self.CELL, self.PAD]
 
     def addAura(self, auras:list):
-        for aura in auras:
-            is_new = aura.get('isNew', False)
-            name = normalize(aura.get('nam'))
-            if is_new:
-                self.AURAS.append(Aura(aura))
-            else:
-                for existing_aura in self.AURAS:
-                    if existing_aura.name == name:
-                        existing_aura.refresh(aura.get('dur', 0))
+        self.AURAS.add(auras)
     
     def removeAura(self, auraName: str):
-        normalized_name = normalize(auraName)
-        for aura in self.AURAS[:]:
-            if aura.name == normalized_name:
-                self.AURAS.remove(aura)
-                break
+        self.AURAS.remove(auraName)
     
     def removeAllAuras(self):
-        self.AURAS: list[Aura] = []
+        self.AURAS.clear()
 
     def getAura(self, auraName: str) -> Optional[Aura]:
-        normalized_name = normalize(auraName)
-        for aura in self.AURAS:
-            if aura.name == normalized_name and not aura.is_expired():
-                return aura
-        return None
+        return self.AURAS.get(auraName)
     
     def hasAura(self, auraName: str) -> bool:
-        normalized_name = normalize(auraName)
-        for aura in self.AURAS:
-            if aura.name == normalized_name and not aura.is_expired():
-                return True
-        return False
+        return self.AURAS.has(auraName)
+
+    def getAuraStacks(self, auraName: str) -> int:
+        return self.AURAS.stacks(auraName)
     
     def setLastTarget(self, monster: Optional[Monster]):
         if monster == None:
@@ -0,0 +1,175 @@
+import asyncio
+import cProfile
+import os
+import signal
+import time
+from collections import Counter, defaultdict
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+DEFAULT_PROFILE_DIR = "profiles"
+DEFAULT_INTERVAL_MS = 5
+MODES = ("sample", "cprofile")
+
+# Name of the bot whose task is running. Set by Bot.start_bot; every task
+# the bot creates afterwards inherits it, so samples land on the right bot.
+current_bot: ContextVar[str] = ContextVar("current_bot", default="")
+
+
+def _label(code) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class Sampler:
+    """Statistical CPU profiler attributing stacks to the bot whose task was running.
+
+    ``SIGPROF`` fires every ``interval`` seconds of process CPU time and the
+    handler runs on the event-loop thread between bytecodes, so it sees the
+    interrupted frame and the running task's context. Idle waits cost no CPU
+    and therefore leave no samples. Unix only.
+    """
+
+    def __init__(self, interval: float = DEFAULT_INTERVAL_MS / 1000):
+        if not hasattr(signal, "setitimer"):
+            raise RuntimeError("The sampling profiler needs signal.setitimer (not available on Windows)")
+        self.interval = interval
+        self.stacks: Dict[str, Counter] = defaultdict(Counter)
+        self._previous = None
+
+    def start(self) -> None:
+        self._previous = signal.signal(signal.SIGPROF, self._sample)
+        signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+
+    def stop(self) -> None:
+        signal.setitimer(signal.ITIMER_PROF, 0, 0)
+        signal.signal(signal.SIGPROF, self._previous or signal.SIG_DFL)
+
+    def _sample(self, signum, frame) -> None:
+        codes: List = []
+        while frame is not None:
+            codes.append(frame.f_code)
+            frame = frame.f_back
+        codes.reverse()
+        self.stacks[current_bot.get() or "(no bot)"][tuple(codes)] += 1
+
+    def collapsed(self, bot: str) -> List[str]:
+        """``frame;frame;frame count`` lines, the input of flamegraph.pl and speedscope."""
+        return [f"{';'.join(_label(c) for c in codes)} {count}"
+                for codes, count in self.stacks[bot].most_common()]
+
+    def write(self, directory: str) -> List[str]:
+        paths = []
+        for bot in self.stacks:
+            path = os.path.join(directory, f"{_safe(bot)}.collapsed")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("\n".join(self.collapsed(bot)))
+                f.write("\n")
+            paths.append(path)
+        return paths
+
+
+def _safe(name: str) -> str:
+    return "".join(c if c.isalnum() or c in "-_." else "_" for c in name) or "bot"
+
+
+class Profiler:
+    """Start/stop switch for one profiling run, driven by a signal or a control file.
+
+    ``sample`` mode writes one collapsed-stack file per bot. ``cprofile``
+    mode traces every call on the event-loop thread and writes one
+    ``process.pstats`` for all bots, since cProfile cannot tell the
+    interleaved tasks apart.
+    """
+
+    def __init__(self, mode: Optional[str] = None, directory: Optional[str] = None,
+                 interval_ms: Optional[float] = None):
+        self.mode = (mode or os.getenv("PROFILE_MODE") or "sample").strip().lower()
+        if self.mode not in MODES:
+            raise ValueError(f"Unknown profile mode {self.mode!r}, use sample or cprofile")
+        if self.mode == "sample" and not hasattr(signal, "setitimer"):
+            self.mode = "cprofile"
+        self.directory = directory or os.getenv("PROFILE_DIR") or DEFAULT_PROFILE_DIR
+        self.interval_ms = interval_ms or float(os.getenv("PROFILE_INTERVAL_MS") or DEFAULT_INTERVAL_MS)
+        self._active: Optional[Tuple[float, object]] = None
+
+    @property
+    def running(self) -> bool:
+        return self._active is not None
+
+    def start(self) -> None:
+        if self._active is not None:
+            return
+        if self.mode == "sample":
+            profiler = Sampler(self.interval_ms / 1000)
+            profiler.start()
+        else:
+            profiler = cProfile.Profile()
+            profiler.enable()
+        self._active = (time.time(), profiler)
+        print(f"Profiler started ({self.mode})")
+
+    def stop(self) -> List[str]:
+        """Stop the run and write its results to ``<dir>/<start time>/``; returns the files."""
+        if self._active is None:
+            return []
+        started, profiler = self._active
+        self._active = None
+        run_dir = os.path.join(self.directory, time.strftime("%Y%m%d-%H%M%S", time.localtime(started)))
+        os.makedirs(run_dir, exist_ok=True)
+        if isinstance(profiler, Sampler):
+            profiler.stop()
+            paths = profiler.write(run_dir)
+        else:
+            profiler.disable()
+            path = os.path.join(run_dir, "process.pstats")
+            profiler.dump_stats(path)
+            paths = [path]
+        print(f"Profiler stopped after {time.time() - started:.0f}s, results in {run_dir}")
+        return paths
+
+    def toggle(self) -> None:
+        if self.running:
+            self.stop()
+        else:
+            self.start()
+
+    def install_signal(self, signum: Optional[int] = None) -> bool:
+        """Toggle profiling on ``signum`` (SIGUSR2 by default). False where it does not exist."""
+        signum = signum if signum is not None else getattr(signal, "SIGUSR2", None)
+        if signum is None:
+            return False
+        signal.signal(signum, lambda received, frame: self.toggle())
+        return True
+
+    async def watch_file(self, path: str, interval: float = 1.0) -> None:
+        """Profile while ``path`` exists: ``touch`` it to start, delete it to stop and write."""
+        while True:
+            exists = os.path.exists(path)
+            if exists != self.running:
+                self.toggle()
+            await asyncio.sleep(interval)
+
+
+_installed: Optional[Profiler] = None
+
+
+def install(signum: Optional[int] = None) -> Profiler:
+    """Process profiler of a launcher, toggled by SIGUSR2.
+
+    Call :func:`watch_control_file` from inside the running loop to also
+    follow ``PROFILE_CONTROL``.
+    """
+    global _installed
+    if _installed is None:
+        _installed = Profiler()
+        _installed.install_signal(signum)
+    return _installed
+
+
+def watch_control_file(profiler: Optional[Profiler] = None) -> Optional["asyncio.Task"]:
+    """Start following ``PROFILE_CONTROL`` if it is set; returns the watcher task."""
+    path = os.getenv("PROFILE_CONTROL")
+    if not path:
+        return None
+    profiler = profiler or install()
+    return asyncio.get_running_loop().create_task(profiler.watch_file(path), name="profile-control")
@@ -0,0 +1,119 @@
+import asyncio
+from enum import Enum
+from typing import TYPE_CHECKING, Dict, Iterable, List
+
+from core.event_bus import Packet
+
+if TYPE_CHECKING:
+    from core.bot import Bot
+
+
+class QuestStatus(Enum):
+    COMPLETED = "completed"          # the probe turned the quest in
+    GREEN = "green"                  # unlocked, missing turn-in items
+    LOCKED = "locked"                # missing quest progress (red quest)
+    ONE_TIME_DONE = "one_time_done"  # one-time quest already completed
+    FAILED = "failed"                # any other ccqr failure
+    TIMEOUT = "timeout"              # no ccqr reply in time
+
+
+class QuestProbe:
+    """Pipelined ``acceptQuest``/``tryQuestComplete`` requests for one bot.
+
+    Packets for many quests are sent back to back (spaced by ``interval_ms``
+    to stay under the server spam limit) and each reply is matched to its
+    request by QuestID, so N quests resolve in one round-trip window.
+    Awaiting replies needs the background reader of scriptable mode.
+    """
+
+    def __init__(self, bot: 'Bot'):
+        self.bot = bot
+        self._accept_waiters: Dict[int, List[asyncio.Future]] = {}
+        self._ccqr_waiters: Dict[int, List[asyncio.Future]] = {}
+        bot.events.subscribe(self._on_accept, cmds="acceptQuest")
+        bot.events.subscribe(self._on_ccqr, cmds="ccqr")
+
+    async def send_accepts(self, quest_ids: Iterable[int], interval_ms: int = 100) -> None:
+        """Send ``acceptQuest`` for every id without waiting for replies."""
+        for quest_id in quest_ids:
+            if not self.bot.is_client_connected:
+                return
+            self.bot.write_message(f"%xt%zm%acceptQuest%{self.bot.areaId}%{quest_id}%")
+            await self.bot.clock.sleep(interval_ms / 1000)
+
+    async def accept_many(self, quest_ids: Iterable[int], interval_ms: int = 100, timeout: float = 5) -> Dict[int, bool]:
+        """Accept quests pipelined and return ``{quest_id: accepted}``.
+
+        Quests with no reply before ``timeout`` are reported as False.
+        """
+        quest_ids = [int(quest_id) for quest_id in quest_ids]
+        futures = {quest_id: self._wait_for(self._accept_waiters, quest_id) for quest_id in quest_ids}
+        await self.send_accepts(quest_ids, interval_ms)
+        return await self._collect(self._accept_waiters, futures, timeout, False)
+
+    async def probe_many(self, quest_ids: Iterable[int], interval_ms: int = 100, timeout: float = 5) -> Dict[int, QuestStatus]:
+        """Send ``tryQuestComplete`` for every id and return ``{quest_id: QuestStatus}``.
+
+        Like the server probe it is built on, a quest that can be turned in
+        is turned in and reported as ``COMPLETED``.
+        """
+        quest_ids = [int(quest_id) for quest_id in quest_ids]
+        futures = {quest_id: self._wait_for(self._ccqr_waiters, quest_id) for quest_id in quest_ids}
+        for quest_id in quest_ids:
+            if not self.bot.is_client_connected:
+                break
+            self.bot.write_message(f"%xt%zm%tryQuestComplete%{self.bot.areaId}%{quest_id}%-1%false%1%wvz%")
+            await self.bot.clock.sleep(interval_ms / 1000)
+        return await self._collect(self._ccqr_waiters, futures, timeout, QuestStatus.TIMEOUT)
+
+    def _wait_for(self, waiters: Dict[int, List[asyncio.Future]], quest_id: int) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        waiters.setdefault(quest_id, []).append(future)
+        return future
+
+    async def _collect(self, waiters: Dict[int, List[asyncio.Future]], futures: Dict[int, asyncio.Future], timeout: float, default):
+        if futures:
+            await asyncio.wait(futures.values(), timeout=timeout)
+        results = {}
+        for quest_id, future in futures.items():
+            if future.done():
+                results[quest_id] = future.result()
+            else:
+                future.cancel()
+                results[quest_id] = default
+            pending = waiters.get(quest_id)
+            if pending and future in pending:
+                pending.remove(future)
+                if not pending:
+                    del waiters[quest_id]
+        return results
+
+    def _resolve(self, waiters: Dict[int, List[asyncio.Future]], quest_id, result) -> None:
+        if quest_id is None:
+            return
+        for future in waiters.pop(int(quest_id), []):
+            if not future.done():
+                future.set_result(result)
+
+    def _on_accept(self, packet: Packet) -> None:
+        data = packet.data
+        if data:
+            self._resolve(self._accept_waiters, data.get("QuestID"), data.get("bSuccess") == 1)
+
+    def _on_ccqr(self, packet: Packet) -> None:
+        data = packet.data
+        if data:
+            self._resolve(self._ccqr_waiters, data.get("QuestID"), quest_status_from_ccqr(data))
+
+
+def quest_status_from_ccqr(data: dict) -> QuestStatus:
+    if data.get("bSuccess", 0) == 1:
+        return QuestStatus.COMPLETED
+    ccqr_msg = data.get("msg", "")
+    if "Missing Turn In Item" in ccqr_msg:
+        return QuestStatus.GREEN
+    if "Missing Quest Progress" in ccqr_msg:
+        return QuestStatus.LOCKED
+    if "One Time Quest Only" in ccqr_msg:
+        return QuestStatus.ONE_TIME_DONE
+    return QuestStatus.FAILED
@@ -0,0 +1,114 @@
+from typing import TYPE_CHECKING, Dict, Iterable, List, Set
+
+if TYPE_CHECKING:
+    from core.bot import Bot
+
+
+class QuestTracker:
+    """Event-driven auto turn-in for registered quests.
+
+    Turn-in requirements are indexed by ItemID, so an ``addItems``/``turnIn``
+    update only re-evaluates the quests that need one of the changed items.
+    A quest is turned in as soon as its last required item lands and is
+    re-accepted when the server confirms the completion.
+    """
+
+    def __init__(self, bot: 'Bot'):
+        self.bot = bot
+        self._requirements: Dict[int, Dict[str, int]] = {}
+        self._by_item: Dict[str, Set[int]] = {}
+        self._pending_turn_in: Set[int] = set()
+        self._seen_pending: Set[int] = set()
+
+    def register(self, quest_id: int) -> None:
+        quest_id = int(quest_id)
+        if quest_id not in self.bot.registered_auto_quest_ids:
+            self.bot.registered_auto_quest_ids.append(quest_id)
+        for quest_data in self.bot.loaded_quest_datas:
+            if str(quest_data.get("QuestID")) == str(quest_id):
+                self.index_quest(quest_data)
+                break
+
+    def is_registered(self, quest_id) -> bool:
+        return int(quest_id) in self.bot.registered_auto_quest_ids
+
+    def reset(self) -> None:
+        self._requirements.clear()
+        self._by_item.clear()
+        self._pending_turn_in.clear()
+        self._seen_pending.clear()
+
+    def index_quest(self, quest_data: dict) -> None:
+        """Index the turn-in items of a registered quest and check it right away."""
+        quest_id = int(quest_data.get("QuestID", 0))
+        if not self.is_registered(quest_id):
+            return
+        self._unindex(quest_id)
+        requirements: Dict[str, int] = {}
+        for req_item in quest_data.get("turnin", []):
+            item_id = str(req_item["ItemID"])
+            requirements[item_id] = requirements.get(item_id, 0) + int(req_item["iQty"])
+            self._by_item.setdefault(item_id, set()).add(quest_id)
+        self._requirements[quest_id] = requirements
+        self._evaluate(quest_id)
+
+    def _unindex(self, quest_id: int) -> None:
+        for item_id in self._requirements.pop(quest_id, {}):
+            quests = self._by_item.get(item_id)
+            if quests:
+                quests.discard(quest_id)
+                if not quests:
+                    del self._by_item[item_id]
+
+    def on_items_changed(self, item_ids: Iterable) -> None:
+        """Re-evaluate only the registered quests that require one of ``item_ids``."""
+        affected: Set[int] = set()
+        for item_id in item_ids:
+            affected.update(self._by_item.get(str(item_id), ()))
+        for quest_id in affected:
+            self._evaluate(quest_id)
+
+    def on_turn_in_result(self, quest_id, is_success: bool) -> None:
+        """Handle a ``ccqr`` reply: re-accept completed quests immediately."""
+        quest_id = int(quest_id)
+        if not self.is_registered(quest_id):
+            return
+        self._pending_turn_in.discard(quest_id)
+        if is_success:
+            self.bot.accept_quest(quest_id)
+
+    def is_ready(self, quest_id: int) -> bool:
+        requirements = self._requirements.get(quest_id)
+        if not requirements:
+            return False
+        player = self.bot.player
+        for item_id, qty in requirements.items():
+            item = player.get_item_inventory_by_id(item_id) or player.get_item_temp_inventory_by_id(item_id)
+            if not item or int(item.qty) < qty:
+                return False
+        return True
+
+    def _evaluate(self, quest_id: int) -> None:
+        if quest_id in self._pending_turn_in or not self.is_ready(quest_id):
+            return
+        self._pending_turn_in.add(quest_id)
+        self.bot.turn_in_quest(quest_id)
+
+    def reconcile(self) -> None:
+        """Slow safety net: accept dropped quests and pick up ids registered directly.
+
+        A turn-in still unanswered after two passes is retried.
+        """
+        self._pending_turn_in -= self._pending_turn_in & self._seen_pending
+        self._seen_pending = set(self._pending_turn_in)
+        for quest_id in list(self.bot.registered_auto_quest_ids):
+            if self.bot.quest_not_in_progress(quest_id):
+                self._pending_turn_in.discard(quest_id)
+                self.bot.accept_quest(quest_id)
+            elif quest_id not in self._requirements:
+                self.register(quest_id)
+            else:
+                self._evaluate(quest_id)
+
+    def pending(self) -> List[int]:
+        return sorted(self._pending_turn_in)
@@ -0,0 +1,95 @@
+import asyncio
+import os
+import socket
+from typing import Dict, Iterable, Optional, Tuple
+
+from core.clock import Clock, get_clock
+
+DEFAULT_TTL = 300.0
+
+
+class DnsCache:
+    """Async host lookups shared by every bot of the process, kept for ``ttl`` seconds.
+
+    Lookups go through ``loop.getaddrinfo`` so they never block the event
+    loop, and bots asking for the same host while a lookup is running
+    wait on that one lookup. If a refresh fails, the expired address is
+    used rather than failing the connect.
+    """
+
+    def __init__(self, ttl: Optional[float] = None, clock: Optional[Clock] = None):
+        self._ttl = ttl
+        self.clock = clock
+        self._entries: Dict[str, Tuple[str, float]] = {}
+        self._pending: Dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.lookups = 0
+
+    @property
+    def ttl(self) -> float:
+        """``ttl`` given to the constructor, else ``DNS_TTL`` read at lookup time (so ``.env`` applies)."""
+        if self._ttl is not None:
+            return self._ttl
+        return float(os.getenv("DNS_TTL") or DEFAULT_TTL)
+
+    def _now(self) -> float:
+        return (self.clock or get_clock()).monotonic()
+
+    async def resolve(self, host: str, port: int = 0) -> str:
+        """IPv4 address of ``host``."""
+        entry = self._entries.get(host)
+        if entry is not None and entry[1] > self._now():
+            self.hits += 1
+            return entry[0]
+        pending = self._pending.get(host)
+        if pending is None:
+            pending = self._pending[host] = asyncio.ensure_future(self._lookup(host, port))
+            pending.add_done_callback(lambda _: self._pending.pop(host, None))
+        return await asyncio.shield(pending)
+
+    async def _lookup(self, host: str, port: int) -> str:
+        self.lookups += 1
+        try:
+            infos = await asyncio.get_running_loop().getaddrinfo(host, port, family=socket.AF_INET,
+                                                                 type=socket.SOCK_STREAM)
+        except OSError:
+            stale = self._entries.get(host)
+            if stale is not None:
+                return stale[0]
+            raise
+        address = infos[0][4][0]
+        self._entries[host] = (address, self._now() + self.ttl)
+        return address
+
+    def prefetch(self, hosts: Iterable[str]) -> None:
+        """Start lookups of ``hosts`` that are not cached yet, without waiting for them."""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        for host in set(hosts):
+            if host and host not in self._entries and host not in self._pending:
+                asyncio.ensure_future(self.resolve(host)).add_done_callback(_ignore_error)
+
+    def invalidate(self, host: str) -> None:
+        self._entries.pop(host, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+def _ignore_error(future: asyncio.Future) -> None:
+    if not future.cancelled():
+        future.exception()
+
+
+_cache = DnsCache()
+
+
+def get_resolver() -> DnsCache:
+    return _cache
+
+
+async def resolve(host: str, port: int = 0) -> str:
+    """Cached lookup through the process-wide :class:`DnsCache`."""
+    return await _cache.resolve(host, port)
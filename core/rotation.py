@@ -0,0 +1,145 @@
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Callable, Iterable, List, Optional, Tuple, Union
+
+if TYPE_CHECKING:
+    from core.command import Command
+
+# Longest single sleep while nothing is castable, so conditions are re-read regularly.
+MAX_IDLE_S = 1.0
+
+
+@dataclass(frozen=True)
+class SkillStep:
+    """One entry of a rotation: a skill slot and the conditions to cast it.
+
+    HP thresholds are percentages of max HP. ``aura``/``no_aura`` test the
+    player, ``target_aura``/``target_no_aura`` test the target monster via
+    ``Monster.hasAura``. ``target`` overrides the rotation's target.
+    """
+    skill: int
+    hp_below: Optional[float] = None
+    hp_above: Optional[float] = None
+    mana_above: Optional[int] = None
+    aura: Optional[str] = None
+    no_aura: Optional[str] = None
+    target_aura: Optional[str] = None
+    target_no_aura: Optional[str] = None
+    target: Optional[str] = None
+
+    def is_met(self, cmd: 'Command', target: str) -> bool:
+        player = cmd.bot.player
+        if self.hp_below is not None or self.hp_above is not None:
+            hp = player.CURRENT_HP / player.MAX_HP * 100 if player.MAX_HP else 100
+            if self.hp_below is not None and hp >= self.hp_below:
+                return False
+            if self.hp_above is not None and hp <= self.hp_above:
+                return False
+        if self.mana_above is not None and player.MANA <= self.mana_above:
+            return False
+        if self.aura and not player.hasAura(self.aura):
+            return False
+        if self.no_aura and player.hasAura(self.no_aura):
+            return False
+        if self.target_aura or self.target_no_aura:
+            name = (self.target or target).split(",")[0]
+            monster = cmd.get_monster(name) if name != "*" else None
+            if self.target_aura and not (monster and monster.hasAura(self.target_aura)):
+                return False
+            if self.target_no_aura and monster and monster.hasAura(self.target_no_aura):
+                return False
+        return True
+
+
+class Rotation:
+    """Skills in priority order; the first castable one whose conditions hold is used.
+
+    A ``cyclic`` rotation instead walks its steps in order like the classic
+    skill lists: each cast starts looking at the step after the last one
+    cast, and steps that are not ready are skipped for this pass.
+    """
+
+    def __init__(self, steps: Iterable[Union[SkillStep, int]], cyclic: bool = False):
+        self.steps: List[SkillStep] = [step if isinstance(step, SkillStep) else SkillStep(int(step)) for step in steps]
+        self.cyclic = cyclic
+
+    @classmethod
+    def from_list(cls, skill_list: Iterable[int]) -> "Rotation":
+        """Build a cyclic rotation from a classic ``[0,1,2,0,3,4]`` list.
+
+        Repeated skills stay, so in that list skill 0 is still cast twice per cycle.
+        """
+        return cls([int(skill) for skill in skill_list], cyclic=True)
+
+
+class RotationEngine:
+    """Cast a :class:`Rotation` for one bot, sleeping exactly until the next skill is ready.
+
+    Readiness comes from the player's cooldown tracker (``nextUse``), the
+    command's global reload delay and the skill's mana cost, so no cast is
+    attempted early and no spam warning is triggered.
+    """
+
+    def __init__(self, cmd: 'Command', rotation: Rotation, target: str = "*", hunt: bool = False):
+        self.cmd = cmd
+        self.rotation = rotation
+        self.target = target
+        self.hunt = hunt
+        self.casts = 0
+        self._cursor = 0
+        self._next_cursor = 0
+
+    def _ready_in(self, index: int) -> Optional[float]:
+        """Seconds until ``index`` can be cast, or None if it cannot be cast at all right now."""
+        player = self.cmd.bot.player
+        if index >= len(player.SKILLS):
+            return None
+        skill = player.SKILLS[index]
+        if player.MANA < skill["mp"] * player.ManaCost:
+            return None
+        if not self.cmd.check_is_skill_safe(index):
+            return None
+        now = self.cmd.bot.clock.now()
+        wait = (skill["nextUse"] - now).total_seconds()
+        if index != 0:
+            reload_s = (self.cmd.skill_reload_time - now.timestamp() * 1000) / 1000
+            wait = max(wait, reload_s)
+        return max(wait, 0.0)
+
+    def _ordered_steps(self) -> Iterable[Tuple[int, SkillStep]]:
+        steps = self.rotation.steps
+        if not self.rotation.cyclic:
+            return enumerate(steps)
+        count = len(steps)
+        return (((self._cursor + i) % count, steps[(self._cursor + i) % count]) for i in range(count))
+
+    def next_skill(self) -> Tuple[Optional[SkillStep], float]:
+        """Return the step to cast now, or ``(None, seconds_until_something_is_ready)``."""
+        soonest = MAX_IDLE_S
+        for position, step in self._ordered_steps():
+            if not step.is_met(self.cmd, self.target):
+                continue
+            wait = self._ready_in(step.skill)
+            if wait is None:
+                continue
+            if wait <= 0:
+                self._next_cursor = position + 1
+                return step, 0.0
+            soonest = min(soonest, wait)
+        return None, soonest
+
+    async def cast_next(self, max_wait: float = MAX_IDLE_S) -> bool:
+        """Cast the best ready skill, or sleep until one is ready (at most ``max_wait``)."""
+        step, wait = self.next_skill()
+        if step is None:
+            await self.cmd.sleep(max(min(wait, max_wait), 0.01) * 1000)
+            return False
+        if self.rotation.cyclic:
+            self._cursor = self._next_cursor % len(self.rotation.steps)
+        await self.cmd.use_skill(step.skill, step.target or self.target, self.hunt)
+        self.casts += 1
+        return True
+
+    async def run(self, until: Callable[[], bool], max_wait: float = MAX_IDLE_S) -> None:
+        """Keep casting until ``until()`` is true or the bot disconnects."""
+        while self.cmd.is_still_connected() and not until():
+            await self.cast_next(max_wait)
@@ -0,0 +1,128 @@
+import asyncio
+import importlib
+import os
+import sys
+from typing import TYPE_CHECKING, Awaitable, Callable, Dict, Iterable, Optional
+
+if TYPE_CHECKING:
+    from core.bot import Bot
+
+# packages whose modules are re-imported on reload: the scripts and the helpers they share
+RELOAD_PACKAGES = ("bot", "templates")
+
+
+class ScriptHost:
+    """Runs bot scripts by module path and swaps them on live sessions.
+
+    :meth:`reload` drops every module of :data:`RELOAD_PACKAGES` from
+    ``sys.modules`` and imports the scripts again, so a changed helper is
+    picked up too. Each bot then gets its new ``main`` through
+    ``Bot.replace_script``: the running script task is cancelled and the
+    new one starts on the same connection, inventory and bank, without a
+    relogin. ``core`` is never reloaded, so ``Bot`` and ``Command`` keep
+    their identity.
+    """
+
+    def __init__(self, packages: Iterable[str] = RELOAD_PACKAGES):
+        self.packages = tuple(packages)
+        self.scripts: Dict["Bot", str] = {}
+        self._mtimes: Dict[str, float] = {}
+
+    def load(self, module_path: str) -> Callable[..., Awaitable[None]]:
+        module = importlib.import_module(module_path)
+        self._track()
+        return module.main
+
+    async def run(self, bot: "Bot", module_path: str) -> None:
+        """Start ``module_path``'s ``main`` on ``bot`` (``Bot.start_bot``) and remember it for reloads."""
+        main = self.load(module_path)
+        self.scripts[bot] = module_path
+        try:
+            await bot.start_bot(main)
+        finally:
+            self.scripts.pop(bot, None)
+
+    def _owned(self, name: str) -> bool:
+        return any(name == p or name.startswith(p + ".") for p in self.packages)
+
+    def _track(self) -> None:
+        for name, module in list(sys.modules.items()):
+            path = getattr(module, "__file__", None)
+            if path and self._owned(name) and path not in self._mtimes:
+                self._mtimes[path] = _mtime(path)
+
+    def changed_files(self) -> list:
+        return [path for path, mtime in self._mtimes.items() if _mtime(path) != mtime]
+
+    def reload(self) -> int:
+        """Re-import every script in use and hand the new ``main`` to its bot.
+
+        Returns the number of bots switched. A script that fails to import
+        is logged and its bot keeps running the old code.
+        """
+        importlib.invalidate_caches()
+        for name in [n for n in sys.modules if self._owned(n)]:
+            del sys.modules[name]
+        # also refresh files that fail to import, so only their next save triggers a retry
+        self._mtimes = {path: _mtime(path) for path in self._mtimes}
+        switched = 0
+        for bot, module_path in list(self.scripts.items()):
+            try:
+                main = self.load(module_path)
+            except Exception as e:
+                bot.log.error("Reload of %s failed, keeping the running script: %r", module_path, e)
+                continue
+            bot.replace_script(main)
+            switched += 1
+        self._track()
+        return switched
+
+    def switch(self, bot: "Bot", module_path: str) -> None:
+        """Run another script on ``bot``'s session, e.g. move an account to a different farm."""
+        main = self.load(module_path)
+        self.scripts[bot] = module_path
+        bot.replace_script(main)
+
+    async def watch(self, interval: float = 1.0, switch_dir: Optional[str] = None) -> None:
+        """Reload when a loaded script file changes on disk.
+
+        With ``switch_dir`` set, a file ``<switch_dir>/<username>`` containing
+        a module path (e.g. ``bot.darkon_mats.0_all_darkon_mats``) switches
+        that account to it; the file is removed once read.
+        """
+        while True:
+            await asyncio.sleep(interval)
+            changed = self.changed_files()
+            if changed:
+                print(f"Script change detected in {', '.join(os.path.basename(p) for p in changed)}, reloading")
+                self.reload()
+            if switch_dir:
+                self._check_switch_files(switch_dir)
+
+    def _check_switch_files(self, switch_dir: str) -> None:
+        for bot in list(self.scripts):
+            path = os.path.join(switch_dir, bot.username or "")
+            if not bot.username or not os.path.isfile(path):
+                continue
+            with open(path, "r", encoding="utf-8") as f:
+                module_path = f.read().strip()
+            os.remove(path)
+            try:
+                self.switch(bot, module_path)
+            except Exception as e:
+                bot.log.error("Switch to %s failed: %r", module_path, e)
+
+
+def _mtime(path: str) -> float:
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return 0.0
+
+
+def watch_from_env(host: ScriptHost) -> Optional["asyncio.Task"]:
+    """Start ``host.watch`` when ``HOT_RELOAD`` is on; ``SCRIPT_SWITCH_DIR`` enables switch files."""
+    if os.getenv("HOT_RELOAD", "").lower() not in ("1", "true", "yes"):
+        return None
+    switch_dir = os.getenv("SCRIPT_SWITCH_DIR") or None
+    return asyncio.get_running_loop().create_task(host.watch(switch_dir=switch_dir), name="script-reload")
@@ -0,0 +1,66 @@
+import asyncio
+from contextvars import ContextVar, copy_context
+from typing import TYPE_CHECKING, Callable, Coroutine, List, Optional, Set, Tuple
+
+if TYPE_CHECKING:
+    from core.bot import Bot
+    from core.event_bus import Subscription
+    from core.party_bus import PartyBus
+
+# Scope of the script run whose task is running. Set by ScriptScope.start;
+# registrations made from the script's task (and tasks it creates) land in it.
+current_scope: ContextVar[Optional["ScriptScope"]] = ContextVar("current_scope", default=None)
+
+
+class ScriptScope:
+    """What one run of a script registered on its bot, undone by :meth:`close`.
+
+    ``bot.events`` subscriptions, legacy ``bot.subscribe`` callbacks, party
+    membership and party handlers are recorded when made from the script's
+    task, and tasks started with ``Command.spawn`` are kept here too. When
+    the run ends (finished, cancelled or replaced by ``Bot.replace_script``)
+    the bot closes the scope, so handlers of a reloaded module never fire
+    next to the new ones.
+    """
+
+    def __init__(self):
+        self.subscriptions: List["Subscription"] = []
+        self.callbacks: List[Callable] = []
+        self.party_handlers: List[Tuple["PartyBus", str, Callable]] = []
+        self.parties: List["PartyBus"] = []
+        self.tasks: Set[asyncio.Task] = set()
+
+    @staticmethod
+    def current() -> Optional["ScriptScope"]:
+        return current_scope.get()
+
+    def start(self, coro: Coroutine, name: Optional[str] = None) -> asyncio.Task:
+        """Run ``coro`` as the script task, with this scope as :data:`current_scope`."""
+        context = copy_context()
+        context.run(current_scope.set, self)
+        return context.run(asyncio.create_task, coro, name=name)
+
+    def spawn(self, coro: Coroutine, name: Optional[str] = None) -> asyncio.Task:
+        """Start a task that :meth:`close` cancels if it is still running."""
+        task = asyncio.create_task(coro, name=name)
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+        return task
+
+    def close(self, bot: "Bot") -> None:
+        """Unsubscribe everything recorded, leave the party and cancel the spawned tasks."""
+        for sub in self.subscriptions:
+            sub.cancel()
+        for callback in self.callbacks:
+            bot.unsubscribe(callback)
+        for party, topic, handler in self.party_handlers:
+            party.unsubscribe(topic, handler)
+        if bot.party is not None and bot.party in self.parties:
+            bot.leave_party()
+        for task in list(self.tasks):
+            task.cancel()
+        self.subscriptions.clear()
+        self.callbacks.clear()
+        self.party_handlers.clear()
+        self.parties.clear()
+
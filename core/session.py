@@ -0,0 +1,56 @@
+import random
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from core.bot import Bot
+
+
+class ReconnectPolicy:
+    """Jittered exponential backoff between reconnect attempts.
+
+    Attempt ``n`` waits ``base_delay * factor**n`` seconds, capped at
+    ``max_delay``, then scaled by a random factor in ``[1 - jitter, 1 + jitter]``
+    so a fleet that dropped together does not log back in together.
+    """
+
+    def __init__(self, base_delay: float = 15, factor: float = 2, max_delay: float = 300,
+                 jitter: float = 0.25, max_attempts: Optional[int] = None):
+        self.base_delay = base_delay
+        self.factor = factor
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.max_attempts = max_attempts
+
+    def delay(self, attempt: int) -> float:
+        delay = min(self.max_delay, self.base_delay * (self.factor ** attempt))
+        return delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def gives_up(self, attempt: int) -> bool:
+        return self.max_attempts is not None and attempt >= self.max_attempts
+
+
+class SessionSnapshot:
+    """Where the bot was standing when the connection dropped."""
+
+    def __init__(self, map_name: str, room_number: Optional[int], cell: str, pad: str):
+        self.map_name = map_name
+        self.room_number = room_number
+        self.cell = cell
+        self.pad = pad
+
+    @classmethod
+    def capture(cls, bot: 'Bot') -> Optional["SessionSnapshot"]:
+        map_name = getattr(bot, "strMapName", "")
+        if not map_name:
+            return None
+        room_number = bot.roomNumber
+        area_name = getattr(bot, "areaName", "") or ""
+        if "-" in area_name:
+            try:
+                room_number = int(area_name.rsplit("-", 1)[1])
+            except ValueError:
+                pass
+        return cls(map_name, room_number, bot.player.CELL, bot.player.PAD)
+
+    def __repr__(self) -> str:
+        return f"{self.map_name}-{self.room_number} {self.cell}/{self.pad}"
@@ -1,6 +1,10 @@
 from core.command import Command
-from templates.hunt import hunt_item
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+# Fallback costs used for the "time saved" estimate until real joins/swaps are timed.
+DEFAULT_JOIN_SECONDS = 5.0
+DEFAULT_SWAP_SECONDS = 1.0
 
 @dataclass(frozen=True)
 class FarmTask:
@@ -10,19 +14,137 @@ class FarmTask:
     cell: str
     pad: str
     is_solo: bool = False
-    
-async def do_farm_tasks(cmd: Command, tasks: list[FarmTask]):
+    room_number: Optional[int] = None
+    is_temp: bool = True
+
+@dataclass
+class FarmPlan:
+    tasks: list[FarmTask]
+    skipped: list[FarmTask] = field(default_factory=list)
+    map_joins: int = 0
+    class_swaps: int = 0
+    naive_map_joins: int = 0
+    naive_class_swaps: int = 0
+
+    @property
+    def map_joins_saved(self) -> int:
+        return self.naive_map_joins - self.map_joins
+
+    @property
+    def class_swaps_saved(self) -> int:
+        return self.naive_class_swaps - self.class_swaps
+
+def _norm(name: Optional[str]) -> str:
+    return name.strip().lower() if name else ""
+
+def _count_transitions(tasks: list[FarmTask], current_map: str, current_class: str,
+                       class_of: Callable[[FarmTask], Optional[str]]) -> tuple[int, int]:
+    joins = swaps = 0
     for task in tasks:
-        if not cmd.is_still_connected():
-            return
+        if _norm(task.map_name) != current_map:
+            joins += 1
+            current_map = _norm(task.map_name)
+        class_name = _norm(class_of(task))
+        if class_name and class_name != current_class:
+            swaps += 1
+            current_class = class_name
+    return joins, swaps
+
+def plan_farm_tasks(tasks: list[FarmTask],
+                    class_of: Callable[[FarmTask], Optional[str]],
+                    current_map: str = "",
+                    current_class: str = "",
+                    is_satisfied: Optional[Callable[[FarmTask], bool]] = None) -> FarmPlan:
+    """Order tasks so each map is joined once and classes are swapped as little as possible.
 
-        if task.is_solo:
-            class_to_equip = cmd.get_solo_class()
+    Tasks are grouped by map (the current map first, the rest in first-seen
+    order), then by class starting with whichever class is equipped at that
+    point, then by cell. Order is otherwise kept stable. Tasks for which
+    ``is_satisfied`` returns True are dropped from the plan.
+    """
+    current_map = _norm(current_map)
+    current_class = _norm(current_class)
+    plan = FarmPlan(tasks=[])
+    pending = []
+    for task in tasks:
+        if is_satisfied and is_satisfied(task):
+            plan.skipped.append(task)
         else:
-            class_to_equip = cmd.get_farm_class()
+            pending.append(task)
+    plan.naive_map_joins, plan.naive_class_swaps = _count_transitions(pending, current_map, current_class, class_of)
+
+    by_map: dict[str, list[FarmTask]] = {}
+    for task in pending:
+        by_map.setdefault(_norm(task.map_name), []).append(task)
+    map_order = list(by_map)
+    if current_map in by_map:
+        map_order.remove(current_map)
+        map_order.insert(0, current_map)
+
+    equipped = current_class
+    for map_name in map_order:
+        by_class: dict[str, list[FarmTask]] = {}
+        for task in by_map[map_name]:
+            by_class.setdefault(_norm(class_of(task)), []).append(task)
+        class_order = list(by_class)
+        # Tasks that need no class, or the one already worn, go first.
+        class_order.sort(key=lambda name: 0 if name in ("", equipped) else 1)
+        for class_name in class_order:
+            by_cell: dict[str, list[FarmTask]] = {}
+            for task in by_class[class_name]:
+                by_cell.setdefault(_norm(task.cell), []).append(task)
+            for cell_tasks in by_cell.values():
+                plan.tasks.extend(cell_tasks)
+            if class_name:
+                equipped = class_name
 
+    plan.map_joins, plan.class_swaps = _count_transitions(plan.tasks, current_map, current_class, class_of)
+    return plan
+
+async def do_farm_tasks(cmd: Command, tasks: list[FarmTask], reorder: bool = True) -> FarmPlan:
+    # imported per call: ScriptHost.reload re-imports templates but never core
+    from templates.hunt import hunt_item
+
+    def class_of(task: FarmTask) -> Optional[str]:
+        return cmd.get_solo_class() if task.is_solo else cmd.get_farm_class()
+
+    def is_satisfied(task: FarmTask) -> bool:
+        return (cmd.is_in_inventory(task.item_name, task.qty, ">=")
+                or cmd.is_in_inventory(task.item_name, task.qty, ">=", isTemp=True)
+                or cmd.is_in_bank(task.item_name, task.qty, ">="))
+
+    equipped_class = cmd.get_equipped_class()
+    current_class = equipped_class.item_name if equipped_class else ""
+    if reorder:
+        plan = plan_farm_tasks(tasks, class_of, cmd.bot.strMapName, current_class, is_satisfied)
+        for task in plan.skipped:
+            if cmd.is_in_bank(task.item_name):
+                await cmd.bank_to_inv(task.item_name)
+    else:
+        plan = FarmPlan(tasks=list(tasks))
+        plan.map_joins, plan.class_swaps = _count_transitions(plan.tasks, _norm(cmd.bot.strMapName), _norm(current_class), class_of)
+        plan.naive_map_joins, plan.naive_class_swaps = plan.map_joins, plan.class_swaps
+
+    join_seconds = []
+    swap_seconds = []
+    for task in plan.tasks:
+        if not cmd.is_still_connected():
+            return plan
+
+        class_to_equip = class_of(task)
         if class_to_equip:
-            await cmd.equip_item(class_to_equip)
+            equipped_class = cmd.get_equipped_class()
+            if not equipped_class or _norm(equipped_class.item_name) != _norm(class_to_equip):
+                started = cmd.bot.clock.monotonic()
+                await cmd.equip_item(class_to_equip)
+                swap_seconds.append(cmd.bot.clock.monotonic() - started)
+
+        if cmd.is_not_in_map(task.map_name) and not is_satisfied(task):
+            started = cmd.bot.clock.monotonic()
+            while cmd.is_still_connected() and cmd.is_not_in_map(task.map_name):
+                await cmd.join_map(task.map_name, task.room_number)
+                await cmd.sleep(1000)
+            join_seconds.append(cmd.bot.clock.monotonic() - started)
 
         await hunt_item(
             cmd=cmd,
@@ -31,6 +153,18 @@ async def do_farm_tasks(cmd: Command, tasks: list[FarmTask]):
             cell=task.cell,
             pad=task.pad,
             map_name=task.map_name,
+            room_number=task.room_number,
             farming_logger=True,
-            is_temp=True
+            is_temp=task.is_temp
+        )
+
+    if plan.map_joins_saved or plan.class_swaps_saved or plan.skipped:
+        join_cost = sum(join_seconds) / len(join_seconds) if join_seconds else DEFAULT_JOIN_SECONDS
+        swap_cost = sum(swap_seconds) / len(swap_seconds) if swap_seconds else DEFAULT_SWAP_SECONDS
+        cmd.bot.log.info(
+            "farm tasks: %d run, %d skipped, %d map joins (%d saved), %d class swaps (%d saved), ~%.1fs saved",
+            len(plan.tasks), len(plan.skipped), plan.map_joins, plan.map_joins_saved,
+            plan.class_swaps, plan.class_swaps_saved,
+            plan.map_joins_saved * join_cost + plan.class_swaps_saved * swap_cost
         )
+    return plan
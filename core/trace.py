@@ -0,0 +1,143 @@
+import asyncio
+import itertools
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+from inspect import getmembers, iscoroutinefunction, ismethod
+from typing import Callable, Deque, Dict, Iterator, Optional
+
+DEFAULT_MAX_EVENTS = 500_000
+DEFAULT_TRACE_DIR = "traces"
+
+_NULL_SPAN = nullcontext()
+# one trace "process" per bot, so files of several bots can be opened together
+_pids = itertools.count(1)
+
+
+class Tracer:
+    """Opt-in timeline of one bot in Chrome Trace Event format.
+
+    Spans are complete (``"ph": "X"``) events on a track per asyncio task,
+    so ``run_commands``, the background reader and helper tasks do not
+    overlap each other. Load the file written by :meth:`export` in
+    ``ui.perfetto.dev`` or ``chrome://tracing``. While disabled,
+    :meth:`span` returns a shared no-op context and records nothing.
+    """
+
+    def __init__(self, name: str = "bot", enabled: bool = False, max_events: int = DEFAULT_MAX_EVENTS,
+                 clock: Callable[[], float] = time.perf_counter):
+        self.name = name
+        self.enabled = enabled
+        self.clock = clock
+        self.pid = next(_pids)
+        self._events: Deque[dict] = deque(maxlen=max_events)
+        self._tracks: Dict[int, int] = {}
+        self._track_names: Dict[int, str] = {}
+
+    def _tid(self) -> int:
+        try:
+            task = asyncio.current_task()
+        except RuntimeError:
+            task = None
+        key = id(task) if task is not None else threading.get_ident()
+        tid = self._tracks.get(key)
+        if tid is None:
+            tid = self._tracks[key] = len(self._tracks) + 1
+            self._track_names[tid] = task.get_name() if task is not None else threading.current_thread().name
+        return tid
+
+    def _us(self, t: float) -> float:
+        return round(t * 1e6, 1)
+
+    def complete(self, name: str, cat: str, start: float, end: float, args: Optional[dict] = None) -> None:
+        """Record a span that ran from ``start`` to ``end`` (seconds of :attr:`clock`)."""
+        event = {"name": name, "cat": cat, "ph": "X", "ts": self._us(start), "dur": self._us(end - start),
+                 "pid": self.pid, "tid": self._tid()}
+        if args:
+            event["args"] = args
+        self._events.append(event)
+
+    def instant(self, name: str, cat: str, args: Optional[dict] = None) -> None:
+        if not self.enabled:
+            return
+        event = {"name": name, "cat": cat, "ph": "i", "s": "t", "ts": self._us(self.clock()),
+                 "pid": self.pid, "tid": self._tid()}
+        if args:
+            event["args"] = args
+        self._events.append(event)
+
+    @contextmanager
+    def _span(self, name: str, cat: str, args: Optional[dict]) -> Iterator[None]:
+        start = self.clock()
+        try:
+            yield
+        finally:
+            self.complete(name, cat, start, self.clock(), args)
+
+    def span(self, name: str, cat: str, args: Optional[dict] = None):
+        """Context manager timing its body; usable around ``await``."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return self._span(name, cat, args)
+
+    def instrument(self, obj, cat: str, skip: tuple = ()) -> int:
+        """Trace every public coroutine method of ``obj`` by shadowing it on the instance.
+
+        Returns the number of wrapped methods. Sync helpers are left alone:
+        they return immediately and would only bury the waits in noise.
+        """
+        count = 0
+        for name, method in getmembers(obj, ismethod):
+            if name.startswith("_") or name in skip or not iscoroutinefunction(method):
+                continue
+            setattr(obj, name, self._wrap(name, cat, method))
+            count += 1
+        return count
+
+    def _wrap(self, name: str, cat: str, method):
+        @wraps(method)
+        async def traced(*args, **kwargs):
+            if not self.enabled:
+                return await method(*args, **kwargs)
+            with self._span(name, cat, None):
+                return await method(*args, **kwargs)
+        return traced
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def clear(self) -> None:
+        self._events.clear()
+
+    def to_dict(self) -> dict:
+        meta = [{"name": "process_name", "ph": "M", "pid": self.pid, "tid": 0, "args": {"name": self.name}}]
+        meta += [{"name": "thread_name", "ph": "M", "pid": self.pid, "tid": tid, "args": {"name": track}}
+                 for tid, track in self._track_names.items()]
+        return {"traceEvents": meta + list(self._events), "displayTimeUnit": "ms"}
+
+    def export(self, directory: Optional[str] = None, path: Optional[str] = None) -> Optional[str]:
+        """Write ``<dir>/<name>-<time>.trace.json`` (or ``path``) and return the path."""
+        if not self._events:
+            return None
+        if path is None:
+            directory = directory or os.getenv("TRACE_DIR") or DEFAULT_TRACE_DIR
+            os.makedirs(directory, exist_ok=True)
+            safe_name = "".join(c if c.isalnum() or c in "-_." else "_" for c in self.name) or "bot"
+            path = os.path.join(directory, f"{safe_name}-{time.strftime('%Y%m%d-%H%M%S')}.trace.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f)
+        return path
+
+
+def packet_name(frame) -> str:
+    """Short label of a ``%xt%`` frame for the timeline, e.g. ``gar`` or ``moveToArea``."""
+    if isinstance(frame, (list, tuple)):
+        frame = frame[0].decode("utf-8", "replace") if frame else ""
+    fields = frame.split("%", 4)
+    if len(fields) > 3 and fields[1] == "xt":
+        return fields[3] if fields[2] == "zm" else fields[2]
+    return frame[:24]
@@ -1,4 +1,4 @@
-import json
+from core import codec
 
 def checkOperator(obj1, obj2, operator: str):
     flag = False
@@ -22,8 +22,4 @@ def normalize(text: str):
     return text.lower().strip().replace("`", "'").replace("❜", "'").replace("’", "'")
 
 def is_valid_json(s):
-    try:
-        json.loads(s)
-        return True
-    except json.JSONDecodeError:
-        return False
\ No newline at end of file
+    return codec.is_valid_json(s)
\ No newline at end of file
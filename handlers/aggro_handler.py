@@ -1,4 +1,3 @@
-import asyncio
 from typing import TYPE_CHECKING
 from colorama import Fore
 
@@ -12,7 +11,6 @@ async def aggro_handler_task(bot: 'Bot'):
         if not bot.is_aggro_handler_task_running:
             break
         if len(bot.aggro_mons_id) > 0:
-            aggroMon = f"%xt%zm%aggroMon%{bot.areaId}%{'%'.join(map(str, bot.aggro_mons_id))}%"
-            bot.write_message(aggroMon)
-        await asyncio.sleep(bot.aggro_delay_ms/1000)
+            bot.write_frame(bot.packets.aggro(bot.aggro_mons_id), batch=True)
+        await bot.clock.sleep(bot.aggro_delay_ms/1000)
     print("Stopping aggro handler...")
\ No newline at end of file
@@ -0,0 +1,36 @@
+import argparse
+
+from core.loadgen import LoadConfig, StandInServer, format_header, format_row, measure
+from core.logger import configure_logging
+from core.loop import run as run_loop
+
+# Measure how many bots one process can run before timing degrades.
+# Example: python loadtest.py --bots 10,50,100,200 --duration 20
+parser = argparse.ArgumentParser(description="Run simulated bots against a local stand-in server.")
+parser.add_argument("--bots", default="10,25,50,100", help="comma separated bot counts, one report row each")
+parser.add_argument("--duration", type=float, default=15, help="seconds measured per step")
+parser.add_argument("--ct-rate", type=float, default=4, help="ct combat ticks per second per bot")
+parser.add_argument("--move-rate", type=float, default=2, help="uotls crowd moves per second per bot")
+parser.add_argument("--drop-rate", type=float, default=0.2, help="drops per second per bot")
+parser.add_argument("--crowd", type=int, default=20, help="other players in the room")
+parser.add_argument("--skill-ms", type=int, default=1000, help="skill cast interval of each bot")
+parser.add_argument("--loop", default=None, help="event loop: auto, uvloop or asyncio (default EVENT_LOOP or auto)")
+parser.add_argument("--workers", type=int, default=None, help="executor threads (default: largest bot count + 4)")
+args = parser.parse_args()
+
+
+async def main():
+    cfg = LoadConfig(args.ct_rate, args.move_rate, args.drop_rate, args.crowd, skill_ms=args.skill_ms)
+    server = StandInServer(cfg)
+    port = server.start()
+    try:
+        print(format_header())
+        for bot_count in [int(n) for n in args.bots.split(",") if n.strip()]:
+            print(format_row(await measure(bot_count, port, cfg, args.duration)))
+    finally:
+        server.stop()
+
+if __name__ == "__main__":
+    configure_logging()
+    counts = [int(n) for n in args.bots.split(",") if n.strip()]
+    run_loop(main(), bot_count=max(counts, default=1), loop=args.loop, workers=args.workers)
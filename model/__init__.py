@@ -2,4 +2,5 @@ from .shop import Shop
 from .monster import Monster
 from .inventory import ItemInventory, ItemType
 from .faction import Faction
-from .player_area import PlayerArea
\ No newline at end of file
+from .player_area import PlayerArea
+from .room_roster import RoomRoster
@@ -1,11 +1,15 @@
+import heapq
 from datetime import datetime, timedelta
-from typing import Optional
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional, Tuple
+from core.clock import Clock, get_clock
 from core.utils import normalize
 
 class Aura:
-    def __init__(self, aura):
+    def __init__(self, aura, clock: Optional[Clock] = None):
+        self.clock = clock or get_clock()
         duration: int = aura.get('dur', 0)
-        timestamp: datetime = datetime.now()
+        timestamp: datetime = self.clock.now()
         expiration_time: datetime = timestamp + timedelta(seconds=duration)
 
         self.name: str = normalize(aura.get('nam'))
@@ -15,26 +19,110 @@ class Aura:
         self.icon: str = aura.get('icon')
         self.applied_time: datetime = timestamp
         self.expires_at: datetime = expiration_time
+        self.expires_mono: float = self.clock.monotonic() + duration
         self.aura_val: int = 1
 
     def refresh(self, duration: Optional[int] = None):
         """Refresh the aura's applied_time and expiration."""
-        self.applied_time = datetime.now()
+        self.applied_time = self.clock.now()
         if duration is not None:
             self.duration = duration
         self.expires_at = self.applied_time + timedelta(seconds=self.duration)
+        self.expires_mono = self.clock.monotonic() + self.duration
         self.aura_val += 1
 
     def is_expired(self) -> bool:
         """Check if the aura is expired."""
-        return datetime.now() >= self.expires_at
-    
+        return self.clock.monotonic() >= self.expires_mono
+
     def get_val(self) -> int:
         return self.aura_val
-    
+
     def formatted_times(self) -> dict:
         """Optional helper to get formatted time strings for display."""
         return {
             "applied_time": self.applied_time.strftime('%Y-%m-%d %H:%M:%S'),
             "expires_at": self.expires_at.strftime('%Y-%m-%d %H:%M:%S')
-        }
\ No newline at end of file
+        }
+
+@lru_cache(maxsize=1024)
+def aura_key(name: str) -> str:
+    """Normalized aura name; scripts ask for the same few names every tick, so it is cached."""
+    return normalize(name)
+
+class AuraSet:
+    """Active auras of a player or monster, indexed by normalized name.
+
+    Expiry times sit in a min-heap and expired auras are evicted lazily on
+    the next read, so lookups are a dict hit plus popping whatever has run
+    out since the last call.
+    """
+
+    __slots__ = ("_by_name", "_heap", "clock")
+
+    def __init__(self, clock: Optional[Clock] = None):
+        self._by_name: Dict[str, Aura] = {}
+        self._heap: List[Tuple[float, str]] = []
+        self.clock = clock
+
+    def add(self, auras: list) -> None:
+        """Apply the ``auras`` list of a ``ct`` ``aura+`` action.
+
+        ``isNew`` auras start over with one stack; other re-applied auras are
+        refreshed and gain a stack.
+        """
+        self._evict()
+        for data in auras:
+            name = aura_key(data.get('nam') or "")
+            existing = self._by_name.get(name)
+            if existing and not data.get('isNew', False):
+                existing.refresh(data.get('dur', 0))
+                aura = existing
+            else:
+                aura = Aura(data, self.clock)
+                self._by_name[name] = aura
+            heapq.heappush(self._heap, (aura.expires_mono, name))
+
+    def remove(self, name: str) -> None:
+        self._by_name.pop(aura_key(name or ""), None)
+
+    def clear(self) -> None:
+        self._by_name.clear()
+        self._heap.clear()
+
+    def _evict(self) -> None:
+        heap = self._heap
+        if not heap:
+            return
+        now = (self.clock or get_clock()).monotonic()
+        while heap and heap[0][0] <= now:
+            _, name = heapq.heappop(heap)
+            aura = self._by_name.get(name)
+            # A refreshed aura left an older heap entry behind; only drop it if it really ran out.
+            if aura and aura.expires_mono <= now:
+                del self._by_name[name]
+        if not self._by_name:
+            heap.clear()
+
+    def get(self, name: str) -> Optional[Aura]:
+        self._evict()
+        return self._by_name.get(aura_key(name))
+
+    def has(self, name: str) -> bool:
+        return self.get(name) is not None
+
+    def stacks(self, name: str) -> int:
+        aura = self.get(name)
+        return aura.aura_val if aura else 0
+
+    def names(self) -> List[str]:
+        self._evict()
+        return list(self._by_name)
+
+    def __iter__(self) -> Iterator[Aura]:
+        self._evict()
+        return iter(list(self._by_name.values()))
+
+    def __len__(self) -> int:
+        self._evict()
+        return len(self._by_name)
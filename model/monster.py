@@ -1,5 +1,7 @@
+from typing import Optional
 from core.utils import normalize
-from model.aura import Aura
+from core.clock import Clock
+from model.aura import Aura, AuraSet
 
 class Monster:
     _mon_name: str = None
@@ -13,7 +15,7 @@ class Monster:
         self._mon_name = normalize(value) if value else None
     
     # Init with monBranch json data
-    def __init__(self, json_data):
+    def __init__(self, json_data, clock: Optional[Clock] = None):
         self.mon_map_id: str = str(json_data['MonMapID'])
         self.mon_id: str = str(json_data['MonID'])
         self.is_alive: bool = int(json_data['intState']) > 0
@@ -21,36 +23,19 @@ class Monster:
         self.max_hp: int = json_data['intHPMax']
         self.tes: str = str(json_data.get('tes', None))
         self.frame: str = None
-        self.AURAS: list[Aura] = []
+        self.AURAS: AuraSet = AuraSet(clock)
 
     def addAura(self, auras:list):
-        for aura in auras:
-            is_new = aura.get('isNew', False)
-            name = normalize(aura.get('nam'))
-            if is_new:
-                self.AURAS.append(Aura(aura))
-            else:
-                for existing_aura in self.AURAS:
-                    if existing_aura.name == name:
-                        existing_aura.refresh(aura.get('dur', 0))
+        self.AURAS.add(auras)
     
     def removeAura(self, auraName: str):
-        normalized_name = normalize(auraName)
-        for aura in self.AURAS[:]:
-            if aura.name == normalized_name:
-                self.AURAS.remove(aura)
-                break
-
-    def getAura(self, auraName: str) -> Aura:
-        normalized_name = normalize(auraName)
-        for aura in self.AURAS:
-            if aura.name == normalized_name and not aura.is_expired():
-                return aura
-        return None
+        self.AURAS.remove(auraName)
 
+    def getAura(self, auraName: str) -> Optional[Aura]:
+        return self.AURAS.get(auraName)
+    
     def hasAura(self, auraName: str) -> bool:
-        normalized_name = normalize(auraName)
-        for aura in self.AURAS:
-            if aura.name == normalized_name and not aura.is_expired():
-                return True
-        return False
\ No newline at end of file
+        return self.AURAS.has(auraName)
+
+    def getAuraStacks(self, auraName: str) -> int:
+        return self.AURAS.stacks(auraName)
\ No newline at end of file
@@ -0,0 +1,129 @@
+from typing import Dict, Iterable, Iterator, List, Optional
+from .player_area import PlayerArea
+
+class RoomRoster:
+    """Players in the current room, indexed by lowercased name and entity ID.
+
+    Per-cell head counts are kept up to date on every join, leave and move,
+    so "how many players are in r3" is a dict lookup. Also tracks the room
+    user ids from ``joinOK``/``uER``/``userGone`` used for friendly targets.
+    """
+
+    def __init__(self):
+        self._by_name: Dict[str, PlayerArea] = {}
+        self._by_ent: Dict[int, PlayerArea] = {}
+        self._cell_counts: Dict[str, int] = {}
+        self._user_ids: Dict[str, None] = {}
+        self._user_id_list: Optional[List[str]] = None
+        self.user_ids_version = 0
+
+    def _count(self, cell: Optional[str], delta: int) -> None:
+        if not cell:
+            return
+        key = cell.lower()
+        count = self._cell_counts.get(key, 0) + delta
+        if count > 0:
+            self._cell_counts[key] = count
+        else:
+            self._cell_counts.pop(key, None)
+
+    def reset(self, players: Iterable[PlayerArea] = ()) -> None:
+        """Replace the roster, e.g. from the ``uoBranch`` of ``moveToArea``."""
+        self._by_name.clear()
+        self._by_ent.clear()
+        self._cell_counts.clear()
+        for player in players:
+            self.add(player)
+
+    def add(self, player: PlayerArea) -> None:
+        name = (player.str_username or player.uo_name).lower()
+        self.remove(name)
+        self._by_name[name] = player
+        if player.ent_id:
+            self._by_ent[player.ent_id] = player
+        self._count(player.str_frame, 1)
+
+    def upsert(self, name: str, data: dict) -> PlayerArea:
+        """Update a player's stats from ``retrieveUserData``, adding them if unknown."""
+        player = self._by_name.get(name.lower())
+        if player:
+            player.updateDataPlayer(data)
+        else:
+            player = PlayerArea(data)
+            # the uotls payload carries no name fields, so key the newcomer by ``name``
+            player.str_username = player.str_username or name
+            player.uo_name = player.uo_name or name.lower()
+            self.add(player)
+        return player
+
+    def remove(self, name: str) -> Optional[PlayerArea]:
+        player = self._by_name.pop(name.lower(), None)
+        if player:
+            if self._by_ent.get(player.ent_id) is player:
+                del self._by_ent[player.ent_id]
+            self._count(player.str_frame, -1)
+        return player
+
+    def move(self, name: str, cell: Optional[str], pad: Optional[str] = None) -> Optional[PlayerArea]:
+        """Apply a ``uotls`` movement. Missing ``cell``/``pad`` values are left unchanged."""
+        player = self._by_name.get(name.lower())
+        if not player:
+            return None
+        if cell is not None and cell != player.str_frame:
+            self._count(player.str_frame, -1)
+            player.str_frame = cell
+            self._count(cell, 1)
+        if pad is not None:
+            player.str_pad = pad
+        return player
+
+    def get(self, name: str) -> Optional[PlayerArea]:
+        return self._by_name.get(name.lower())
+
+    def get_by_ent_id(self, ent_id: int) -> Optional[PlayerArea]:
+        return self._by_ent.get(int(ent_id))
+
+    def count_in_cell(self, cell: str) -> int:
+        return self._cell_counts.get(cell.lower(), 0)
+
+    def players(self) -> List[PlayerArea]:
+        return list(self._by_name.values())
+
+    def __iter__(self) -> Iterator[PlayerArea]:
+        return iter(list(self._by_name.values()))
+
+    def __len__(self) -> int:
+        return len(self._by_name)
+
+    # room user ids (SmartFox ids, not entity ids)
+
+    @property
+    def user_ids(self) -> List[str]:
+        return list(self._user_ids)
+
+    @property
+    def user_count(self) -> int:
+        return len(self._user_ids)
+
+    def user_id_list(self) -> List[str]:
+        """Shared list of the user ids, rebuilt only after the ids change. Do not modify it."""
+        if self._user_id_list is None:
+            self._user_id_list = list(self._user_ids)
+        return self._user_id_list
+
+    def _user_ids_changed(self) -> None:
+        self._user_id_list = None
+        self.user_ids_version += 1
+
+    def set_user_ids(self, user_ids: Iterable[str]) -> None:
+        self._user_ids = dict.fromkeys(user_ids)
+        self._user_ids_changed()
+
+    def add_user_id(self, user_id: str) -> None:
+        if user_id not in self._user_ids:
+            self._user_ids[user_id] = None
+            self._user_ids_changed()
+
+    def remove_user_id(self, user_id: str) -> None:
+        if self._user_ids.pop(user_id, 0) is None:
+            self._user_ids_changed()
@@ -1,9 +1,9 @@
-import importlib
-
 from colorama import Fore
 from core.bot import Bot
+from core.loop import run as run_loop
+from core.packet_log import install_dump_signal
+from core.script_host import ScriptHost, watch_from_env
 import commands as cmd
-import asyncio
 
 username = input("Username: ")
 password = input("Password: ")
@@ -37,9 +37,15 @@ b = Bot(
 b.set_login_info(username, password, server)
 
 bot_path = bot_path
+install_dump_signal()
+scripts = ScriptHost()
+
+async def main():
+    watch_from_env(scripts)  # with HOT_RELOAD=1, edited scripts restart on the live session
+    await scripts.run(b, bot_path)
+
 try:
-    bot_class = importlib.import_module(bot_path)
     print(f"starting bot: {bot_path.split('.')[-1]}")
-    asyncio.run(b.start_bot(bot_class.main))
+    run_loop(main())
 except ModuleNotFoundError as e:
     print(f"Error: {e}")
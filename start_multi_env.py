@@ -1,25 +1,30 @@
 import os
 from dotenv import load_dotenv
-import importlib
-import builtins
 from core.bot import Bot
-import asyncio
-import sys
-
-# Define a custom print function that includes flush=True
-# IDK why but Docker logs doesnt work without this
-def custom_print(*args, **kwargs):
-    kwargs['flush'] = True
-    # Use sys.stdout.write to avoid recursion
-    sys.stdout.write(" ".join(map(str, args)) + "\n")
-    sys.stdout.flush()
-
-# Override the built-in print function
-builtins.print = custom_print
+from core.logger import configure_logging, install_print_hook
+from core.clock import use_virtual_time
+from core.loop import run as run_loop
+from core.packet_log import install_dump_signal
+from core import codec, profiler
+from core.fleet import start_staggered
+from core.script_host import ScriptHost, watch_from_env
 
 # Load environment variables from .env file
 load_dotenv()
 
+# Docker logs need every line flushed. Instead of flushing on each print,
+# all output goes through one background writer that flushes per batch.
+configure_logging(json_lines=os.getenv("LOG_JSON", "").lower() in ("1", "true", "yes"))
+install_print_hook()
+
+# core was imported before .env was loaded, so the JSON_CODEC choice is applied here.
+codec.set_codec(os.getenv("JSON_CODEC") or "auto")
+
+# Simulation mode: SIM_SPEED=50 runs every bot in virtual time 50x faster than real play.
+# Only point this at a mock server; the real one will flag the timing.
+if os.getenv("SIM_SPEED"):
+    use_virtual_time(float(os.getenv("SIM_SPEED")))
+
 # You can use this approach if you prefer to use direct input instead of .env file:
 # Replace the following lines with direct assignments if you do not want to use .env
 # Example:
@@ -66,6 +71,7 @@ def create_bot(username, password, server, room_number, class_name):
         itemsDropWhiteList=items_white_list,
         showLog=True,
         showDebug=False,
+        logLevel=os.getenv("LOG_LEVEL"),
         showChat=True,
         isScriptable=True,
         farmClass=class_name,
@@ -74,23 +80,28 @@ def create_bot(username, password, server, room_number, class_name):
     bot.set_login_info(username, password, server)
     return bot
 
+scripts = ScriptHost()
+
 # Run bot asynchronously
 async def run_bot(bot_class_path, bot_instance):
     try:
-        bot_class = importlib.import_module(bot_class_path)
         print(f"Starting bot: {bot_class_path.split('.')[-1]}")
-        await bot_instance.start_bot(bot_class.main)
+        await scripts.run(bot_instance, bot_class_path)
     except ModuleNotFoundError as e:
         print(f"Error: {e}")
 
 
 async def main():
+    profiler.watch_control_file()  # with PROFILE_CONTROL set, profile while that file exists
+    watch_from_env(scripts)  # with HOT_RELOAD=1, edited scripts restart on the live sessions
     tasks = [
         run_bot(bot_paths[i], create_bot(usernames[i], passwords[i], servers[i], room_number=91923, class_name=classes_name[i]))
         for i in range(len(usernames))
     ]
-    await asyncio.gather(*tasks)
+    await start_staggered(tasks)  # CONNECT_WINDOW spreads the logins over that many seconds
 
 if __name__ == "__main__":
+    install_dump_signal()  # kill -USR1 <pid> writes every bot's recent packets to PACKET_DUMP_DIR
+    profiler.install()  # kill -USR2 <pid> starts/stops profiling, results in PROFILE_DIR
     print(f"Total bots: {len(usernames)}")
-    asyncio.run(main())
+    run_loop(main(), bot_count=len(usernames))
@@ -8,10 +8,7 @@ def get_map_items(map_item_id: int, qty: int = 1):
     return cmds
 
 def accept_quest_bulk(quest_id: int, increament: int):
-    cmds = []
-    for i in range(increament):
-        cmds.append(cmd.AcceptQuestCmd(quest_id + i))
-    return cmds
+    return [cmd.AcceptQuestBulkCmd(quest_id, increament)]
 
 def un_bank_items(items: []): # type: ignore
     cmds = []
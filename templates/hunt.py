@@ -1,6 +1,7 @@
 from core.bot import Bot
 import commands as cmd
 from core.command import Command
+from core.rotation import Rotation, RotationEngine
 
 async def hunt_item(
         cmd: Command,
@@ -40,8 +41,8 @@ async def hunt_item(
     if farming_logger:
         cmd.farming_logger(item_name, item_qty, is_temp)
 
-    skill_list = skill_list
     skill_index = 0
+    engine = RotationEngine(cmd, Rotation.from_list(skill_list), monster_name, hunt)
 
     while cmd.is_still_connected():
         if cmd.is_in_inventory(item_name, item_qty, operator=">=") or cmd.is_in_inventory(item_name, item_qty, operator=">=", isTemp=True):
@@ -51,12 +52,11 @@ async def hunt_item(
         playerclass = playerclass.item_name if playerclass else ""
         if "chrono shadow" in playerclass.lower():
             await cmd.wait_use_skill(skill_list[skill_index])
+            skill_index = (skill_index + 1) % len(skill_list)
+            await cmd.sleep(100)
         else:
-            await cmd.use_skill(skill_list[skill_index], monster_name, hunt)
-        skill_index += 1
-        if skill_index >= len(skill_list):
-            skill_index = 0
-        await cmd.sleep(100)
+            # sleeps until the next skill is off cooldown instead of polling every 100 ms
+            await engine.cast_next()
     return
 
 async def kill_quest(
@@ -97,13 +97,12 @@ async def quest_item_req(cmd: Command, map_name: str, item_name: str, qty: int =
         await attack_script(cmd, monster)
 
         
+DEFAULT_ROTATION = Rotation.from_list([0, 1, 2, 0, 3, 4])
+
 async def attack_script(cmd: Command, monster_name: str = "*", hunt: bool = False):
-    await cmd.use_skill(0, monster_name, hunt=hunt)
-    await cmd.use_skill(1, monster_name, hunt=hunt)
-    await cmd.use_skill(2, monster_name, hunt=hunt)
-    await cmd.use_skill(0, monster_name, hunt=hunt)
-    await cmd.use_skill(3, monster_name, hunt=hunt)
-    await cmd.use_skill(4, monster_name, hunt=hunt)
+    engine = RotationEngine(cmd, DEFAULT_ROTATION, monster_name, hunt)
+    for _ in range(6):
+        await engine.cast_next()
 
 
 def hunt_item_cmds(